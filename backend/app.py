@@ -1,17 +1,18 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
 import json
 import google.generativeai as genai
-import jwt
-from datetime import datetime, timedelta
-from functools import wraps
-from werkzeug.security import generate_password_hash, check_password_hash
+from datetime import datetime
 from flask_jwt_extended import JWTManager
 import requests
 import traceback
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from urllib.parse import unquote
+import click
 
 # Load environment variables
 load_dotenv()
@@ -28,11 +29,64 @@ if not GOOGLE_GEMINI_API_KEY:
 
 genai.configure(api_key=GOOGLE_GEMINI_API_KEY)
 
-OLLAMA_API_URL = "http://localhost:11434/api/generate"
+# Last-mile fan-out: the Directions legs run concurrently on a bounded pool shared by all
+# requests, and the whole request (geocode + legs) has to finish inside the deadline.
+LAST_MILE_MAX_WORKERS = int(os.getenv("LAST_MILE_MAX_WORKERS", 16))
+LAST_MILE_DEADLINE_SECONDS = float(os.getenv("LAST_MILE_DEADLINE_SECONDS", 8.0))
+directions_executor = ThreadPoolExecutor(max_workers=LAST_MILE_MAX_WORKERS, thread_name_prefix="directions")
+
+# Nearby places: type queries are dispatched in parallel, at most NEARBY_PLACES_FANOUT in flight
+# per request.
+NEARBY_PLACES_MAX_WORKERS = int(os.getenv("NEARBY_PLACES_MAX_WORKERS", 24))
+NEARBY_PLACES_FANOUT = int(os.getenv("NEARBY_PLACES_FANOUT", 4))
+NEARBY_PLACES_TARGET = 20
+places_executor = ThreadPoolExecutor(max_workers=NEARBY_PLACES_MAX_WORKERS, thread_name_prefix="places")
+NEARBY_SEARCH_TYPES = [
+    ("tourist_attraction", "tourist attractions"),
+    ("museum", "museums"),
+    ("park", "parks"),
+    ("art_gallery", "art galleries"),
+    ("zoo", "zoos"),
+    ("amusement_park", "amusement parks"),
+    ("aquarium", "aquariums"),
+    ("shopping_mall", "shopping malls"),
+    ("restaurant", "restaurants"),
+    ("cafe", "cafes"),
+    ("store", "stores"),
+    ("", "all places")
+]
 
 # Import your modules
 from extensions import db, migrate, bcrypt
 from models.user_model import User
+from models.transport_mode import TransportMode
+from models.local_route_feedback import LocalRouteFeedback
+from models.route_feedback_stats import RouteFeedbackStats
+from models.reference_version import ReferenceVersion
+from models.token_blocklist import TokenBlocklist
+from utils.identity_cache import identity_cache
+from utils.passwords import password_service
+from utils.pagination import NEXT_CURSOR_HEADER
+from utils.destination_cache import destination_cache
+from utils.destination_search import autocomplete_index, ensure_search_index
+from utils.telemetry import log, log_event, metrics, span, start_trace
+from utils.mode_registry import mode_registry
+from utils.feedback_ingest import feedback_writer
+from models.geocode_cache import GeocodeCacheEntry
+from utils.geocode_cache import geocode_cache, normalize_destination
+from utils.route_cache import route_cache
+from utils.maps_client import maps_client
+from utils.distance_matrix import distance_matrix
+from utils.places_cache import places_cache
+from utils.geo import grid_cell, cell_center
+from models.place_tile import PlaceTile
+from models.llm_response import LLMResponse
+from models.itinerary import Itinerary
+from models.trip_model import Trip
+from models.feedback_model import Feedback
+from utils.itinerary import itinerary_store
+from utils.llm import LLM_MODEL_NAME, ChatBusyError, generate, generate_stream, llm_router
+from utils.response_cache import response_cache, bypass_requested, BYPASS_HEADER
 from routes.destination_routes import destinations_bp
 from routes.auth import auth_bp
 from routes.api import api_bp
@@ -45,7 +99,8 @@ def create_app():
         r"/*": {
             "origins": "*",
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization", BYPASS_HEADER],
+            "expose_headers": ["X-Cache", NEXT_CURSOR_HEADER, "Link"]
         }
     })
 
@@ -59,30 +114,24 @@ def create_app():
     db.init_app(app)
     migrate.init_app(app, db)
     bcrypt.init_app(app)
+    feedback_writer.init_app(app)
     jwt_manager = JWTManager(app)
 
+    @jwt_manager.token_in_blocklist_loader
+    def token_in_blocklist(jwt_header, jwt_payload):
+        return identity_cache.is_revoked(jwt_payload["jti"])
+
+    # Every @jwt_required route gets flask_jwt_extended.current_user from the short-TTL cache
+    # instead of querying the user table per request; None makes the request a 401.
+    @jwt_manager.user_lookup_loader
+    def user_lookup(jwt_header, jwt_payload):
+        return identity_cache.load(jwt_payload["sub"], jwt_payload["jti"])
+
     with app.app_context():
         db.create_all()
-
-    def token_required(f):
-        @wraps(f)
-        def decorated(*args, **kwargs):
-            token = None
-            if "Authorization" in request.headers:
-                parts = request.headers["Authorization"].split()
-                if len(parts) == 2 and parts[0].lower() == "bearer":
-                    token = parts[1]
-            if not token:
-                return jsonify({"error": "Token missing"}), 401
-            try:
-                data = jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
-                current_user = User.query.get(data["user_id"])
-            except jwt.ExpiredSignatureError:
-                return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({"error": "Invalid token"}), 401
-            return f(current_user, *args, **kwargs)
-        return decorated
+        # Transport modes are read-mostly reference data: load them once per process
+        mode_registry.load()
+        ensure_search_index()
 
     @app.route("/")
     def home():
@@ -99,22 +148,23 @@ def create_app():
             JSON with dynamic multi-modal route segments (walk, transit, e-scooter)
             with encoded polylines for exact route paths
         """
+        request_started = time.perf_counter()
+        deadline = time.monotonic() + LAST_MILE_DEADLINE_SECONDS
+        trace = start_trace("last_mile")
+        outcome = "ok"
         try:
             # Get and validate parameters
             start_lat_str = request.args.get("start_lat")
             start_lng_str = request.args.get("start_lng")
             destination = request.args.get("destination")
 
-            print(f"\n=== Last Mile Request ===")
-            print(f"Raw destination: {repr(destination)}")
-            print(f"Start lat: {start_lat_str}")
-            print(f"Start lng: {start_lng_str}")
-
             # Validate required parameters
             if not start_lat_str or not start_lng_str:
+                outcome = "bad_request"
                 return jsonify({"error": "start_lat and start_lng are required"}), 400
             
             if not destination:
+                outcome = "bad_request"
                 return jsonify({"error": "destination is required"}), 400
 
             # Parse coordinates
@@ -122,40 +172,64 @@ def create_app():
                 start_lat = float(start_lat_str)
                 start_lng = float(start_lng_str)
             except ValueError as e:
+                outcome = "bad_request"
                 return jsonify({"error": f"Invalid coordinates: {str(e)}"}), 400
 
             # Decode destination (handles URL encoding)
             destination = unquote(destination)
-            print(f"Decoded destination: {repr(destination)}")
+            trace.tag(destination=destination, start=f"{start_lat},{start_lng}")
 
-            # Step 1: Geocode the destination
-            geocode_url = "https://maps.googleapis.com/maps/api/geocode/json"
-            geo_params = {"address": destination, "key": GOOGLE_MAPS_API_KEY}
-            
-            print(f"Geocoding destination: {destination}")
-            geo_resp = requests.get(geocode_url, params=geo_params, timeout=10)
-            geo_data = geo_resp.json()
-            
-            print(f"Geocoding status: {geo_data.get('status')}")
-            
-            if geo_data.get("status") != "OK":
-                error_msg = geo_data.get("error_message", "Unknown error")
-                print(f"Geocoding failed: {error_msg}")
-                return jsonify({
-                    "error": f"Could not find location '{destination}'",
-                    "details": error_msg,
-                    "status": geo_data.get("status")
-                }), 400
-
-            dest_loc = geo_data["results"][0]["geometry"]["location"]
-            dest_lat, dest_lng = dest_loc["lat"], dest_loc["lng"]
-            formatted_address = geo_data["results"][0]["formatted_address"]
-            
-            print(f"Destination coordinates: {dest_lat}, {dest_lng}")
-            print(f"Formatted address: {formatted_address}")
+            # Step 1: Geocode the destination (served from the geocode cache when possible)
+            cache_key = normalize_destination(destination)
+            geocode_started = time.perf_counter()
+            cached_geo = geocode_cache.get(cache_key)
+
+            if cached_geo:
+                dest_lat, dest_lng = cached_geo["lat"], cached_geo["lng"]
+                formatted_address = cached_geo["formatted_address"]
+                geocode_ms = (time.perf_counter() - geocode_started) * 1000
+            else:
+                geocode_url = "https://maps.googleapis.com/maps/api/geocode/json"
+                geo_params = {"address": destination, "key": GOOGLE_MAPS_API_KEY}
+
+                with span("geocode", trace=trace) as geo_span:
+                    # the geocode comes out of the same budget as the legs that follow it
+                    geo_resp = maps_client.get(
+                        geocode_url, params=geo_params,
+                        timeout=max(deadline - time.monotonic(), 0.5), deadline=deadline,
+                    )
+                    geo_data = geo_resp.json()
+                    if geo_data.get("status") != "OK":
+                        geo_span.fail(geo_data.get("status", "unknown"))
+                geocode_ms = (time.perf_counter() - geocode_started) * 1000
+                geocode_cache.record_upstream(geocode_ms)
+
+                if geo_data.get("status") != "OK":
+                    error_msg = geo_data.get("error_message", "Unknown error")
+                    outcome = "geocode_failed"
+                    return jsonify({
+                        "error": f"Could not find location '{destination}'",
+                        "details": error_msg,
+                        "status": geo_data.get("status")
+                    }), 400
+
+                dest_loc = geo_data["results"][0]["geometry"]["location"]
+                dest_lat, dest_lng = dest_loc["lat"], dest_loc["lng"]
+                formatted_address = geo_data["results"][0]["formatted_address"]
+                geocode_cache.set(cache_key, {
+                    "lat": dest_lat,
+                    "lng": dest_lng,
+                    "formatted_address": formatted_address
+                })
+            trace.tag(geocode_cached=bool(cached_geo))
 
             # Step 2: Helper to get Google Directions for each leg
-            def get_directions(start_lat, start_lng, end_lat, end_lng, mode):
+            def get_directions(start_lat, start_lng, end_lat, end_lng, mode, timeout=10):
+                # Nearby GPS fixes share a grid cell, so hot corridors never reach Google
+                cached_leg = route_cache.get(mode, start_lat, start_lng, end_lat, end_lng)
+                if cached_leg:
+                    return cached_leg
+
                 url = "https://maps.googleapis.com/maps/api/directions/json"
                 params = {
                     "origin": f"{start_lat},{start_lng}",
@@ -164,12 +238,13 @@ def create_app():
                     "key": GOOGLE_MAPS_API_KEY
                 }
                 
-                print(f"Getting {mode} directions...")
-                resp = requests.get(url, params=params, timeout=10)
-                data = resp.json()
-                
+                with span("directions", target=mode, trace=trace) as leg_span:
+                    resp = maps_client.get(url, params=params, timeout=timeout, deadline=deadline)
+                    data = resp.json()
+                    if data.get("status") not in ("OK", "ZERO_RESULTS"):
+                        leg_span.fail(data.get("status", "unknown"))
+
                 if data.get("status") != "OK" or not data.get("routes"):
-                    print(f"{mode} directions failed: {data.get('status')}")
                     return None
                 
                 route = data["routes"][0]
@@ -184,7 +259,7 @@ def create_app():
                     if "polyline" in step and "points" in step["polyline"]:
                         step_polylines.append(step["polyline"]["points"])
                 
-                return {
+                parsed_leg = {
                     "mode": mode.capitalize() if mode != "transit" else "Metro/Bus",
                     "details": leg["steps"][0]["html_instructions"] if leg.get("steps") else f"{mode} from start to destination",
                     "duration": leg["duration"]["text"],
@@ -196,85 +271,114 @@ def create_app():
                     "polyline": overview_polyline,  # Encoded polyline for the entire route
                     "step_polylines": step_polylines  # Individual step polylines
                 }
+                route_cache.set(mode, start_lat, start_lng, end_lat, end_lng, parsed_leg)
+                return parsed_leg
+
+            # Step 3: Fan out one Directions call per mode and wait until the deadline.
+            # Bicycling is used as a proxy for e-scooter routes, driving for auto/cab.
+            leg_specs = [
+                ("walking", "Walk", f"Walk from your location to {destination}"),
+                ("transit", "Metro/Bus", f"Take public transit to reach near {destination}"),
+                ("bicycling", "E-Scooter", f"Last mile via e-scooter to {destination}"),
+                ("driving", "Auto/Cab", f"Take an auto or cab to {destination}"),
+            ]
 
-            routes = []
+            def timed_directions(mode, timeout):
+                leg_started = time.perf_counter()
+                try:
+                    leg = get_directions(start_lat, start_lng, dest_lat, dest_lng, mode=mode, timeout=timeout)
+                    return leg, None, (time.perf_counter() - leg_started) * 1000
+                except requests.exceptions.RequestException as e:
+                    return None, e, (time.perf_counter() - leg_started) * 1000
+
+            leg_timeout = max(deadline - time.monotonic(), 0.5)
+            futures = {
+                mode: directions_executor.submit(timed_directions, mode, leg_timeout)
+                for mode, _, _ in leg_specs
+            }
+            wait(futures.values(), timeout=max(deadline - time.monotonic(), 0))
 
-            # Leg 1: Walking route
-            walk_leg = get_directions(start_lat, start_lng, dest_lat, dest_lng, mode="walking")
-            if walk_leg:
-                walk_leg["mode"] = "Walk"
-                walk_leg["details"] = f"Walk from your location to {destination}"
-                routes.append(walk_leg)
-                print(f"✓ Walking route added: {walk_leg['duration']}, {walk_leg['distance']}")
-
-            # Leg 2: Transit (metro/bus) segment
-            transit_leg = get_directions(start_lat, start_lng, dest_lat, dest_lng, mode="transit")
-            if transit_leg:
-                transit_leg["mode"] = "Metro/Bus"
-                transit_leg["details"] = f"Take public transit to reach near {destination}"
-                routes.append(transit_leg)
-                print(f"✓ Transit route added: {transit_leg['duration']}, {transit_leg['distance']}")
-
-            # Leg 3: Bicycling route (as proxy for e-scooter)
-            # Use bicycling mode for better e-scooter route planning
-            scooter_leg = get_directions(start_lat, start_lng, dest_lat, dest_lng, mode="bicycling")
-            if scooter_leg:
-                scooter_leg["mode"] = "E-Scooter"
-                scooter_leg["details"] = f"Last mile via e-scooter to {destination}"
-                routes.append(scooter_leg)
-                print(f"✓ E-scooter route added: {scooter_leg['duration']}, {scooter_leg['distance']}")
-
-            # Leg 4: Auto/Cab (using driving mode)
-            cab_leg = get_directions(start_lat, start_lng, dest_lat, dest_lng, mode="driving")
-            if cab_leg:
-                cab_leg["mode"] = "Auto/Cab"
-                cab_leg["details"] = f"Take an auto or cab to {destination}"
-                routes.append(cab_leg)
-                print(f"✓ Auto/Cab route added: {cab_leg['duration']}, {cab_leg['distance']}")
-
-            print(f"Total routes returned: {len(routes)}")
+            routes = []
+            legs = {}
+            for mode, label, details in leg_specs:
+                future = futures[mode]
+                if not future.done():
+                    # Deadline passed: drop this leg and return what we already have
+                    future.cancel()
+                    legs[mode] = {"status": "timeout", "elapsed_ms": None}
+                    continue
+
+                leg, error, elapsed_ms = future.result()
+                if error is not None:
+                    legs[mode] = {"status": "error", "elapsed_ms": round(elapsed_ms, 1)}
+                elif not leg:
+                    legs[mode] = {"status": "no_route", "elapsed_ms": round(elapsed_ms, 1)}
+                else:
+                    legs[mode] = {"status": "ok", "elapsed_ms": round(elapsed_ms, 1)}
+                    leg["mode"] = label
+                    leg["details"] = details
+                    routes.append(leg)
+
+            timings = {
+                "geocode_ms": round(geocode_ms, 1),
+                "geocode_cached": bool(cached_geo),
+                "total_ms": round((time.perf_counter() - request_started) * 1000, 1),
+                "legs": legs,
+            }
+            partial = any(info["status"] == "timeout" for info in legs.values())
+            trace.tag(legs={mode: info["status"] for mode, info in legs.items()}, routes=len(routes))
             
             if not routes:
+                outcome = "no_routes"
                 return jsonify({
                     "error": "Could not find any routes to destination",
-                    "routes": []
+                    "routes": [],
+                    "partial": partial,
+                    "timings": timings
                 }), 200
 
             return jsonify({
                 "routes": routes,
-                "destination": formatted_address
+                "destination": formatted_address,
+                "partial": partial,
+                "timings": timings
             }), 200
 
         except requests.exceptions.Timeout:
-            print("Request timeout")
+            outcome = "upstream_timeout"
+            trace.mark_failed()
             return jsonify({"error": "Request timeout - Google Maps API not responding"}), 504
         
         except requests.exceptions.RequestException as e:
-            print(f"Request error: {str(e)}")
+            outcome = "upstream_error"
+            trace.mark_failed()
+            trace.tag(error=str(e))
             return jsonify({"error": f"Network error: {str(e)}"}), 503
         
         except Exception as e:
-            print(f"Unexpected error: {str(e)}")
-            traceback.print_exc()
+            outcome = "internal_error"
+            trace.mark_failed()
+            log.exception("last_mile_failed", extra={"fields": {"trace_id": trace.trace_id}})
             return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+        finally:
+            trace.finish(outcome)
     @app.route("/api/nearby_places", methods=["GET", "OPTIONS"])
     def nearby_places():
         # Handle CORS preflight
         if request.method == "OPTIONS":
             return jsonify({"status": "OK"}), 200
 
+        trace = start_trace("nearby_places")
+        outcome = "ok"
         try:
             lat = request.args.get("lat")
             lng = request.args.get("lng")
             radius = request.args.get("radius", 10000)
-
-            print(f"\n=== Nearby Places Request ===")
-            print(f"Latitude: {lat}")
-            print(f"Longitude: {lng}")
-            print(f"Radius: {radius}")
+            trace.tag(location=f"{lat},{lng}", radius=radius)
 
             if not lat or not lng:
-                print("Error: Missing latitude or longitude")
+                outcome = "bad_request"
                 return jsonify({"error": "Latitude and longitude are required."}), 400
 
             # Validate coordinates
@@ -284,67 +388,80 @@ def create_app():
                 if not (-90 <= lat_float <= 90) or not (-180 <= lng_float <= 180):
                     raise ValueError("Invalid coordinate range")
             except ValueError as e:
-                print(f"Error: Invalid coordinates - {e}")
+                outcome = "bad_request"
                 return jsonify({"error": "Invalid latitude or longitude values."}), 400
 
             # Try multiple search strategies to find places
             results = []
             all_results = []
-            search_types = [
-                ("tourist_attraction", "tourist attractions"),
-                ("museum", "museums"),
-                ("park", "parks"),
-                ("art_gallery", "art galleries"),
-                ("zoo", "zoos"),
-                ("amusement_park", "amusement parks"),
-                ("aquarium", "aquariums"),
-                ("shopping_mall", "shopping malls"),
-                ("restaurant", "restaurants"),
-                ("cafe", "cafes"),
-                ("store", "stores"),
-                ("", "all places")
-            ]
+            search_types = NEARBY_SEARCH_TYPES
             
-            # Try each type and collect all results
-            for place_type, type_name in search_types:
-                print(f"Trying {type_name}...")
-                type_results = search_places(lat, lng, radius, place_type)
+            # Dispatch the type queries in parallel but consume them in priority order, so the
+            # result is the same as the serial walk. Queries still queued once we have enough
+            # places are cancelled and never reach Google.
+            pending = list(search_types)
+            in_flight = []
+            seen_ids = set()
+
+            def dispatch():
+                while pending and len(in_flight) < NEARBY_PLACES_FANOUT:
+                    place_type, type_name = pending.pop(0)
+                    in_flight.append((type_name, places_executor.submit(search_places_in_context, lat, lng, radius, place_type, trace)))
+
+            dispatch()
+            while in_flight:
+                type_name, future = in_flight.pop(0)
+                type_results = future.result()
                 if type_results:
-                    print(f"✓ Found {len(type_results)} {type_name}")
                     # Add to all_results, avoid duplicates by place_id
-                    existing_ids = {r.get('place_id') for r in all_results}
                     for result in type_results:
-                        if result.get('place_id') not in existing_ids:
+                        place_id = result.get('place_id')
+                        if place_id not in seen_ids:
+                            seen_ids.add(place_id)
                             all_results.append(result)
-                    
-                    # If we have enough results, stop searching
-                    if len(all_results) >= 20:
-                        break
-                else:
-                    print(f"✗ No {type_name} found")
+
+                # If we have enough results, stop searching
+                if len(all_results) >= NEARBY_PLACES_TARGET:
+                    for _, outstanding in in_flight:
+                        outstanding.cancel()
+                    break
+                dispatch()
             
             results = all_results
-            print(f"\n=== TOTAL RESULTS: {len(results)} ===")
+            trace.tag(types_searched=len(search_types) - len(pending) - len(in_flight), results=len(results))
             
             if not results:
-                print("No places found after all searches")
                 return jsonify({"results": []}), 200
             
             # Limit to 9 places
             limited_results = results[:9]
-            print(f"Returning {len(limited_results)} places")
 
             return jsonify({"results": limited_results}), 200
 
         except Exception as e:
-            print(f"Error: Unexpected exception - {str(e)}")
-            import traceback
-            traceback.print_exc()
+            outcome = "internal_error"
+            trace.mark_failed()
+            log.exception("nearby_places_failed", extra={"fields": {"trace_id": trace.trace_id}})
             return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
-    def search_places(lat, lng, radius, place_type):
+        finally:
+            trace.finish(outcome)
+
+    def search_places_in_context(*args):
+        # Worker threads need their own app context for the tile cache's DB tier
+        with app.app_context():
+            return search_places(*args)
+
+    def search_places(lat, lng, radius, place_type, trace=None):
         """Helper function to search places using Google Places API"""
         try:
+            lat, lng, radius = float(lat), float(lng), int(float(radius))
+
+            # Users a few metres apart share a tile, so most lookups never leave the process
+            cached = places_cache.get(lat, lng, radius, place_type)
+            if cached is not None:
+                return cached
+
             # Use Nearby Search API with multiple types
             url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
             
@@ -358,33 +475,26 @@ def create_app():
             if place_type:
                 params["type"] = place_type
 
-            print(f"Searching nearby places with type: {place_type or 'all'}")
-            
-            response = requests.get(url, params=params, timeout=10)
-            
-            if response.status_code != 200:
-                print(f"API Error: {response.status_code} - {response.text}")
-                return []
-
-            data = response.json()
-            
-            if data.get("status") == "OK":
-                results = data.get("results", [])
-                print(f"Found {len(results)} results")
-                return results
-            elif data.get("status") == "ZERO_RESULTS":
-                print("No results found")
-                return []
-            elif data.get("status") == "REQUEST_DENIED":
-                print(f"Request denied: {data.get('error_message')}")
-                # This means the old API is also blocked, need to enable it
-                return []
-            else:
-                print(f"API Status: {data.get('status')} - {data.get('error_message', 'No error message')}")
-                return []
+            with span("places", target=place_type or "all", trace=trace) as places_span:
+                response = maps_client.get(url, params=params, timeout=10)
+                if response.status_code != 200:
+                    places_span.fail(f"http_{response.status_code}")
+                    return []
+
+                data = response.json()
+                if data.get("status") not in ("OK", "ZERO_RESULTS"):
+                    # REQUEST_DENIED means the Places API is not enabled for this key
+                    places_span.fail(data.get("status", "unknown"))
+                    places_span.tag(error_message=data.get("error_message"))
+                    return []
+                places_span.tag(results=len(data.get("results", [])))
+
+            results = data.get("results", []) if data.get("status") == "OK" else []
+            places_cache.set(lat, lng, radius, place_type, results)
+            return results
                 
         except Exception as e:
-            print(f"Search error: {str(e)}")
+            log_event("places_search_failed", level=logging.WARNING, place_type=place_type or "all", error=str(e))
             return []
 
     @app.route("/test")
@@ -396,6 +506,56 @@ def create_app():
             "timestamp": datetime.now().isoformat()
         })
 
+    @app.route("/metrics")
+    def prometheus_metrics():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    @app.route("/api/cache_stats")
+    def cache_stats():
+        """Hit/miss counters for the upstream caches"""
+        return jsonify({
+            "geocode": geocode_cache.stats(),
+            "routes": route_cache.stats(),
+            "distance_matrix": distance_matrix.stats(),
+            "maps_client": maps_client.stats(),
+            "places": places_cache.stats(),
+            "llm_responses": response_cache.stats(),
+            "llm_engines": llm_router.stats(),
+            "itineraries": itinerary_store.stats(),
+            "identities": identity_cache.stats(),
+            "passwords": password_service.stats(),
+            "destinations": destination_cache.stats(),
+            "autocomplete": autocomplete_index.stats(),
+            "feedback_writer": feedback_writer.stats()
+        })
+
+    @app.cli.command("warm-places")
+    @click.option("--min-lat", type=float, required=True)
+    @click.option("--min-lng", type=float, required=True)
+    @click.option("--max-lat", type=float, required=True)
+    @click.option("--max-lng", type=float, required=True)
+    @click.option("--radius", type=int, default=10000, show_default=True, help="Search radius in metres")
+    @click.option("--types", default=None, help="Comma-separated place types (default: all nearby search types)")
+    def warm_places(min_lat, min_lng, max_lat, max_lng, radius, types):
+        """Pre-populate the nearby-places tile cache for a bounding box of the service area."""
+        place_types = types.split(",") if types else [place_type for place_type, _ in NEARBY_SEARCH_TYPES]
+        tile_meters = places_cache.tile_meters
+        row_min, _ = grid_cell(min_lat, min_lng, tile_meters)
+        row_max, _ = grid_cell(max_lat, min_lng, tile_meters)
+
+        warmed = 0
+        for row in range(row_min, row_max + 1):
+            # cells are narrower in degrees of longitude near the poles, so resolve columns per row
+            row_lat, _ = cell_center(row, 0, tile_meters)
+            _, col_min = grid_cell(row_lat, min_lng, tile_meters)
+            _, col_max = grid_cell(row_lat, max_lng, tile_meters)
+            for col in range(col_min, col_max + 1):
+                tile_lat, tile_lng = cell_center(row, col, tile_meters)
+                for place_type in place_types:
+                    search_places(tile_lat, tile_lng, radius, place_type)
+                warmed += 1
+        click.echo(f"Warmed {warmed} tiles x {len(place_types)} types at radius {radius} m")
+
     @app.route("/test_places_api")
     def test_places_api():
         """Test if Places API is working"""
@@ -412,7 +572,7 @@ def create_app():
                 "key": GOOGLE_MAPS_API_KEY
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = maps_client.get(url, params=params, timeout=10)
             data = response.json()
             
             return jsonify({
@@ -440,19 +600,59 @@ def create_app():
             response = jsonify({'status': 'OK'})
             response.headers.add("Access-Control-Allow-Origin", "*")
             response.headers.add("Access-Control-Allow-Methods", "POST, OPTIONS")
-            response.headers.add("Access-Control-Allow-Headers", "Content-Type")
+            response.headers.add("Access-Control-Allow-Headers", f"Content-Type, {BYPASS_HEADER}")
             return response, 200
 
+        data = request.get_json(silent=True) or {}
+        user_input = data.get('input', '')
+        stream = bool(data.get('stream')) or "text/event-stream" in request.headers.get("Accept", "")
+
+        # Near-identical prompts are answered from the response cache unless the client bypasses it
+        cached = None if bypass_requested(request.headers) else response_cache.get(user_input, LLM_MODEL_NAME)
+        cache_status = "HIT" if cached is not None else "MISS"
+
+        if stream:
+            def generate_events():
+                # Server-Sent Events: one "data:" message per chunk as Gemini produces it
+                if cached is not None:
+                    yield f"data: {json.dumps({'text': cached})}\n\n"
+                    yield "event: done\ndata: {}\n\n"
+                    return
+                chunks = []
+                model = None
+                try:
+                    for text, model in generate_stream(user_input):
+                        chunks.append(text)
+                        yield f"data: {json.dumps({'text': text})}\n\n"
+                except Exception as e:
+                    log_event("chat_stream_failed", level=logging.ERROR, error=str(e))
+                    yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+                    return
+                if model == LLM_MODEL_NAME:
+                    response_cache.set(user_input, LLM_MODEL_NAME, "".join(chunks))
+                yield "event: done\ndata: {}\n\n"
+
+            return Response(
+                stream_with_context(generate_events()),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Cache": cache_status}
+            )
+
+        if cached is not None:
+            return jsonify({"response": cached}), 200, {"X-Cache": cache_status}
+
         try:
-            data = request.get_json()
-            user_input = data.get('input', '')
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            result = model.generate_content(user_input)
-            return jsonify({"response": result.text}), 200
+            text, model = generate(user_input)
+        except ChatBusyError as e:
+            return jsonify({"error": str(e)}), 503
         except Exception as e:
-            print(f"Chat error: {str(e)}")
+            log_event("chat_failed", level=logging.ERROR, error=str(e))
             return jsonify({"error": str(e)}), 500
 
+        if model == LLM_MODEL_NAME:
+            response_cache.set(user_input, LLM_MODEL_NAME, text)
+        return jsonify({"response": text}), 200, {"X-Cache": cache_status}
+
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(destinations_bp, url_prefix="/destinations")
@@ -467,6 +667,9 @@ def create_app():
     from routes.feedback import feedback_bp
     app.register_blueprint(feedback_bp, url_prefix="/feedback")
 
+    from routes.trips import trips_bp
+    app.register_blueprint(trips_bp, url_prefix="/trips")
+
     return app
 
 if __name__ == "__main__":
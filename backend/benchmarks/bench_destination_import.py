@@ -0,0 +1,84 @@
+"""
+Benchmark bulk destination import throughput (rows/sec).
+
+Generates an NDJSON catalog in memory and loads it through import_destinations() at several
+batch sizes, truncating the table between runs. A per-row baseline (one INSERT and one commit
+per destination, what add_destination does) runs on a smaller sample for comparison.
+
+    python benchmarks/bench_destination_import.py                      # SQLite scratch file
+    python benchmarks/bench_destination_import.py --url postgresql+psycopg2://user:pw@localhost/bench
+    python benchmarks/bench_destination_import.py --rows 500000 --batch-sizes 500 2000 10000
+
+Use a throwaway database: the destination table is emptied. On SQLite the FTS5 triggers from
+the search index fire for every row, as they would in production. The app is created normally,
+so the usual .env keys must be available.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def catalog(rows):
+    buffer = io.BytesIO()
+    for i in range(rows):
+        buffer.write(json.dumps({
+            "name": f"Destination {i}",
+            "description": f"A place worth visiting near landmark {i % 977}",
+            "location": f"City {i % 500}",
+        }).encode("utf-8") + b"\n")
+    buffer.seek(0)
+    return buffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="database URL (default: a scratch SQLite file)")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--baseline-rows", type=int, default=2000, help="rows for the per-row baseline")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_import.db')}"
+    os.environ.setdefault("TRACE_SAMPLE_RATE", "0")
+
+    from app import create_app  # noqa: E402  (reads DATABASE_URL)
+    from extensions import db
+    from models.destination import Destination
+    from utils.destination_import import import_destinations, iter_records
+
+    app = create_app()
+    with app.app_context():
+        print(f"Backend: {db.engine.dialect.name}")
+        print(f"{'mode':<16}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+
+        def truncate():
+            db.session.query(Destination).delete()
+            db.session.commit()
+
+        truncate()
+        started = time.perf_counter()
+        for i in range(args.baseline_rows):
+            db.session.add(Destination(name=f"Destination {i}", description="A place", location="City"))
+            db.session.commit()
+        elapsed = time.perf_counter() - started
+        print(f"{'per-row commit':<16}{args.baseline_rows:>10,}{elapsed:>10.2f}{args.baseline_rows / elapsed:>12,.0f}")
+
+        for batch_size in args.batch_sizes:
+            truncate()
+            data = catalog(args.rows)
+            started = time.perf_counter()
+            summary = import_destinations(iter_records(data, "ndjson"), batch_size)
+            elapsed = time.perf_counter() - started
+            label = f"batch {batch_size}"
+            print(f"{label:<16}{summary['imported']:>10,}{elapsed:>10.2f}{summary['imported'] / elapsed:>12,.0f}")
+        truncate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark peak RSS of listing the destinations table.
+
+Seeds a scratch SQLite database with 1M destinations, then reads the whole table through
+GET /destinations/ in a fresh child process per mode, reporting wall time and peak RSS growth
+over the idle app:
+
+    all     one query, every row as an ORM object, one json.dumps (the old get_destinations)
+    pages   walk the keyset pages (?limit=1000&after=...)
+    ndjson  consume ?format=ndjson chunk by chunk from the server-side cursor
+
+    python benchmarks/bench_export_memory.py
+    python benchmarks/bench_export_memory.py --rows 200000 --modes pages ndjson
+
+The app is created normally, so the usual .env keys must be available.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+MODES = ("all", "pages", "ndjson")
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def seed(url, rows, batch=50000):
+    from sqlalchemy import create_engine
+    from models.destination import Destination
+
+    engine = create_engine(url)
+    Destination.__table__.drop(engine, checkfirst=True)
+    Destination.__table__.create(engine)
+    with engine.begin() as conn:
+        for start in range(0, rows, batch):
+            conn.execute(Destination.__table__.insert(), [
+                {"name": f"Destination {i}", "description": "A place worth visiting " * 4, "location": f"City {i % 500}"}
+                for i in range(start, min(start + batch, rows))
+            ])
+
+
+def run_mode(mode):
+    """Child process: read the whole table through the endpoint and report stats as JSON."""
+    from app import create_app
+    from models.destination import Destination
+    from extensions import db
+
+    app = create_app()
+    client = app.test_client()
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    count = 0
+
+    if mode == "all":
+        with app.app_context():
+            destinations = Destination.query.all()
+            body = json.dumps([d.to_dict() for d in destinations])
+            count = len(destinations)
+            del destinations, body
+            db.session.remove()
+    elif mode == "pages":
+        after = None
+        while True:
+            query = {"limit": 1000} if after is None else {"limit": 1000, "after": after}
+            resp = client.get("/destinations/", query_string=query)
+            count += len(resp.get_json())
+            after = resp.headers.get("X-Next-After")
+            if after is None:
+                break
+    else:
+        resp = client.get("/destinations/", query_string={"format": "ndjson"})
+        for chunk in resp.iter_encoded():
+            count += chunk.count(b"\n")
+
+    print(json.dumps({
+        "mode": mode,
+        "rows": count,
+        "seconds": time.perf_counter() - started,
+        "peak_rss_growth_mb": peak_rss_mb() - baseline,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_mode(args.child)
+        return
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_export.db")
+    url = f"sqlite:///{db_path}"
+    started = time.perf_counter()
+    seed(url, args.rows)
+    print(f"Seeded {args.rows:,} destinations in {time.perf_counter() - started:.1f}s")
+
+    env = {**os.environ, "DATABASE_URL": url, "TRACE_SAMPLE_RATE": "0"}
+    print(f"{'mode':<8}{'rows':>10}{'seconds':>10}{'peak RSS +MB':>14}")
+    for mode in args.modes:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", mode],
+            env=env, cwd=BACKEND, capture_output=True, text=True, check=True,
+        ).stdout
+        stats = json.loads(out.strip().splitlines()[-1])
+        print(f"{stats['mode']:<8}{stats['rows']:>10,}{stats['seconds']:>10.1f}{stats['peak_rss_growth_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
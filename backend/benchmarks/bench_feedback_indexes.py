@@ -0,0 +1,200 @@
+"""
+Benchmark the lookups behind migration 5c2e8f1a9b3d, using the statements the app runs.
+
+Seeds local_route_feedback (1M rows by default) and trips into a scratch database, then times:
+
+- my_trips: the first keyset page and a cursor page, exactly as routes/trips.py builds them,
+  before and after ix_trips_user_id_created_at;
+- /travel/options feedback: the route_feedback_stats primary-key lookup it runs today, next to
+  the raw local_route_feedback aggregate it replaced (for scale; the app no longer runs it).
+
+Every query runs once untimed before measuring, so the first plan's cold page cache is not
+charged to the "before" column.
+
+    python benchmarks/bench_feedback_indexes.py                       # SQLite scratch file
+    python benchmarks/bench_feedback_indexes.py --url postgresql+psycopg2://user:pw@localhost/bench
+
+Use a throwaway database: the benchmark tables are dropped and recreated.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, create_engine, func, insert, or_, select, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db  # noqa: E402
+from models.user_model import User  # noqa: E402,F401  (trips.user_id references it)
+from models.transport_mode import TransportMode  # noqa: E402,F401
+from models.local_route_feedback import LocalRouteFeedback  # noqa: E402
+from models.route_feedback_stats import RouteFeedbackStats  # noqa: E402
+from models.trip_model import Trip  # noqa: E402
+
+AREAS = 400
+MODES = 6
+PAGE = 100
+# queries the migration's trips index is for; the others are timed for scale only
+INDEXED = {"my_trips first page", "my_trips cursor page"}
+
+
+def seed(engine, rows, trips, users, batch=50000):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    feedback = LocalRouteFeedback.__table__
+    with engine.begin() as conn:
+        conn.execute(TransportMode.__table__.insert(), [{"id": i, "name": f"mode{i}"} for i in range(1, MODES + 1)])
+        for start in range(0, rows, batch):
+            conn.execute(feedback.insert(), [
+                {
+                    "origin": f"area-{rng.randrange(AREAS)}",
+                    "destination": f"area-{rng.randrange(AREAS)}",
+                    "mode_id": rng.randint(1, MODES),
+                    "rating": rng.randint(1, 5),
+                    "votes": 1,
+                    "created_at": now - timedelta(minutes=start + i),
+                }
+                for i in range(min(batch, rows - start))
+            ])
+        # what rebuild_route_stats() writes
+        aggregate = select(
+            LocalRouteFeedback.origin,
+            LocalRouteFeedback.destination,
+            LocalRouteFeedback.mode_id,
+            func.count(LocalRouteFeedback.id),
+            func.sum(LocalRouteFeedback.votes),
+            func.sum(LocalRouteFeedback.rating),
+        ).group_by(LocalRouteFeedback.origin, LocalRouteFeedback.destination, LocalRouteFeedback.mode_id)
+        conn.execute(insert(RouteFeedbackStats).from_select(
+            ["origin", "destination", "mode_id", "num_entries", "total_votes", "rating_sum"], aggregate
+        ))
+        for start in range(0, trips, batch):
+            conn.execute(Trip.__table__.insert(), [
+                {
+                    "user_id": rng.randint(1, users),
+                    "destinations": ["Mysore Palace"],
+                    "created_at": now - timedelta(minutes=start + i),
+                }
+                for i in range(min(batch, trips - start))
+            ])
+
+
+def trip_page(uid, anchor=None):
+    """The my_trips statement: newest first, keyset on (created_at, id)."""
+    conditions = [Trip.user_id == uid]
+    if anchor is not None:
+        created_at, trip_id = anchor
+        conditions.append(or_(Trip.created_at < created_at, and_(Trip.created_at == created_at, Trip.id < trip_id)))
+    return (
+        select(Trip.id, Trip.destinations, Trip.estimated_cost, Trip.created_at)
+        .where(*conditions)
+        .order_by(Trip.created_at.desc(), Trip.id.desc())
+        .limit(PAGE + 1)
+    )
+
+
+def queries(conn, rng, users):
+    uid = rng.randint(1, users)
+    # the cursor the second request of a paged read sends: the last trip of the first page
+    anchor = conn.execute(
+        select(Trip.created_at, Trip.id).where(Trip.user_id == uid)
+        .order_by(Trip.created_at.desc(), Trip.id.desc()).offset(PAGE - 1).limit(1)
+    ).first()
+    origin, destination = f"area-{rng.randrange(AREAS)}", f"area-{rng.randrange(AREAS)}"
+    return {
+        "my_trips first page": trip_page(uid),
+        "my_trips cursor page": trip_page(uid, tuple(anchor) if anchor else None),
+        "travel_options stats lookup": select(RouteFeedbackStats).where(
+            RouteFeedbackStats.origin == origin, RouteFeedbackStats.destination == destination
+        ),
+        "raw feedback aggregate (replaced)": (
+            select(
+                LocalRouteFeedback.mode_id,
+                func.avg(LocalRouteFeedback.rating),
+                func.sum(LocalRouteFeedback.votes),
+                func.count(LocalRouteFeedback.id),
+            )
+            .where(LocalRouteFeedback.origin == origin, LocalRouteFeedback.destination == destination)
+            .group_by(LocalRouteFeedback.mode_id)
+        ),
+    }
+
+
+def explain(conn, stmt):
+    compiled = stmt.compile(conn, compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    rows = conn.execute(text(prefix + str(compiled))).fetchall()
+    return [str(row[-1]) for row in rows]
+
+
+def measure(engine, repeat, users):
+    results = {}
+    rng = random.Random(7)
+    with engine.connect() as conn:
+        for name, stmt in queries(conn, rng, users).items():
+            results[name] = {"plan": explain(conn, stmt)}
+            conn.execute(stmt).fetchall()  # warm up
+        timings = {name: 0.0 for name in results}
+        for _ in range(repeat):
+            for name, stmt in queries(conn, rng, users).items():
+                started = time.perf_counter()
+                conn.execute(stmt).fetchall()
+                timings[name] += time.perf_counter() - started
+        for name in results:
+            results[name]["avg_ms"] = timings[name] / repeat * 1000
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite:///bench_feedback.db")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="feedback rows to seed")
+    parser.add_argument("--trips", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50, help="timed runs per query")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    tables = [
+        User.__table__, TransportMode.__table__, LocalRouteFeedback.__table__,
+        RouteFeedbackStats.__table__, Trip.__table__,
+    ]
+    db.metadata.drop_all(engine, tables=tables)
+    db.metadata.create_all(engine, tables=tables)
+    indexes = list(Trip.__table__.indexes)
+    for index in indexes:
+        index.drop(engine)
+
+    started = time.perf_counter()
+    seed(engine, args.rows, args.trips, args.users)
+    print(f"Seeded {args.rows:,} feedback rows and {args.trips:,} trips in {time.perf_counter() - started:.1f}s")
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+    before = measure(engine, args.repeat, args.users)
+
+    started = time.perf_counter()
+    for index in indexes:
+        index.create(engine)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+    print(f"Created {', '.join(index.name for index in indexes)} in {time.perf_counter() - started:.1f}s")
+    after = measure(engine, args.repeat, args.users)
+
+    for name in before:
+        print(f"\n=== {name} ===")
+        if name not in INDEXED:
+            print(f"avg:    {after[name]['avg_ms']:9.3f} ms   plan: {' | '.join(after[name]['plan'])}")
+            continue
+        print(f"before: {before[name]['avg_ms']:9.3f} ms   plan: {' | '.join(before[name]['plan'])}")
+        print(f"after:  {after[name]['avg_ms']:9.3f} ms   plan: {' | '.join(after[name]['plan'])}")
+        print(f"speedup: {before[name]['avg_ms'] / max(after[name]['avg_ms'], 1e-6):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark /auth/login throughput at different password-hashing costs.
+
+For each scheme/cost pair the benchmark stores a user hashed at that cost in a scratch SQLite
+database, then hammers /auth/login from concurrent client threads for a fixed duration and
+prints logins per second and latency percentiles. The password service is reconfigured to the
+same cost so no rehash happens during the run.
+
+    python benchmarks/bench_login_throughput.py
+    python benchmarks/bench_login_throughput.py --scheme bcrypt --costs 10 11 12 13 --clients 32
+    python benchmarks/bench_login_throughput.py --scheme pbkdf2 --costs 100000 300000 600000
+
+Pool size is read from PASSWORD_VERIFY_WORKERS / PASSWORD_QUEUE_SIZE at import time. Logins the
+pool turns away with a 503 (more clients than workers plus queue slots) count as failures; set
+PASSWORD_QUEUE_WAIT_SECONDS to let them wait for a slot instead.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_COSTS = {"bcrypt": [10, 11, 12, 13], "pbkdf2": [100000, 300000, 600000], "scrypt": [2 ** 14, 2 ** 15]}
+
+
+def run(client, clients, duration):
+    latencies = []
+    failures = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def worker():
+        local = []
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            resp = client.post("/auth/login", json={"username": "bench", "password": "correct horse"})
+            local.append(time.perf_counter() - started)
+            if resp.status_code != 200:
+                with lock:
+                    failures[0] += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, failures[0], time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scheme", choices=sorted(DEFAULT_COSTS), default="bcrypt")
+    parser.add_argument("--costs", type=int, nargs="+", help="bcrypt log rounds or pbkdf2/scrypt cost")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per cost setting")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_login.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from app import create_app  # noqa: E402  (reads DATABASE_URL)
+    from extensions import db
+    from models.user_model import User
+    from utils.passwords import make_hasher, password_service
+
+    app = create_app()
+    client = app.test_client()
+
+    print(f"{'scheme':<8}{'cost':>10}{'logins/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'errors':>8}")
+    for cost in args.costs or DEFAULT_COSTS[args.scheme]:
+        password_service.configure(args.scheme, cost)
+        hashed = make_hasher(args.scheme, cost).hash("correct horse")
+        with app.app_context():
+            User.query.filter_by(username="bench").delete()
+            db.session.add(User(username="bench", email="bench@example.com", password=hashed))
+            db.session.commit()
+
+        latencies, errors, elapsed = run(client, args.clients, args.duration)
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+        print(
+            f"{args.scheme:<8}{cost:>10}{len(latencies) / elapsed:>12.1f}"
+            f"{statistics.median(latencies) * 1000 if latencies else 0:>10.1f}"
+            f"{p95 * 1000:>10.1f}{(latencies[-1] if latencies else 0) * 1000:>10.1f}{errors:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
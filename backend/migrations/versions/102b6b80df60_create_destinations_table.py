@@ -7,7 +7,7 @@ Create Date: 2025-08-18 19:54:40.038158
 """
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy.dialects import postgresql
+
 
 # revision identifiers, used by Alembic.
 revision = '102b6b80df60'
@@ -16,38 +16,14 @@ branch_labels = None
 depends_on = None
 
 
+# This revision was autogenerated against a stale database and dropped the users,
+# destinations and token_blocklist tables on upgrade. The tables themselves are created by
+# db.create_all() at startup, so it is kept only as the base of the revision history and
+# no longer touches the schema in either direction.
+
 def upgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_table('users')
-    op.drop_table('destinations')
-    op.drop_table('token_blocklist')
-    # ### end Alembic commands ###
+    pass
 
 
 def downgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.create_table('token_blocklist',
-    sa.Column('id', sa.INTEGER(), autoincrement=True, nullable=False),
-    sa.Column('jti', sa.VARCHAR(length=36), autoincrement=False, nullable=False),
-    sa.Column('created_at', postgresql.TIMESTAMP(), autoincrement=False, nullable=True),
-    sa.PrimaryKeyConstraint('id', name=op.f('token_blocklist_pkey'))
-    )
-    op.create_table('destinations',
-    sa.Column('id', sa.INTEGER(), autoincrement=True, nullable=False),
-    sa.Column('name', sa.VARCHAR(length=100), autoincrement=False, nullable=False),
-    sa.Column('city', sa.VARCHAR(length=100), autoincrement=False, nullable=False),
-    sa.Column('country', sa.VARCHAR(length=100), autoincrement=False, nullable=False),
-    sa.Column('category', sa.VARCHAR(length=50), autoincrement=False, nullable=True),
-    sa.Column('description', sa.TEXT(), autoincrement=False, nullable=True),
-    sa.PrimaryKeyConstraint('id', name=op.f('destinations_pkey'))
-    )
-    op.create_table('users',
-    sa.Column('id', sa.INTEGER(), autoincrement=True, nullable=False),
-    sa.Column('username', sa.VARCHAR(length=50), autoincrement=False, nullable=False),
-    sa.Column('email', sa.VARCHAR(length=100), autoincrement=False, nullable=False),
-    sa.Column('password', sa.VARCHAR(length=200), autoincrement=False, nullable=False),
-    sa.PrimaryKeyConstraint('id', name=op.f('users_pkey')),
-    sa.UniqueConstraint('email', name=op.f('users_email_key'), postgresql_include=[], postgresql_nulls_not_distinct=False),
-    sa.UniqueConstraint('username', name=op.f('users_username_key'), postgresql_include=[], postgresql_nulls_not_distinct=False)
-    )
-    # ### end Alembic commands ###
+    pass
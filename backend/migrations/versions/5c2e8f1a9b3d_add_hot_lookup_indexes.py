@@ -0,0 +1,48 @@
+"""add composite indexes for hot lookup columns
+
+Revision ID: 5c2e8f1a9b3d
+Revises: 102b6b80df60
+Create Date: 2026-10-17 10:12:31.482910
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2e8f1a9b3d'
+down_revision = '102b6b80df60'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    # local_route_feedback gets none: /travel/options reads route_feedback_stats by primary key,
+    # and the only query on the raw table is the full rebuild, which scans it anyway
+    # my_trips: WHERE user_id = ? ORDER BY created_at DESC, id DESC (keyset pages)
+    ("ix_trips_user_id_created_at", "trips", ["user_id", "created_at"]),
+    ("ix_feedback_user_id_trip_id", "feedback", ["user_id", "trip_id"]),
+    ("ix_feedback_trip_id", "feedback", ["trip_id"]),
+]
+
+
+def _existing_indexes(inspector, table):
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    # db.create_all() already builds these on fresh databases, and some tables only exist
+    # once their blueprint has been used, so skip whatever is missing or already there.
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, columns in INDEXES:
+        if table in tables and name not in _existing_indexes(inspector, table):
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, _ in reversed(INDEXES):
+        if table in tables and name in _existing_indexes(inspector, table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,68 @@
+"""store trip destinations as native JSON
+
+Revision ID: 8d41c7e2a6f0
+Revises: 5c2e8f1a9b3d
+Create Date: 2026-10-17 14:03:52.117604
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41c7e2a6f0'
+down_revision = '5c2e8f1a9b3d'
+branch_labels = None
+depends_on = None
+
+
+def _as_list(value):
+    # rows were written as json.dumps(list) or as whatever string the frontend sent
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = value.strip()
+    return value if isinstance(value, list) else [value]
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "trips" not in inspector.get_table_names():
+        return
+    column = next(c for c in inspector.get_columns("trips") if c["name"] == "destinations")
+    if isinstance(column["type"], postgresql.JSONB):
+        return  # created by db.create_all() with the new model
+
+    rows = bind.execute(sa.text("SELECT id, destinations FROM trips")).fetchall()
+    values = [{"id": row.id, "d": json.dumps(_as_list(row.destinations))} for row in rows]
+
+    if bind.dialect.name == "postgresql":
+        op.add_column("trips", sa.Column("destinations_json", postgresql.JSONB(), nullable=True))
+        if values:
+            bind.execute(sa.text("UPDATE trips SET destinations_json = CAST(:d AS JSONB) WHERE id = :id"), values)
+        op.drop_column("trips", "destinations")
+        op.alter_column("trips", "destinations_json", new_column_name="destinations", nullable=False)
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_trips_destinations_gin "
+            "ON trips USING gin (destinations jsonb_path_ops)"
+        )
+    elif values:
+        # SQLite keeps JSON as text; make every row valid JSON so json_each() can read it
+        bind.execute(sa.text("UPDATE trips SET destinations = :d WHERE id = :id"), values)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if "trips" not in sa.inspect(bind).get_table_names():
+        return
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_trips_destinations_gin")
+        op.alter_column(
+            "trips", "destinations",
+            type_=sa.Text(), postgresql_using="destinations::text", existing_nullable=False,
+        )
@@ -0,0 +1,62 @@
+"""full-text search index on destinations
+
+Revision ID: b7e3f9a1c2d4
+Revises: 8d41c7e2a6f0
+Create Date: 2026-10-17 16:41:08.530219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3f9a1c2d4'
+down_revision = '8d41c7e2a6f0'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS destination_fts USING fts5("
+    "name, description, location, content='destination', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS destination_fts_ai AFTER INSERT ON destination BEGIN "
+    "INSERT INTO destination_fts(rowid, name, description, location) "
+    "VALUES (new.id, new.name, new.description, new.location); END",
+    "CREATE TRIGGER IF NOT EXISTS destination_fts_ad AFTER DELETE ON destination BEGIN "
+    "INSERT INTO destination_fts(destination_fts, rowid, name, description, location) "
+    "VALUES ('delete', old.id, old.name, old.description, old.location); END",
+    "CREATE TRIGGER IF NOT EXISTS destination_fts_au AFTER UPDATE ON destination BEGIN "
+    "INSERT INTO destination_fts(destination_fts, rowid, name, description, location) "
+    "VALUES ('delete', old.id, old.name, old.description, old.location); "
+    "INSERT INTO destination_fts(rowid, name, description, location) "
+    "VALUES (new.id, new.name, new.description, new.location); END",
+    "INSERT INTO destination_fts(destination_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    if "destination" not in sa.inspect(bind).get_table_names():
+        return
+    if bind.dialect.name == "postgresql":
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_destination_search ON destination USING gin (({SEARCH_VECTOR_SQL}))")
+    elif bind.dialect.name == "sqlite":
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_destination_search")
+    elif bind.dialect.name == "sqlite":
+        for trigger in ("destination_fts_ai", "destination_fts_ad", "destination_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS destination_fts")
@@ -1,11 +1,15 @@
 from datetime import datetime
-from app import db
+from extensions import db
 
 class Feedback(db.Model):
     __tablename__ = "feedback"
+    __table_args__ = (
+        db.Index("ix_feedback_user_id_trip_id", "user_id", "trip_id"),
+        db.Index("ix_feedback_trip_id", "trip_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     trip_id = db.Column(db.Integer, db.ForeignKey("trips.id"), nullable=True)
     rating = db.Column(db.Integer, nullable=False)  # 1-5
     comments = db.Column(db.Text, nullable=True)
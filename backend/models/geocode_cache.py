@@ -0,0 +1,20 @@
+from datetime import datetime
+from extensions import db
+
+
+class GeocodeCacheEntry(db.Model):
+    __tablename__ = "geocode_cache"
+
+    # normalized destination string (unquoted, case-folded, whitespace-collapsed)
+    key = db.Column(db.String(255), primary_key=True)
+    lat = db.Column(db.Float, nullable=False)
+    lng = db.Column(db.Float, nullable=False)
+    formatted_address = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "lat": self.lat,
+            "lng": self.lng,
+            "formatted_address": self.formatted_address,
+        }
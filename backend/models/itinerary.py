@@ -0,0 +1,22 @@
+import json
+from datetime import datetime
+from extensions import db
+
+
+class Itinerary(db.Model):
+    __tablename__ = "itineraries"
+
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of the normalized trip parameters
+    params = db.Column(db.Text, nullable=False)  # JSON of the normalized trip parameters
+    model = db.Column(db.String(80), nullable=False)
+    raw_text = db.Column(db.Text, nullable=False)
+    itinerary = db.Column(db.Text, nullable=False)  # JSON of the parsed days/budget/tips
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "trip": json.loads(self.params),
+            "itinerary": json.loads(self.itinerary),
+            "raw_text": self.raw_text,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
@@ -0,0 +1,12 @@
+from datetime import datetime
+from extensions import db
+
+
+class LLMResponse(db.Model):
+    __tablename__ = "llm_responses"
+
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of model name + normalized prompt
+    model = db.Column(db.String(80), nullable=False)
+    prompt = db.Column(db.Text, nullable=False)
+    response = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
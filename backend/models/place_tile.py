@@ -0,0 +1,17 @@
+from datetime import datetime
+from extensions import db
+
+
+class PlaceTile(db.Model):
+    __tablename__ = "place_tiles"
+    __table_args__ = (
+        db.UniqueConstraint("tile_row", "tile_col", "radius", "place_type", name="uq_place_tile"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    tile_row = db.Column(db.Integer, nullable=False)
+    tile_col = db.Column(db.Integer, nullable=False)
+    radius = db.Column(db.Integer, nullable=False)  # metres
+    place_type = db.Column(db.String(50), nullable=False, default="")  # "" means all places
+    results = db.Column(db.Text, nullable=False)  # JSON list of Places API results
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,31 @@
+from datetime import datetime
+from extensions import db
+
+
+class ReferenceVersion(db.Model):
+    """Change counter per reference table; bumped on every write so process-local copies can reload."""
+
+    __tablename__ = "reference_versions"
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def current(cls, name, drift):
+        """(counter, drift value) for a reference table.
+
+        ``drift`` is a scalar query such as a row count or max(id); it catches rows inserted or
+        deleted outside the app (e.g. seed.sql), which never bump the counter.
+        """
+        row = db.session.get(cls, name)
+        return (row.version if row else 0, drift.scalar() or 0)
+
+    @classmethod
+    def bump(cls, name):
+        """Record a change to a reference table; processes holding a copy reload. Caller commits."""
+        row = db.session.get(cls, name)
+        if row is None:
+            row = cls(name=name, version=0)
+            db.session.add(row)
+        row.version = (row.version or 0) + 1
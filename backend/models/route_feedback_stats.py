@@ -0,0 +1,18 @@
+from extensions import db
+
+
+class RouteFeedbackStats(db.Model):
+    """Running totals of LocalRouteFeedback per (origin, destination, mode)."""
+
+    __tablename__ = "route_feedback_stats"
+
+    origin = db.Column(db.String(120), primary_key=True)
+    destination = db.Column(db.String(120), primary_key=True)
+    mode_id = db.Column(db.Integer, db.ForeignKey("transport_modes.id"), primary_key=True)
+    num_entries = db.Column(db.Integer, nullable=False, default=0)
+    total_votes = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+
+    @property
+    def avg_rating(self):
+        return self.rating_sum / self.num_entries if self.num_entries else 0.0
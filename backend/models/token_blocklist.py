@@ -0,0 +1,11 @@
+from datetime import datetime
+from extensions import db
+
+
+class TokenBlocklist(db.Model):
+    __tablename__ = "token_blocklist"
+
+    id = db.Column(db.Integer, primary_key=True)
+    # the token's jti claim, or a sha256 of the raw token for tokens issued without one
+    jti = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
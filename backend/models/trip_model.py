@@ -1,14 +1,30 @@
 from datetime import datetime
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects.postgresql import JSONB
 from extensions import db
 
 class Trip(db.Model):
     __tablename__ = "trips"
+    __table_args__ = (
+        db.Index("ix_trips_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
-    # JSON string of destinations (simple for MVP); switch to JSONB on Postgres if needed
-    destinations = db.Column(db.Text, nullable=False)
+    # list of destination names; JSONB on Postgres, JSON1-backed text on SQLite
+    destinations = db.Column(db.JSON().with_variant(JSONB(), "postgresql"), nullable=False)
     estimated_cost = db.Column(db.Float, nullable=True)
     start_date = db.Column(db.DateTime, nullable=True)
     end_date = db.Column(db.DateTime, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# GIN index for "trips that include destination X" (destinations @> '["X"]'); Postgres only
+event.listen(
+    Trip.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_trips_destinations_gin "
+        "ON trips USING gin (destinations jsonb_path_ops)"
+    ).execute_if(dialect="postgresql"),
+)
@@ -1,10 +1,91 @@
 # api.py
-from flask import Blueprint, request, jsonify
-import google.generativeai as genai
+import json
+import logging
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from utils.llm import LLM_MODEL_NAME, ChatBusyError, generate, generate_stream
+from utils.response_cache import bypass_requested
+from utils.telemetry import log_event
+from utils.itinerary import (
+    normalize_trip_params, trip_key, build_prompt, parse_itinerary, DayStreamParser, itinerary_store
+)
 
 api_bp = Blueprint('api', __name__)
 
-@api_bp.route('/api/ai_trip', methods=['POST'])
+
+def _sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@api_bp.route('/ai_trip', methods=['POST'])
 def ai_trip():
-    # Your Google AI code here
-    ...
+    """
+    AI itinerary API
+    Input (JSON): destination, days, travelers, budget, style, interests, stream
+    Output:
+        {"trip", "itinerary": {"overview", "budget", "tips", "days", "sections"}, "raw_text", "cached"}
+        or, with stream=true / Accept: text/event-stream, one "day" event per parsed day and a final "done".
+    The parsed itinerary is stored per trip parameters, so repeated plans skip generation.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        params = normalize_trip_params(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    stream = bool(data.get('stream')) or "text/event-stream" in request.headers.get("Accept", "")
+    key = trip_key(params, LLM_MODEL_NAME)
+    stored = None if bypass_requested(request.headers) else itinerary_store.get(key)
+    cache_status = "HIT" if stored is not None else "MISS"
+
+    if stream:
+        def generate_events():
+            if stored is not None:
+                for day in stored["itinerary"]["days"]:
+                    yield _sse("day", day)
+                yield _sse("done", {**stored, "cached": True})
+                return
+
+            parser = DayStreamParser()
+            model = None
+            try:
+                for text, model in generate_stream(build_prompt(params)):
+                    for day in parser.feed(text):
+                        yield _sse("day", day)
+                for day in parser.finish():
+                    yield _sse("day", day)
+            except Exception as e:
+                log_event("ai_trip_stream_failed", level=logging.ERROR, error=str(e))
+                yield _sse("error", {"error": str(e)})
+                return
+
+            itinerary = parse_itinerary(parser.text)
+            if model == LLM_MODEL_NAME:
+                record = itinerary_store.set(key, params, model, parser.text, itinerary)
+            else:
+                record = {"trip": params, "itinerary": itinerary, "raw_text": parser.text}
+            yield _sse("done", {**record, "cached": False})
+
+        return Response(
+            stream_with_context(generate_events()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Cache": cache_status}
+        )
+
+    if stored is not None:
+        return jsonify({**stored, "cached": True}), 200, {"X-Cache": cache_status}
+
+    try:
+        raw_text, model = generate(build_prompt(params))
+    except ChatBusyError as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        log_event("ai_trip_failed", level=logging.ERROR, error=str(e))
+        return jsonify({"error": str(e)}), 500
+
+    itinerary = parse_itinerary(raw_text)
+    if model == LLM_MODEL_NAME:
+        record = itinerary_store.set(key, params, model, raw_text, itinerary)
+    else:
+        # fallback-engine plans are returned but not stored, same as the chat response cache
+        record = {"trip": params, "itinerary": itinerary, "raw_text": raw_text}
+    return jsonify({**record, "cached": False}), 200, {"X-Cache": cache_status}
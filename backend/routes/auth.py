@@ -1,8 +1,11 @@
+import logging
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token, jwt_required
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt
 from extensions import db
 from models import User   # <-- import model here
+from utils.identity_cache import identity_cache
+from utils.passwords import PasswordBusyError, password_service
+from utils.telemetry import log_event
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -15,7 +18,10 @@ def signup():
     if User.query.filter_by(username=username).first():
         return jsonify({"msg": "User already exists"}), 400
 
-    hashed_pw = generate_password_hash(password)
+    try:
+        hashed_pw = password_service.hash(password)
+    except PasswordBusyError as e:
+        return jsonify({"msg": str(e)}), 503
     new_user = User(username=username, password=hashed_pw)
     db.session.add(new_user)
     db.session.commit()
@@ -30,13 +36,35 @@ def login():
     password = data.get("password")
 
     user = User.query.filter_by(username=username).first()
-    if not user or not check_password_hash(user.password, password):
+    try:
+        valid, stale = password_service.verify(user.password, password) if user else (False, False)
+    except PasswordBusyError as e:
+        return jsonify({"msg": str(e)}), 503
+    if not valid:
         return jsonify({"msg": "Invalid credentials"}), 401
 
-    access_token = create_access_token(identity=username)
+    # Upgrade hashes written with an older scheme or cost now that we have the plaintext
+    if stale:
+        try:
+            user.password = password_service.hash(password)
+            db.session.commit()
+            password_service.record_rehash()
+        except Exception as e:
+            db.session.rollback()
+            log_event("password_rehash_failed", level=logging.WARNING, user_id=user.id, error=str(e))
+
+    access_token = create_access_token(identity=str(user.id))
     return jsonify({"access_token": access_token}), 200
 
 
+@auth_bp.route("/logout", methods=["POST"])
+@jwt_required()
+def logout():
+    identity_cache.revoke(get_jwt()["jti"])
+    db.session.commit()
+    return jsonify({"msg": "Token revoked"}), 200
+
+
 @auth_bp.route("/protected", methods=["GET"])
 @jwt_required()
 def protected():
@@ -1,6 +1,16 @@
+import csv
+import json
+import click
 from flask import Blueprint, request, jsonify
 from extensions import db
 from models import Destination
+from utils.pagination import csv_export, keyset_page, ndjson_export, page_args, paged_json, wants_export
+from utils.destination_import import (
+    DESTINATION_IMPORT_BATCH_SIZE, FIELDS, ImportFormatError, export_statement, format_for,
+    import_destinations, iter_records, new_summary,
+)
+from utils.destination_cache import destination_cache, bump_version
+from utils.destination_search import SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT, autocomplete_index, search
 
 # Define the blueprint
 destinations_bp = Blueprint("destinations", __name__)
@@ -18,28 +28,176 @@ def add_destination():
             location=data["location"]
         )
         db.session.add(new_dest)
+        bump_version()
         db.session.commit()
+        destination_cache.invalidate()
         return jsonify({"message": "Destination added successfully!"}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
 # -------------------------------
-# Get all destinations (GET)
+# Get destinations (GET), one keyset page at a time
+# ?limit=N&after=<id>, or ?format=ndjson to export everything
+# Pages are served from the versioned response cache with ETags
 # -------------------------------
 @destinations_bp.route("/", methods=["GET"])
 def get_destinations():
-    destinations = Destination.query.all()
-    results = [
-        {
-            "id": d.id,
-            "name": d.name,
-            "description": d.description,
-            "location": d.location
-        }
-        for d in destinations
-    ]
-    return jsonify(results), 200
+    if wants_export(request.args):
+        return _export_destinations()
+    return destination_cache.serve(_list_destinations)
+
+
+def _export_destinations():
+    after = request.args.get("after")
+    stmt = export_statement()
+    if after not in (None, ""):
+        try:
+            stmt = stmt.where(Destination.id > int(after))
+        except ValueError:
+            return jsonify({"error": "after must be an integer"}), 400
+    return ndjson_export(stmt)
+
+
+def _list_destinations():
+    try:
+        limit, after = page_args(request.args)
+    except ValueError:
+        return jsonify({"error": "limit and after must be positive integers"}), 400
+
+    destinations, next_after = keyset_page(Destination.query, Destination.id, limit, after)
+    return paged_json([d.to_dict() for d in destinations], limit, next_after), 200
+
+
+def _limit_arg(default):
+    limit = int(request.args.get("limit", default))
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, SEARCH_MAX_LIMIT)
+
+
+# -------------------------------
+# Full-text search (GET) over name, description and location
+# ?q=<terms>&limit=N, ranked best first
+# -------------------------------
+@destinations_bp.route("/search", methods=["GET"])
+def search_destinations():
+    return destination_cache.serve(_search_destinations)
+
+
+def _search_destinations():
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "q is required"}), 400
+    try:
+        limit = _limit_arg(SEARCH_DEFAULT_LIMIT)
+    except ValueError:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    return jsonify({"results": search(q, limit)}), 200
+
+
+# -------------------------------
+# Name autocomplete (GET) from the in-process prefix trie
+# ?prefix=<text>&limit=N
+# -------------------------------
+@destinations_bp.route("/autocomplete", methods=["GET"])
+def autocomplete_destinations():
+    return destination_cache.serve(_autocomplete_destinations)
+
+
+def _autocomplete_destinations():
+    prefix = (request.args.get("prefix") or "").strip()
+    if not prefix:
+        return jsonify({"error": "prefix is required"}), 400
+    try:
+        limit = _limit_arg(10)
+    except ValueError:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    suggestions = autocomplete_index.complete(prefix, limit, destination_cache.current_version())
+    return jsonify({"results": suggestions}), 200
+
+
+# -------------------------------
+# Bulk import (POST): CSV or NDJSON body, streamed and upserted in batches
+# ?format=csv|ndjson (defaults from Content-Type), ?batch_size=N
+# Rows with an id update that destination; rows without one are inserted.
+# -------------------------------
+@destinations_bp.route("/import", methods=["POST"])
+def import_destinations_route():
+    try:
+        batch_size = int(request.args.get("batch_size", DESTINATION_IMPORT_BATCH_SIZE))
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+    except ValueError:
+        return jsonify({"error": "batch_size must be a positive integer"}), 400
+
+    # Errors below can happen after earlier batches were committed, so they report the summary too
+    summary = new_summary()
+    try:
+        fmt = format_for(request.content_type, request.args.get("format"))
+        import_destinations(iter_records(request.stream, fmt), batch_size, summary)
+    except ImportFormatError as e:
+        return jsonify({"error": str(e), **summary}), 400
+    except UnicodeDecodeError:
+        return jsonify({"error": "body is not valid UTF-8", **summary}), 400
+    except csv.Error as e:
+        return jsonify({"error": f"malformed CSV: {str(e)}", **summary}), 400
+    except json.JSONDecodeError as e:
+        return jsonify({"error": f"malformed JSON: {str(e)}", **summary}), 400
+    return jsonify(summary), 200
+
+
+# -------------------------------
+# Bulk export (GET), streamed: ?format=csv|ndjson
+# NDJSON is the same stream as GET /destinations/?format=ndjson
+# -------------------------------
+@destinations_bp.route("/export", methods=["GET"])
+def export_destinations():
+    fmt = request.args.get("format", "csv")
+    if fmt == "csv":
+        return csv_export(export_statement(), FIELDS, "destinations.csv")
+    if fmt == "ndjson":
+        return _export_destinations()
+    return jsonify({"error": "format must be csv or ndjson"}), 400
+
+
+@destinations_bp.cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), help="Defaults from the file extension.")
+@click.option("--batch-size", default=DESTINATION_IMPORT_BATCH_SIZE, show_default=True)
+def import_command(path, fmt, batch_size):
+    """Bulk-load destinations from a CSV or NDJSON file."""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "ndjson")
+    summary = new_summary()
+    try:
+        with open(path, "rb") as stream:
+            import_destinations(iter_records(stream, fmt), batch_size, summary)
+    except (ImportFormatError, UnicodeDecodeError, csv.Error) as e:
+        click.echo(f"Import stopped: {str(e)}", err=True)
+    click.echo(f"Imported {summary['imported']} destinations, rejected {summary['rejected']}")
+    for error in summary["errors"]:
+        click.echo(f"  line {error['line']}: {error['error']}")
+
+
+@destinations_bp.cli.command("export")
+@click.argument("path", type=click.Path(dir_okay=False, writable=True))
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), help="Defaults from the file extension.")
+def export_command(path, fmt):
+    """Write every destination to a CSV or NDJSON file."""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "ndjson")
+    result = db.session.execute(export_statement().execution_options(stream_results=True, yield_per=1000))
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        writer = csv.writer(out) if fmt == "csv" else None
+        if writer:
+            writer.writerow(FIELDS)
+        for row in result:
+            if writer:
+                writer.writerow(row)
+            else:
+                out.write(json.dumps(row._asdict()) + "\n")
+            count += 1
+    click.echo(f"Exported {count} destinations to {path}")
 
 
 # -------------------------------
@@ -47,13 +205,11 @@ def get_destinations():
 # -------------------------------
 @destinations_bp.route("/<int:id>", methods=["GET"])
 def get_destination(id):
-    dest = Destination.query.get_or_404(id)
-    return jsonify({
-        "id": dest.id,
-        "name": dest.name,
-        "description": dest.description,
-        "location": dest.location
-    }), 200
+    def build():
+        dest = Destination.query.get_or_404(id)
+        return jsonify(dest.to_dict()), 200
+
+    return destination_cache.serve(build)
 
 
 # -------------------------------
@@ -68,7 +224,9 @@ def update_destination(id):
     dest.description = data.get("description", dest.description)
     dest.location = data.get("location", dest.location)
 
+    bump_version()
     db.session.commit()
+    destination_cache.invalidate()
     return jsonify({"message": "Destination updated successfully!"}), 200
 
 
@@ -79,5 +237,7 @@ def update_destination(id):
 def delete_destination(id):
     dest = Destination.query.get_or_404(id)
     db.session.delete(dest)
+    bump_version()
     db.session.commit()
+    destination_cache.invalidate()
     return jsonify({"message": "Destination deleted successfully!"}), 200
@@ -1,5 +1,5 @@
 from flask import Blueprint, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import current_user, jwt_required
 from app import db
 from models.user_model import User
 from models.feedback_model import Feedback
@@ -13,7 +13,7 @@ XP_PER_FEEDBACK = 20
 @feedback_bp.post("")
 @jwt_required()
 def submit_feedback():
-    uid = get_jwt_identity()
+    uid = current_user.id
     data = request.get_json() or {}
 
     rating = int(data.get("rating", 0))
@@ -29,7 +29,7 @@ def submit_feedback():
     db.session.add(fb)
 
     # Update user XP / level
-    user = User.query.get(uid)
+    user = db.session.get(User, uid)
     user.xp += xp_reward
     user.level = level_for_xp(user.xp)
 
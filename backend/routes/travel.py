@@ -1,20 +1,50 @@
-from flask import Blueprint, request, jsonify
-from sqlalchemy import func
-from flask_jwt_extended import jwt_required, get_jwt_identity
+import json
+import os
+import click
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_jwt_extended import jwt_required
 from extensions import db
-from models.transport_mode import TransportMode
 from models.local_route_feedback import LocalRouteFeedback
+from models.route_feedback_stats import RouteFeedbackStats
+from utils.route_stats import record_feedback, rebuild_route_stats
+from utils.mode_registry import mode_registry, bump_version
+from utils.ranking import finite_number, rank_options, resolve_weights
+from utils.token_utils import admin_required
+from utils.distance_matrix import (
+    distance_matrix, google_mode_for, DISTANCE_MATRIX_ENABLED, DISTANCE_MATRIX_DEADLINE_SECONDS
+)
+from utils.feedback_ingest import insert_feedback_rows, feedback_writer, FEEDBACK_WRITE_BEHIND
 
 travel_bp = Blueprint("travel", __name__)
 
+TRAVEL_BATCH_MAX_PAIRS = int(os.getenv("TRAVEL_BATCH_MAX_PAIRS", 5000))
+# Batches above this size are streamed as NDJSON, ranked and written one chunk at a time
+TRAVEL_BATCH_STREAM_THRESHOLD = int(os.getenv("TRAVEL_BATCH_STREAM_THRESHOLD", 200))
+TRAVEL_BATCH_CHUNK = 500
+FEEDBACK_BULK_MAX_ITEMS = int(os.getenv("FEEDBACK_BULK_MAX_ITEMS", 10000))
+# String(120) on local_route_feedback / route_feedback_stats; checked here so one over-long row
+# cannot fail a whole group insert
+FEEDBACK_PLACE_MAX_LENGTH = 120
 
-def _normalize(value, min_val, max_val):
-    if value is None:
-        return 0.5
-    if max_val == min_val:
-        return 0.5
-    clamped = max(min(value, max_val), min_val)
-    return (clamped - min_val) / (max_val - min_val)
+
+def _weights_from(args):
+    """Weight profile (?profile=fastest) plus optional per-criterion overrides (?w_cost=0.5)."""
+    overrides = {key[2:]: value for key, value in args.items() if key.startswith("w_")}
+    return resolve_weights(args.get("profile"), overrides)
+
+
+def _distance_km(value):
+    distance_km = finite_number(value, "distance_km")
+    if distance_km < 0:
+        raise ValueError("distance_km must be >= 0")
+    return distance_km
+
+
+def _routes_for(origin, destination, modes, deadline, fetch=True):
+    """{mode_id: (distance_km, minutes)} for the modes Distance Matrix could resolve."""
+    mode_to_google = {mode_id: google_mode_for(mode.name) for mode_id, mode in modes.items()}
+    resolved = distance_matrix.resolve(origin, destination, mode_to_google.values(), deadline, fetch=fetch)
+    return {mode_id: resolved[g] for mode_id, g in mode_to_google.items() if g in resolved}
 
 
 @travel_bp.get("/options")
@@ -24,161 +54,233 @@ def travel_options():
     if not origin or not destination:
         return jsonify({"error": "origin and destination are required"}), 400
 
-    # Aggregate feedback per mode for this origin/destination
-    agg_rows = (
-        db.session.query(
-            LocalRouteFeedback.mode_id.label("mode_id"),
-            func.avg(LocalRouteFeedback.rating).label("avg_rating"),
-            func.sum(LocalRouteFeedback.votes).label("total_votes"),
-            func.count(LocalRouteFeedback.id).label("num_entries"),
-        )
-        .filter(LocalRouteFeedback.origin == origin, LocalRouteFeedback.destination == destination)
-        .group_by(LocalRouteFeedback.mode_id)
-        .all()
-    )
+    try:
+        weights = _weights_from(request.args)
+        distance_km = _distance_km(request.args.get("distance_km", 8.0))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    modes = {m.id: m for m in TransportMode.query.all()}
-
-    # Heuristic costs/times (MVP): derive from avg_cost_per_km and a fixed distance estimate
-    # In a real app, integrate with a routing API (e.g., Google Directions) for distance/time.
-    distance_km = float(request.args.get("distance_km", 8.0))
-
-    results = []
-    for mode_id, avg_rating, total_votes, num_entries in agg_rows:
-        mode = modes.get(mode_id)
-        if not mode:
-            continue
-        est_cost = (mode.avg_cost_per_km or 0.8) * distance_km
-        # rough duration minutes by mode
-        if (mode.name or "").lower() in ["walk", "walking"]:
-            est_minutes = distance_km / 4.5 * 60.0
-        elif (mode.name or "").lower() in ["bike", "bicycle"]:
-            est_minutes = distance_km / 15.0 * 60.0
-        elif (mode.name or "").lower() in ["metro", "train"]:
-            est_minutes = distance_km / 30.0 * 60.0
-        elif (mode.name or "").lower() in ["bus"]:
-            est_minutes = distance_km / 20.0 * 60.0
-        else:
-            est_minutes = distance_km / 25.0 * 60.0
+    # Pre-aggregated feedback per mode for this origin/destination (one row per mode)
+    feedback = {
+        row.mode_id: (row.avg_rating, row.total_votes, row.num_entries)
+        for row in RouteFeedbackStats.query.filter_by(origin=origin, destination=destination).all()
+    }
+
+    # Real distance/duration per mode from Distance Matrix (cached per snapped origin/destination);
+    # modes it cannot resolve before the deadline fall back to distance_km and heuristic speeds.
+    modes = mode_registry.all()
+    live = DISTANCE_MATRIX_ENABLED and request.args.get("live", "1") != "0"
+    routes = _routes_for(origin, destination, modes, DISTANCE_MATRIX_DEADLINE_SECONDS) if live else {}
+
+    results = rank_options(
+        [{"distance_km": distance_km, "feedback": feedback, "routes": routes}], modes, weights
+    )[0]
+    return jsonify({
+        "origin": origin,
+        "destination": destination,
+        "distance_km": distance_km,
+        "weights": weights,
+        "options": results,
+    }), 200
+
+
+def _feedback_for_pairs(pairs):
+    """Feedback aggregates for many (origin, destination) pairs in one grouped lookup."""
+    rows = RouteFeedbackStats.query.filter(
+        db.tuple_(RouteFeedbackStats.origin, RouteFeedbackStats.destination).in_(set(pairs))
+    ).all()
+    feedback = {}
+    for row in rows:
+        feedback.setdefault((row.origin, row.destination), {})[row.mode_id] = (
+            row.avg_rating, row.total_votes, row.num_entries
+        )
+    return feedback
 
-        co2 = (mode.co2_per_km or 0.05) * distance_km
-        safety = mode.safety_score_base or 0.6
 
-        results.append(
+def _rank_chunk(pairs, modes, weights):
+    feedback = _feedback_for_pairs([(p["origin"], p["destination"]) for p in pairs])
+    # Batches only use distances already cached; they never wait on (or fan out to) Google
+    ranked = rank_options(
+        [
             {
-                "mode": mode.to_dict(),
-                "avg_rating": float(avg_rating or 0.0),
-                "total_votes": int(total_votes or 0),
-                "num_entries": int(num_entries or 0),
-                "estimated_cost_usd": round(est_cost, 2),
-                "estimated_duration_minutes": round(est_minutes, 1),
-                "estimated_co2_kg": round(co2, 2),
-                "safety_score": round(safety, 2),
+                "distance_km": p["distance_km"],
+                "feedback": feedback.get((p["origin"], p["destination"]), {}),
+                "routes": _routes_for(p["origin"], p["destination"], modes, 0, fetch=False),
             }
-        )
+            for p in pairs
+        ],
+        modes,
+        weights,
+    )
+    return [{**pair, "options": options} for pair, options in zip(pairs, ranked)]
 
-    if not results:
-        # If no local feedback, return a baseline with all modes
-        baseline = []
-        for mode in modes.values():
-            est_cost = (mode.avg_cost_per_km or 0.8) * distance_km
-            if (mode.name or "").lower() in ["walk", "walking"]:
-                est_minutes = distance_km / 4.5 * 60.0
-            elif (mode.name or "").lower() in ["bike", "bicycle"]:
-                est_minutes = distance_km / 15.0 * 60.0
-            elif (mode.name or "").lower() in ["metro", "train"]:
-                est_minutes = distance_km / 30.0 * 60.0
-            elif (mode.name or "").lower() in ["bus"]:
-                est_minutes = distance_km / 20.0 * 60.0
-            else:
-                est_minutes = distance_km / 25.0 * 60.0
-            co2 = (mode.co2_per_km or 0.05) * distance_km
-            safety = mode.safety_score_base or 0.6
-            baseline.append(
-                {
-                    "mode": mode.to_dict(),
-                    "avg_rating": 0.0,
-                    "total_votes": 0,
-                    "num_entries": 0,
-                    "estimated_cost_usd": round(est_cost, 2),
-                    "estimated_duration_minutes": round(est_minutes, 1),
-                    "estimated_co2_kg": round(co2, 2),
-                    "safety_score": round(safety, 2),
-                }
-            )
-        results = baseline
-
-    # Rank results via weighted scoring
-    # Normalize by ranges computed from results
-    cost_vals = [r["estimated_cost_usd"] for r in results]
-    time_vals = [r["estimated_duration_minutes"] for r in results]
-    co2_vals = [r["estimated_co2_kg"] for r in results]
-    feedback_vals = [r["avg_rating"] for r in results]
-    safety_vals = [r["safety_score"] for r in results]
-
-    min_cost, max_cost = min(cost_vals), max(cost_vals)
-    min_time, max_time = min(time_vals), max(time_vals)
-    min_co2, max_co2 = min(co2_vals), max(co2_vals)
-    min_fb, max_fb = min(feedback_vals), max(feedback_vals)
-    min_safe, max_safe = min(safety_vals), max(safety_vals)
-
-    w_cost, w_time, w_fb, w_safe, w_green = 0.25, 0.20, 0.30, 0.15, 0.10
-
-    for r in results:
-        cost_norm = _normalize(r["estimated_cost_usd"], min_cost, max_cost)
-        time_norm = _normalize(r["estimated_duration_minutes"], min_time, max_time)
-        co2_norm = _normalize(r["estimated_co2_kg"], min_co2, max_co2)
-        fb_norm = _normalize(r["avg_rating"], min_fb, max_fb)
-        safe_norm = _normalize(r["safety_score"], min_safe, max_safe)
-        r["score"] = round(
-            w_cost * (1 - cost_norm)
-            + w_time * (1 - time_norm)
-            + w_fb * fb_norm
-            + w_safe * safe_norm
-            + w_green * (1 - co2_norm),
-            4,
-        )
 
-    results.sort(key=lambda x: x["score"], reverse=True)
-    return jsonify({"origin": origin, "destination": destination, "distance_km": distance_km, "options": results}), 200
+@travel_bp.post("/options/batch")
+def travel_options_batch():
+    """
+    Ranked modes for many origin/destination pairs in one call.
+    Body: {"pairs": [{"origin", "destination", "distance_km"}], "profile": "...", "weights": {...}}
+    Large batches (or ?stream=1) come back as NDJSON, one line per pair in request order.
+    """
+    data = request.get_json(silent=True) or {}
+    raw_pairs = data.get("pairs")
+    if not isinstance(raw_pairs, list) or not raw_pairs:
+        return jsonify({"error": "pairs must be a non-empty list"}), 400
+    if len(raw_pairs) > TRAVEL_BATCH_MAX_PAIRS:
+        return jsonify({"error": f"at most {TRAVEL_BATCH_MAX_PAIRS} pairs per batch"}), 400
 
+    try:
+        weights = resolve_weights(data.get("profile"), data.get("weights"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-@travel_bp.post("/feedback")
-@jwt_required()
-def submit_travel_feedback():
-    uid = get_jwt_identity()  # currently unused; could tie to user history/anti-spam in future
-    data = request.get_json() or {}
-    origin = (data.get("origin") or "").strip()
-    destination = (data.get("destination") or "").strip()
+    pairs = []
+    for i, pair in enumerate(raw_pairs):
+        origin = pair.get("origin") if isinstance(pair, dict) else None
+        destination = pair.get("destination") if isinstance(pair, dict) else None
+        origin = origin.strip() if isinstance(origin, str) else ""
+        destination = destination.strip() if isinstance(destination, str) else ""
+        if not origin or not destination:
+            return jsonify({"error": f"pairs[{i}]: origin and destination are required"}), 400
+        try:
+            distance_km = _distance_km(pair.get("distance_km", 8.0))
+        except ValueError as e:
+            return jsonify({"error": f"pairs[{i}]: {str(e)}"}), 400
+        pairs.append({"origin": origin, "destination": destination, "distance_km": distance_km})
+
+    modes = mode_registry.all()
+    stream = request.args.get("stream") == "1" or len(pairs) > TRAVEL_BATCH_STREAM_THRESHOLD
+
+    if not stream:
+        return jsonify({"weights": weights, "results": _rank_chunk(pairs, modes, weights)}), 200
+
+    def generate():
+        for start in range(0, len(pairs), TRAVEL_BATCH_CHUNK):
+            for result in _rank_chunk(pairs[start:start + TRAVEL_BATCH_CHUNK], modes, weights):
+                yield json.dumps(result) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def _text_field(data, field):
+    """Stripped string value of ``field`` ("" when missing); ValueError if it is not a string."""
+    value = data.get(field)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    return value.strip()
+
+
+def _validate_feedback(data):
+    """Feedback dict -> (LocalRouteFeedback column values, None) or (None, (error, status))."""
+    if not isinstance(data, dict):
+        return None, ("feedback must be an object", 400)
+    try:
+        origin = _text_field(data, "origin")
+        destination = _text_field(data, "destination")
+        comments = _text_field(data, "comments")
+    except ValueError as e:
+        return None, (str(e), 400)
     mode_id = data.get("mode_id")
     rating = data.get("rating")
-    comments = (data.get("comments") or "").strip()
 
     if not origin or not destination:
-        return {"error": "origin and destination are required"}, 400
+        return None, ("origin and destination are required", 400)
+    if max(len(origin), len(destination)) > FEEDBACK_PLACE_MAX_LENGTH:
+        return None, (f"origin and destination must be at most {FEEDBACK_PLACE_MAX_LENGTH} characters", 400)
+    if isinstance(rating, bool):
+        return None, ("rating must be an integer 1-5", 400)
     try:
         rating = int(rating)
     except Exception:
-        return {"error": "rating must be an integer 1-5"}, 400
+        return None, ("rating must be an integer 1-5", 400)
     if rating < 1 or rating > 5:
-        return {"error": "rating must be 1-5"}, 400
-    if not isinstance(mode_id, int):
-        return {"error": "mode_id must be an integer"}, 400
-
-    mode = TransportMode.query.get(mode_id)
-    if not mode:
-        return {"error": "transport mode not found"}, 404
-
-    entry = LocalRouteFeedback(
-        origin=origin,
-        destination=destination,
-        mode_id=mode_id,
-        rating=rating,
-        comments=comments,
-        votes=1,
-    )
+        return None, ("rating must be 1-5", 400)
+    if isinstance(mode_id, bool) or not isinstance(mode_id, int):
+        return None, ("mode_id must be an integer", 400)
+
+    if not mode_registry.get(mode_id):
+        return None, ("transport mode not found", 404)
+
+    return {
+        "origin": origin,
+        "destination": destination,
+        "mode_id": mode_id,
+        "rating": rating,
+        "comments": comments,
+        "votes": 1,
+    }, None
+
+
+@travel_bp.post("/feedback")
+@jwt_required()
+def submit_travel_feedback():
+    row, error = _validate_feedback(request.get_json() or {})
+    if error:
+        return {"error": error[0]}, error[1]
+
+    if FEEDBACK_WRITE_BEHIND:
+        # Group-committed by the background writer; no id until it is flushed
+        if not feedback_writer.submit(row):
+            return {"error": "feedback queue is full, please retry"}, 503, {"Retry-After": "1"}
+        return {"message": "feedback queued"}, 202
+
+    entry = LocalRouteFeedback(**row)
     db.session.add(entry)
+    record_feedback(row["origin"], row["destination"], row["mode_id"], row["rating"], votes=entry.votes)
     db.session.commit()
 
     return {"message": "feedback recorded", "id": entry.id}, 201
 
+
+@travel_bp.post("/feedback/bulk")
+@jwt_required()
+def submit_travel_feedback_bulk():
+    """
+    Insert an array of feedback objects in one transaction.
+    Invalid items are skipped and reported by index; valid ones are inserted with one executemany.
+    """
+    data = request.get_json(silent=True)
+    items = data.get("items") if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return {"error": "expected a non-empty array of feedback"}, 400
+    if len(items) > FEEDBACK_BULK_MAX_ITEMS:
+        return {"error": f"at most {FEEDBACK_BULK_MAX_ITEMS} items per request"}, 400
+
+    rows, rejected = [], []
+    for i, item in enumerate(items):
+        row, error = _validate_feedback(item)
+        if error:
+            rejected.append({"index": i, "error": error[0]})
+        else:
+            rows.append(row)
+    if not rows:
+        return {"error": "no valid feedback items", "rejected": rejected}, 400
+
+    insert_feedback_rows(rows)
+    db.session.commit()
+    return {"message": "feedback recorded", "accepted": len(rows), "rejected": rejected}, 201
+
+
+@travel_bp.get("/modes")
+def list_modes():
+    return jsonify({"modes": [m.to_dict() for m in mode_registry.all().values()], **mode_registry.stats()}), 200
+
+
+@travel_bp.post("/modes/reload")
+@admin_required
+def reload_modes():
+    """Admin hook after editing transport_modes: bump the version so every worker reloads."""
+    bump_version()
+    db.session.commit()
+    mode_registry.load()
+    return jsonify({"message": "transport modes reloaded", **mode_registry.stats()}), 200
+
+
+@travel_bp.cli.command("rebuild-stats")
+def rebuild_stats_command():
+    """Backfill/rebuild route_feedback_stats from local_route_feedback."""
+    count = rebuild_route_stats()
+    click.echo(f"Rebuilt {count} route feedback aggregates")
+
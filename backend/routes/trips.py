@@ -1,14 +1,17 @@
-from flask import Blueprint, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import current_user, jwt_required
+from sqlalchemy import and_, or_, select
 from app import db
 from models.trip_model import Trip
+from utils.trips import coerce_destinations, includes_destination
+from utils.pagination import ndjson_export, page_args, wants_export, with_next_link
 
 trips_bp = Blueprint("trips", __name__)
 
 @trips_bp.post("")
 @jwt_required()
 def create_trip():
-    uid = get_jwt_identity()
+    uid = current_user.id
     data = request.get_json() or {}
     destinations = data.get("destinations")  # expect JSON string or array from frontend
     estimated_cost = data.get("estimated_cost")
@@ -16,33 +19,47 @@ def create_trip():
     if not destinations:
         return {"error": "destinations required"}, 400
 
-    # store destinations as text for MVP (frontend can JSON.stringify)
-    if isinstance(destinations, (list, dict)):
-        import json
-        destinations = json.dumps(destinations)
-
-    trip = Trip(user_id=uid, destinations=destinations, estimated_cost=estimated_cost)
+    trip = Trip(user_id=uid, destinations=coerce_destinations(destinations), estimated_cost=estimated_cost)
     db.session.add(trip)
     db.session.commit()
 
     return {"message": "trip created", "trip_id": trip.id}
 
+def _trip_dict(t):
+    return {
+        "id": t.id,
+        "destinations": t.destinations,
+        "estimated_cost": t.estimated_cost,
+        "created_at": t.created_at.isoformat(),
+    }
+
+
 @trips_bp.get("")
 @jwt_required()
 def my_trips():
-    uid = get_jwt_identity()
-    rows = Trip.query.filter_by(user_id=uid).order_by(Trip.created_at.desc()).all()
-    out = []
-    import json
-    for t in rows:
-        try:
-            dest = json.loads(t.destinations)
-        except Exception:
-            dest = t.destinations
-        out.append({
-            "id": t.id,
-            "destinations": dest,
-            "estimated_cost": t.estimated_cost,
-            "created_at": t.created_at.isoformat(),
-        })
-    return {"trips": out}
\ No newline at end of file
+    """Newest first; ?limit=N&after=<trip id> pages, ?format=ndjson exports, ?destination=X filters."""
+    uid = current_user.id
+    try:
+        limit, after = page_args(request.args)
+    except ValueError:
+        return {"error": "limit and after must be positive integers"}, 400
+
+    conditions = [Trip.user_id == uid]
+    destination = (request.args.get("destination") or "").strip()
+    if destination:
+        conditions.append(includes_destination(destination))
+    if after is not None:
+        # keyset on (created_at, id) so the ix_trips_user_id_created_at order is kept
+        anchor = db.session.query(Trip.created_at).filter_by(id=after, user_id=uid).scalar()
+        if anchor is None:
+            return {"error": "unknown cursor"}, 400
+        conditions.append(or_(Trip.created_at < anchor, and_(Trip.created_at == anchor, Trip.id < after)))
+    order = (Trip.created_at.desc(), Trip.id.desc())
+
+    if wants_export(request.args):
+        stmt = select(Trip.id, Trip.destinations, Trip.estimated_cost, Trip.created_at)
+        return ndjson_export(stmt.where(*conditions).order_by(*order), _trip_dict)
+
+    rows = Trip.query.filter(*conditions).order_by(*order).limit(limit + 1).all()
+    next_after = rows[limit - 1].id if len(rows) > limit else None
+    return with_next_link(jsonify({"trips": [_trip_dict(t) for t in rows[:limit]]}), limit, next_after)
@@ -1,13 +1,26 @@
 from flask import Blueprint, jsonify, request
+from sqlalchemy import select
 from models.user_model import User
 from extensions import db
+from utils.pagination import keyset_page, ndjson_export, page_args, paged_json, wants_export
 
 user_bp = Blueprint("user", __name__)
 
 @user_bp.route("/", methods=["GET"])
 def get_users():
-    users = User.query.all()
-    return jsonify([{"id": u.id, "username": u.username, "email": u.email} for u in users])
+    try:
+        limit, after = page_args(request.args)
+    except ValueError:
+        return jsonify({"error": "limit and after must be positive integers"}), 400
+
+    if wants_export(request.args):
+        stmt = select(User.id, User.username, User.email)
+        if after is not None:
+            stmt = stmt.where(User.id > after)
+        return ndjson_export(stmt.order_by(User.id))
+
+    users, next_after = keyset_page(User.query, User.id, limit, after)
+    return paged_json([{"id": u.id, "username": u.username, "email": u.email} for u in users], limit, next_after)
 
 @user_bp.route("/", methods=["POST"])
 def create_user():
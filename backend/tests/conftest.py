@@ -0,0 +1,106 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.py refuses to start without the API keys; nothing here calls Google for real
+os.environ.setdefault("GOOGLE_MAPS_API_KEY", "test-maps-key")
+os.environ.setdefault("GOOGLE_GEMINI_API_KEY", "test-gemini-key")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'goquest_test.db')}"
+os.environ.setdefault("TRACE_SAMPLE_RATE", "0")
+os.environ["DISTANCE_MATRIX_ENABLED"] = "0"
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import create_app
+
+    app = create_app()
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def app_ctx(app):
+    with app.app_context():
+        yield
+
+
+def clear_tables(*models):
+    """Delete every row of the given models (tests share one database per session)."""
+    from extensions import db
+
+    for model in models:
+        db.session.query(model).delete()
+    db.session.commit()
+
+
+def publish_destination_changes():
+    """Bump the catalog version the way the write routes do, so cached pages are not served."""
+    from extensions import db
+    from utils.destination_cache import bump_version, destination_cache
+
+    bump_version()
+    db.session.commit()
+    destination_cache.invalidate()
+
+
+@pytest.fixture
+def empty_destinations(app_ctx):
+    from models.destination import Destination
+
+    clear_tables(Destination)
+    publish_destination_changes()
+    yield
+    clear_tables(Destination)
+    publish_destination_changes()
+
+
+MODE_ROWS = [
+    (1, "walk", 0.0, 0.0, 0.7),
+    (2, "bike", 0.0, 0.1, 0.6),
+    (3, "bus", 0.08, 0.05, 0.7),
+    (4, "metro", 0.04, 0.06, 0.9),
+    (5, "rideshare", 0.2, 0.8, 0.8),
+    (6, "train", None, None, None),
+]
+
+
+@pytest.fixture
+def seeded_modes(app_ctx):
+    from extensions import db
+    from models.transport_mode import TransportMode
+    from utils.mode_registry import mode_registry
+
+    clear_tables(TransportMode)
+    for mode_id, name, co2, cost, safety in MODE_ROWS:
+        db.session.add(TransportMode(id=mode_id, name=name, co2_per_km=co2, avg_cost_per_km=cost, safety_score_base=safety))
+    db.session.commit()
+    mode_registry.invalidate()
+    yield
+    clear_tables(TransportMode)
+    mode_registry.invalidate()
+
+
+@pytest.fixture
+def auth_headers(app_ctx):
+    """Bearer header for a fresh user (created directly: /auth/signup is shadowed by a stub in app.py)."""
+    from flask_jwt_extended import create_access_token
+
+    from extensions import db
+    from models.user_model import User
+
+    clear_tables(User)
+    user = User(username="tester", email="tester@example.com", password="x")
+    db.session.add(user)
+    db.session.commit()
+    yield {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+    clear_tables(User)
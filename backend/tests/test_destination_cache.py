@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import insert
+
+from extensions import db
+from models.destination import Destination
+from tests.conftest import publish_destination_changes
+from utils.destination_cache import destination_cache
+
+
+@pytest.fixture
+def catalog(empty_destinations):
+    db.session.execute(insert(Destination), [
+        {"name": "Mysore Palace", "description": "Royal residence", "location": "Mysore"},
+        {"name": "Palace Grounds", "description": "Concert venue", "location": "Bengaluru"},
+    ])
+    publish_destination_changes()
+
+
+@pytest.mark.parametrize("path", ["/destinations/search?q=palace", "/destinations/autocomplete?prefix=pa", "/destinations/"])
+def test_reads_revalidate_with_etags(client, catalog, path):
+    first = client.get(path)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert "must-revalidate" in first.headers["Cache-Control"]
+
+    again = client.get(path, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.get_data() == b""
+
+    # a catalog change moves the version, so the old ETag no longer matches
+    db.session.add(Destination(name="Palace Annex", description="New wing", location="Mysore"))
+    publish_destination_changes()
+    changed = client.get(path, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_repeat_reads_are_served_from_the_response_cache(client, catalog):
+    client.get("/destinations/search?q=palace")
+    hits = destination_cache.stats()["hits"]
+
+    response = client.get("/destinations/search?q=palace")
+
+    assert response.status_code == 200
+    assert destination_cache.stats()["hits"] == hits + 1
+
+
+def test_errors_are_not_cached(client, catalog):
+    assert client.get("/destinations/?limit=0").status_code == 400
+    assert client.get("/destinations/?limit=0").status_code == 400
+    assert "ETag" not in client.get("/destinations/?limit=0").headers
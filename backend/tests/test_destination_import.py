@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+
+import pytest
+
+from extensions import db
+from models.destination import Destination
+from utils.destination_import import import_destinations, iter_records
+
+
+def ndjson(rows):
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+def place(i, **extra):
+    return {"name": f"Place {i}", "description": f"About place {i}", "location": f"City {i}", **extra}
+
+
+def names():
+    return [d.name for d in Destination.query.order_by(Destination.id)]
+
+
+def test_csv_import_reports_rejected_rows(client, empty_destinations):
+    body = (
+        "name,description,location\n"
+        "Mysore Palace,Royal residence,Mysore\n"
+        ",No name,Nowhere\n"
+        "Hampi,Ruins of Vijayanagara,Hampi\n"
+        f"{'x' * 101},Too long,Somewhere\n"
+    )
+    response = client.post("/destinations/import?batch_size=1", data=body, content_type="text/csv")
+
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert (summary["imported"], summary["rejected"], summary["failed_batches"]) == (2, 2, 0)
+    assert [(e["line"], e["error"]) for e in summary["errors"]] == [
+        (3, "name is required"),
+        (5, "name is longer than 100 characters"),
+    ]
+    assert names() == ["Mysore Palace", "Hampi"]
+
+
+def test_ndjson_import_in_batches(client, empty_destinations):
+    body = ndjson([place(i) for i in range(7)]) + b"{not json}\n" + b"[1, 2]\n\n" + ndjson([place(7)])
+    response = client.post("/destinations/import?batch_size=3", data=body, content_type="application/x-ndjson")
+
+    summary = response.get_json()
+    assert response.status_code == 200
+    assert (summary["imported"], summary["rejected"]) == (8, 2)
+    assert [e["line"] for e in summary["errors"]] == [8, 9]
+    assert summary["errors"][0]["error"].startswith("invalid JSON")
+    assert names() == [f"Place {i}" for i in range(8)]
+
+
+def test_import_publishes_to_the_listing(client, empty_destinations):
+    assert client.get("/destinations/").get_json() == []
+    client.post("/destinations/import", data=ndjson([place(1)]), content_type="application/x-ndjson")
+    assert [d["name"] for d in client.get("/destinations/").get_json()] == ["Place 1"]
+
+
+def test_explicit_ids_upsert_before_new_rows_are_inserted(empty_destinations):
+    db.session.add(Destination(id=5, name="Old", description="Stale", location="Old town"))
+    db.session.commit()
+    records = enumerate([place("new"), place(5, id=5), place(6, id="6")], start=1)
+
+    summary = import_destinations(records, batch_size=10)
+
+    assert (summary["imported"], summary["rejected"]) == (3, 0)
+    rows = {d.id: d.name for d in Destination.query}
+    assert rows[5] == "Place 5" and rows[6] == "Place 6"
+    # the row without an id was inserted after the explicit ids, so it did not take id 6
+    assert sorted(rows) == [5, 6, 7]
+    assert rows[7] == "Place new"
+
+
+def test_rejects_non_integer_ids(empty_destinations):
+    summary = import_destinations(enumerate([place(1, id="abc")], start=1))
+    assert summary["rejected"] == 1
+    assert summary["errors"][0]["error"] == "id must be an integer"
+
+
+def test_non_utf8_body_reports_committed_rows(client, empty_destinations):
+    # enough valid rows to fill the decoder's first read, so earlier batches commit first
+    good = ndjson([place(i) for i in range(300)])
+    assert len(good) > 8192
+    response = client.post(
+        "/destinations/import?batch_size=50", data=good + b'{"name": "\xff"}\n', content_type="application/x-ndjson"
+    )
+
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body["error"] == "body is not valid UTF-8"
+    assert body["imported"] > 0
+    assert Destination.query.count() == body["imported"]
+
+
+def test_malformed_csv_reports_committed_rows(client, empty_destinations):
+    limit = csv.field_size_limit()
+    body = "name,description,location\nHampi,Ruins,Hampi\n" + f"Big,{'y' * (limit + 1)},Somewhere\n"
+    response = client.post("/destinations/import?batch_size=1", data=body, content_type="text/csv")
+
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body["error"].startswith("malformed CSV")
+    assert body["imported"] == 1
+    assert names() == ["Hampi"]
+
+
+@pytest.mark.parametrize("query", ["batch_size=0", "batch_size=abc", "format=xml"])
+def test_bad_import_arguments(client, empty_destinations, query):
+    response = client.post(f"/destinations/import?{query}", data="name\nHampi\n", content_type="text/csv")
+    assert response.status_code == 400
+    assert Destination.query.count() == 0
+
+
+def test_csv_without_name_header_is_rejected(client, empty_destinations):
+    response = client.post("/destinations/import", data="title,location\nHampi,Hampi\n", content_type="text/csv")
+    assert response.status_code == 400
+    assert response.get_json()["imported"] == 0
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_export_reimports_idempotently(client, empty_destinations, fmt):
+    client.post("/destinations/import", data=ndjson([place(i) for i in range(5)]), content_type="application/x-ndjson")
+    before = [(d.id, d.name, d.description, d.location) for d in Destination.query.order_by(Destination.id)]
+
+    exported = client.get(f"/destinations/export?format={fmt}").get_data()
+    summary = import_destinations(iter_records(io.BytesIO(exported), fmt), batch_size=2)
+
+    assert (summary["imported"], summary["rejected"]) == (5, 0)
+    after = [(d.id, d.name, d.description, d.location) for d in Destination.query.order_by(Destination.id)]
+    assert after == before
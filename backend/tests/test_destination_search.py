@@ -0,0 +1,84 @@
+import random
+
+import pytest
+from sqlalchemy import insert
+
+from extensions import db
+from models.destination import Destination
+from tests.conftest import publish_destination_changes
+from utils.destination_search import PrefixTrie, normalize
+
+
+def naive_complete(rows, prefix, limit):
+    prefix = normalize(prefix)
+    best = {}
+    for dest_id, name in rows:
+        words = normalize(name).split()
+        for i in range(len(words)):
+            if " ".join(words[i:]).startswith(prefix):
+                rank = (i > 0, len(name), name, dest_id)
+                best[dest_id] = min(best.get(dest_id, rank), rank)
+    return [{"id": r[3], "name": r[2]} for r in sorted(best.values())[:limit]]
+
+
+def test_short_prefix_finds_best_match_past_a_long_run_of_candidates():
+    # 300 keys under "pa" sort before "pazhassi", the shortest full-name match
+    rows = [(i, f"Park Avenue Garden Number {i}") for i in range(300)] + [(999, "Pazhassi")]
+    trie = PrefixTrie.build(rows, depth=3)
+
+    assert trie.complete("pa", 3)[0] == {"id": 999, "name": "Pazhassi"}
+    assert trie.complete("Pa", 5) == naive_complete(rows, "pa", 5)
+
+
+def test_trie_matches_a_full_scan():
+    rng = random.Random(3)
+    words = ["Mysore", "Palace", "Hampi", "Bazaar", "Palm", "Beach", "Pal", "Fort", "Falls", "Café", "Ooty", "Lake"]
+    rows = [(i, " ".join(rng.sample(words, rng.randint(1, 4)))) for i in range(2000)]
+    trie = PrefixTrie.build(rows, depth=3, keep=20)
+
+    for prefix in ["p", "pa", "pal", "pala", "palace b", "cafe", "ca", "o", "lake", "zzz", "fort fa"]:
+        for limit in (1, 10, 20, 50):
+            assert trie.complete(prefix, limit) == naive_complete(rows, prefix, limit), (prefix, limit)
+
+
+@pytest.fixture
+def catalog(empty_destinations):
+    db.session.execute(insert(Destination), [
+        {"name": "Mysore Palace", "description": "Royal residence of the Wadiyars", "location": "Mysore"},
+        {"name": "Palace Grounds", "description": "Concert venue", "location": "Bengaluru"},
+        {"name": "Chamundi Hills", "description": "Temple above the palace city", "location": "Mysore"},
+        {"name": "Hampi", "description": "Ruins of Vijayanagara", "location": "Hampi"},
+    ])
+    publish_destination_changes()
+
+
+def test_search_ranks_name_matches_first(client, catalog):
+    response = client.get("/destinations/search?q=palace")
+
+    assert response.status_code == 200
+    names = [r["name"] for r in response.get_json()["results"]]
+    assert set(names) == {"Mysore Palace", "Palace Grounds", "Chamundi Hills"}
+    assert names[-1] == "Chamundi Hills"
+
+
+def test_search_treats_the_last_term_as_a_prefix(client, catalog):
+    names = [r["name"] for r in client.get("/destinations/search?q=mysore pal").get_json()["results"]]
+    # every term must match somewhere; Chamundi Hills has Mysore as its location and "palace" in its description
+    assert names == ["Mysore Palace", "Chamundi Hills"]
+    assert client.get("/destinations/search").status_code == 400
+
+
+def test_autocomplete_prefers_names_that_start_with_the_prefix(client, catalog):
+    response = client.get("/destinations/autocomplete?prefix=pal")
+
+    assert response.status_code == 200
+    assert [r["name"] for r in response.get_json()["results"]] == ["Palace Grounds", "Mysore Palace"]
+
+
+def test_autocomplete_sees_new_destinations(client, catalog):
+    assert client.get("/destinations/autocomplete?prefix=ham").get_json()["results"][0]["name"] == "Hampi"
+    db.session.add(Destination(name="Ham Bazaar", description="Market", location="Hampi"))
+    publish_destination_changes()
+
+    names = [r["name"] for r in client.get("/destinations/autocomplete?prefix=ham").get_json()["results"]]
+    assert names == ["Hampi", "Ham Bazaar"]
@@ -0,0 +1,77 @@
+from urllib.parse import urlsplit
+
+import pytest
+
+from routes import travel
+from utils.distance_matrix import DistanceMatrix
+from utils.maps_client import maps_client
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+def element(mode):
+    if mode == "bicycling":
+        return {"status": "ZERO_RESULTS"}
+    meters = {"walking": 9000, "transit": 12500, "driving": 11000}[mode]
+    return {"status": "OK", "distance": {"value": meters}, "duration": {"value": meters // 5}}
+
+
+@pytest.fixture
+def google(monkeypatch):
+    calls = []
+
+    def get(url, params=None, timeout=None):
+        assert urlsplit(url).path.endswith("/distancematrix/json")
+        assert timeout <= 10
+        calls.append(params["mode"])
+        return FakeResponse({"status": "OK", "rows": [{"elements": [element(params["mode"])]}]})
+
+    monkeypatch.setattr(maps_client.session, "get", get)
+    monkeypatch.setattr(travel, "DISTANCE_MATRIX_ENABLED", True)
+    monkeypatch.setattr(travel, "distance_matrix", DistanceMatrix(maxsize=100, ttl=60, negative_ttl=60))
+    return calls
+
+
+def test_options_use_distance_matrix_routes(client, seeded_modes, google):
+    response = client.get("/travel/options?origin=Mysore&destination=Hampi&distance_km=8")
+
+    assert response.status_code == 200
+    options = {o["mode"]["name"]: o for o in response.get_json()["options"]}
+    assert (options["bus"]["distance_km"], options["bus"]["estimate_source"]) == (12.5, "distance_matrix")
+    assert options["bus"]["estimated_duration_minutes"] == 41.7
+    # Google could not route bicycling: that mode keeps the heuristic estimate
+    assert (options["bike"]["distance_km"], options["bike"]["estimate_source"]) == (8.0, "heuristic")
+    assert sorted(google) == ["bicycling", "driving", "transit", "walking"]
+
+
+def test_routes_and_unroutable_pairs_are_cached(client, seeded_modes, google):
+    client.get("/travel/options?origin=Mysore&destination=Hampi")
+    google.clear()
+
+    # same places, different spelling: served from the cache, including the ZERO_RESULTS answer
+    response = client.get("/travel/options?origin=mysore&destination=%20Hampi")
+
+    assert response.status_code == 200
+    assert google == []
+    stats = travel.distance_matrix.stats()
+    assert (stats["size"], stats["hits"]) == (3, 3)
+    assert (stats["unroutable"]["size"], stats["unroutable"]["hits"]) == (1, 1)
+
+
+def test_live_lookup_can_be_skipped(client, seeded_modes, google):
+    response = client.get("/travel/options?origin=Mysore&destination=Hampi&live=0")
+    assert {o["estimate_source"] for o in response.get_json()["options"]} == {"heuristic"}
+    assert google == []
+
+
+def test_cache_stats_reports_distance_matrix(client):
+    stats = client.get("/api/cache_stats").get_json()
+    assert "unroutable" in stats["distance_matrix"]
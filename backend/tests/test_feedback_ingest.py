@@ -0,0 +1,128 @@
+import time
+
+import pytest
+
+from models.local_route_feedback import LocalRouteFeedback
+from models.route_feedback_stats import RouteFeedbackStats
+from tests.conftest import clear_tables
+from utils.feedback_ingest import FeedbackWriteBehind
+
+
+def feedback(rating, origin="Mysore"):
+    return {"origin": origin, "destination": "Hampi", "mode_id": 1, "rating": rating}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def writer_for(app, app_ctx):
+    clear_tables(LocalRouteFeedback, RouteFeedbackStats)
+    writers = []
+
+    def build(**kwargs):
+        options = {"maxsize": 100, "flush_seconds": 30, "flush_batch": 3, "enqueue_timeout": 0.05}
+        writer = FeedbackWriteBehind(**{**options, **kwargs})
+        writer.app = app
+        writers.append(writer)
+        return writer
+
+    yield build
+    for writer in writers:
+        # stop the background thread without waiting out its queue timeout
+        writer._stop.set()
+    clear_tables(LocalRouteFeedback, RouteFeedbackStats)
+
+
+def test_full_batch_flushes_before_the_window_closes(writer_for):
+    writer = writer_for(flush_seconds=30, flush_batch=3)
+    started = time.monotonic()
+    for rating in (5, 4, 3):
+        assert writer.submit(feedback(rating))
+
+    assert wait_for(lambda: writer.flushed == 3)
+    assert time.monotonic() - started < 5
+    assert LocalRouteFeedback.query.count() == 3
+    stats = RouteFeedbackStats.query.one()
+    assert (stats.num_entries, stats.total_votes, stats.rating_sum) == (3, 3, 12)
+
+
+def test_flush_writes_whatever_is_queued(writer_for):
+    writer = writer_for()
+    for rating in (1, 2):
+        writer.queue.put(feedback(rating))
+
+    writer.flush()
+
+    assert writer.flushed == 2
+    assert writer.queue.empty()
+    assert LocalRouteFeedback.query.count() == 2
+
+
+def test_failed_group_commit_retries_then_drops_only_the_bad_row(writer_for):
+    writer = writer_for(retries=2, retry_backoff=0.01)
+    rows = [feedback(5), feedback(None, origin="Broken"), feedback(2)]
+
+    writer._flush(rows)
+
+    assert writer.retried == 2
+    assert (writer.flushed, writer.failed) == (2, 1)
+    assert sorted(f.rating for f in LocalRouteFeedback.query) == [2, 5]
+    assert RouteFeedbackStats.query.filter_by(origin="Broken").count() == 0
+
+
+def test_full_queue_rejects_submissions(writer_for):
+    writer = writer_for(maxsize=1)
+    writer._thread = object()  # keep the background writer from draining the queue
+
+    assert writer.submit(feedback(4))
+    assert not writer.submit(feedback(3))
+    assert writer.stats()["rejected"] == 1
+
+
+@pytest.fixture
+def feedback_tables(app_ctx, seeded_modes):
+    clear_tables(LocalRouteFeedback, RouteFeedbackStats)
+    yield
+    clear_tables(LocalRouteFeedback, RouteFeedbackStats)
+
+
+def test_bulk_feedback_reports_invalid_items_by_index(client, auth_headers, feedback_tables):
+    items = [
+        feedback(5),
+        {**feedback(4), "origin": 5},
+        {**feedback(4), "comments": ["nice"]},
+        {**feedback(4), "mode_id": True},
+        {**feedback(4), "rating": True},
+        {**feedback(4), "destination": "x" * 121},
+        {**feedback(4), "mode_id": 99},
+        "not an object",
+        feedback(3),
+    ]
+    response = client.post("/travel/feedback/bulk", json=items, headers=auth_headers)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["accepted"] == 2
+    assert [(r["index"], r["error"]) for r in body["rejected"]] == [
+        (1, "origin must be a string"),
+        (2, "comments must be a string"),
+        (3, "mode_id must be an integer"),
+        (4, "rating must be an integer 1-5"),
+        (5, "origin and destination must be at most 120 characters"),
+        (6, "transport mode not found"),
+        (7, "feedback must be an object"),
+    ]
+    assert sorted(f.rating for f in LocalRouteFeedback.query) == [3, 5]
+
+
+def test_single_feedback_rejects_non_string_places(client, auth_headers, feedback_tables):
+    response = client.post("/travel/feedback", json={**feedback(4), "destination": {"city": "Hampi"}}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "destination must be a string"
@@ -0,0 +1,19 @@
+from utils.identity_cache import identity_cache
+
+
+def test_repeat_requests_reuse_the_cached_identity(client, auth_headers):
+    assert client.get("/auth/protected", headers=auth_headers).status_code == 200
+    hits = identity_cache.stats()["identities"]["hits"]
+
+    assert client.get("/auth/protected", headers=auth_headers).status_code == 200
+
+    assert identity_cache.stats()["identities"]["hits"] == hits + 1
+
+
+def test_logout_revokes_the_token(client, auth_headers):
+    assert client.post("/auth/logout", headers=auth_headers).status_code == 200
+    assert client.get("/auth/protected", headers=auth_headers).status_code == 401
+
+
+def test_missing_token_is_rejected(client):
+    assert client.get("/auth/protected").status_code == 401
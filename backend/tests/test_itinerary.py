@@ -0,0 +1,46 @@
+import pytest
+
+from utils.itinerary import normalize_trip_params, trip_key
+
+
+def test_normalized_params_share_one_cache_key():
+    a = normalize_trip_params({"destination": " Mysore  Palace", "days": "2", "budget": 500, "interests": "Food, history"})
+    b = normalize_trip_params({"destination": "mysore palace", "days": 2.0, "budget": "500.00", "interests": ["history", "food"]})
+    assert a == b
+    assert trip_key(a, "m") == trip_key(b, "m")
+    assert (a["days"], a["travelers"], a["budget"], a["style"]) == (2, 1, 500.0, "balanced")
+
+
+def test_defaults_apply_only_to_missing_values():
+    params = normalize_trip_params({"destination": "Hampi", "days": "", "budget": None})
+    assert (params["days"], params["budget"]) == (3, None)
+
+
+@pytest.mark.parametrize("data", [
+    {"days": 0},
+    {"days": -2},
+    {"days": 31},
+    {"days": 2.5},
+    {"days": "nan"},
+    {"days": True},
+    {"days": [3]},
+    {"travelers": 0},
+    {"travelers": 21},
+    {"budget": "nan"},
+    {"budget": float("inf")},
+    {"budget": -10},
+    {"budget": "cheap"},
+    {"destination": ""},
+    {"destination": 42},
+    {"style": ["relaxed"]},
+    {"interests": [1, 2]},
+])
+def test_rejects_bad_trip_params(data):
+    with pytest.raises(ValueError):
+        normalize_trip_params({"destination": "Hampi", **data})
+
+
+def test_ai_trip_answers_400_for_bad_params(client):
+    response = client.post("/api/ai_trip", json={"destination": "Hampi", "days": 0})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "days must be a whole number from 1 to 30"
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+import requests
+
+import app as app_module
+from utils.maps_client import maps_client
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+GEOCODE = {
+    "status": "OK",
+    "results": [{"geometry": {"location": {"lat": 12.305, "lng": 76.655}}, "formatted_address": "Mysore Palace"}],
+}
+LEG = {
+    "status": "OK",
+    "routes": [{
+        "overview_polyline": {"points": "abc"},
+        "legs": [{
+            "steps": [],
+            "duration": {"text": "5 mins"},
+            "distance": {"text": "1 km"},
+            "start_location": {"lat": 12.3, "lng": 76.6},
+            "end_location": {"lat": 12.305, "lng": 76.655},
+        }],
+    }],
+}
+
+
+@pytest.fixture
+def maps(monkeypatch):
+    calls = []
+    delays = {"geocode": 0.0, "directions": 0.0}
+
+    def get(url, params=None, timeout=None):
+        kind = "geocode" if "/geocode/" in url else "directions"
+        calls.append((kind, timeout))
+        if delays[kind] > timeout:
+            time.sleep(timeout)
+            raise requests.exceptions.Timeout(f"{kind} timed out")
+        time.sleep(delays[kind])
+        return FakeResponse(GEOCODE if kind == "geocode" else LEG)
+
+    monkeypatch.setattr(maps_client.session, "get", get)
+    monkeypatch.setattr(app_module, "LAST_MILE_DEADLINE_SECONDS", 0.5)
+    return calls, delays
+
+
+def last_mile(client, destination):
+    return client.get("/api/last_mile", query_string={"start_lat": 12.3, "start_lng": 76.6, "destination": destination})
+
+
+def test_geocode_timeout_is_capped_by_the_request_deadline(client, maps):
+    calls, delays = maps
+    delays["geocode"] = 5.0
+    started = time.monotonic()
+
+    response = last_mile(client, f"Slow geocode {time.time()}")
+
+    assert response.status_code == 504
+    assert time.monotonic() - started < 2.0
+    assert all(timeout <= 0.5 for kind, timeout in calls)
+
+
+def test_legs_share_the_remaining_budget(client, maps):
+    calls, _ = maps
+
+    response = last_mile(client, f"Mysore Palace {time.time()}")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["destination"] == "Mysore Palace"
+    assert {info["status"] for info in body["timings"]["legs"].values()} == {"ok"}
+    assert [kind for kind, _ in calls].count("geocode") == 1
+    assert all(timeout <= 0.5 for _, timeout in calls)
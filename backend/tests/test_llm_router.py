@@ -0,0 +1,156 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import llm
+from utils.llm import ChatBusyError, EngineHealth, EngineRouter, OllamaEngine
+
+
+class OllamaStub(ThreadingHTTPServer):
+    """Minimal /api/generate that records how many requests it is serving at once."""
+
+    daemon_threads = True
+
+    def __init__(self, delay=0.05):
+        super().__init__(("127.0.0.1", 0), OllamaHandler)
+        self.delay = delay
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/generate"
+
+
+class OllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server._lock:
+            server.prompts.append(body["prompt"])
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+        finally:
+            with server._lock:
+                server.in_flight -= 1
+        if body.get("stream"):
+            chunks = [{"response": "local ", "done": False}, {"response": "answer", "done": False}, {"done": True}]
+            data = "".join(json.dumps(chunk) + "\n" for chunk in chunks).encode()
+        else:
+            data = json.dumps({"response": f"local answer to {body['prompt']}"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FailingEngine:
+    name = "gemini"
+    model = "gemini-test"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        raise RuntimeError("upstream unavailable")
+
+    def stream(self, prompt):
+        raise RuntimeError("upstream unavailable")
+
+
+@pytest.fixture
+def ollama():
+    server = OllamaStub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def ollama_engine(stub):
+    return OllamaEngine(stub.url, "llama3", 5, pool_size=4, batch_window_ms=5, max_batch=8)
+
+
+def test_failed_primary_is_answered_by_fallback(ollama):
+    primary = FailingEngine()
+    router = EngineRouter(primary, EngineHealth(20, 20, 0.5), fallback=ollama_engine(ollama), cooldown=60)
+
+    text, model = router.generate("plan a day in Mysore")
+
+    assert text == "local answer to plan a day in Mysore"
+    assert model == "llama3"
+    assert primary.calls == 1
+    assert router.fallback_calls == 1
+    assert ollama.prompts == ["plan a day in Mysore"]
+
+
+def test_degraded_primary_is_skipped_for_cooldown(ollama):
+    primary = FailingEngine()
+    router = EngineRouter(primary, EngineHealth(20, 20, 0.5), fallback=ollama_engine(ollama), cooldown=60)
+
+    for i in range(5):
+        router.generate(f"prompt {i}")
+    assert primary.calls == 5
+
+    text, model = router.generate("after the switch")
+
+    assert primary.calls == 5
+    assert model == "llama3"
+    assert text == "local answer to after the switch"
+    assert router.stats()["on_fallback"] is True
+    assert router.fallback_calls == 6
+
+
+def test_stream_uses_fallback_while_degraded(ollama):
+    router = EngineRouter(FailingEngine(), EngineHealth(20, 20, 0.5), fallback=ollama_engine(ollama), cooldown=60)
+    router.degraded_until = time.monotonic() + 60
+
+    engine, chunks = router.stream("hello")
+
+    assert engine.model == "llama3"
+    assert "".join(chunks) == "local answer"
+
+
+def test_chat_slots_cap_concurrent_generations(ollama, monkeypatch):
+    ollama.delay = 0.1
+    router = EngineRouter(ollama_engine(ollama), EngineHealth(20, 20, 0.5))
+    monkeypatch.setattr(llm, "llm_router", router)
+    monkeypatch.setattr(llm, "chat_slots", threading.BoundedSemaphore(2))
+    monkeypatch.setattr(llm, "CHAT_QUEUE_WAIT_SECONDS", 10)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(llm.generate, [f"prompt {i}" for i in range(6)]))
+
+    assert [text for text, _ in results] == [f"local answer to prompt {i}" for i in range(6)]
+    assert len(ollama.prompts) == 6
+    assert ollama.max_in_flight <= 2
+
+
+def test_chat_busy_when_no_slot_frees_up(monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(llm, "chat_slots", slots)
+    monkeypatch.setattr(llm, "CHAT_QUEUE_WAIT_SECONDS", 0.05)
+    slots.acquire()
+    try:
+        with pytest.raises(ChatBusyError):
+            llm.generate("anything")
+        with pytest.raises(ChatBusyError):
+            next(llm.generate_stream("anything"))
+    finally:
+        slots.release()
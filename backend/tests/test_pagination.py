@@ -0,0 +1,110 @@
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+
+from extensions import db
+from models.destination import Destination
+from models.trip_model import Trip
+from models.user_model import User
+from tests.conftest import clear_tables, publish_destination_changes
+from utils.pagination import DEFAULT_PAGE_LIMIT, NEXT_CURSOR_HEADER
+
+
+@pytest.fixture
+def destinations(empty_destinations):
+    db.session.execute(insert(Destination), [
+        {"name": f"Destination {i}", "description": "A place", "location": f"City {i % 7}"}
+        for i in range(250)
+    ])
+    publish_destination_changes()
+    return [row.id for row in db.session.query(Destination.id).order_by(Destination.id)]
+
+
+def test_destinations_first_page_advertises_the_cursor(client, destinations):
+    response = client.get("/destinations/")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [d["id"] for d in body] == destinations[:DEFAULT_PAGE_LIMIT]
+    assert response.headers[NEXT_CURSOR_HEADER] == str(destinations[DEFAULT_PAGE_LIMIT - 1])
+    link = response.headers["Link"]
+    assert link.endswith('rel="next"')
+    query = parse_qs(urlsplit(link[1:link.index(">")]).query)
+    assert query == {"limit": [str(DEFAULT_PAGE_LIMIT)], "after": [str(destinations[DEFAULT_PAGE_LIMIT - 1])]}
+
+
+def test_following_the_cursor_walks_every_destination_once(client, destinations):
+    seen, after = [], None
+    while True:
+        response = client.get("/destinations/", query_string={"limit": 60, **({"after": after} if after else {})})
+        assert response.status_code == 200
+        seen.extend(d["id"] for d in response.get_json())
+        after = response.headers.get(NEXT_CURSOR_HEADER)
+        if after is None:
+            break
+        assert "Link" in response.headers
+    assert seen == destinations
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=abc", "after=xyz"])
+def test_destinations_rejects_bad_page_args(client, destinations, query):
+    assert client.get(f"/destinations/?{query}").status_code == 400
+
+
+def test_destinations_ndjson_export_streams_everything_after_the_cursor(client, destinations):
+    response = client.get(f"/destinations/?format=ndjson&after={destinations[199]}")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row["id"] for row in rows] == destinations[200:]
+    assert set(rows[0]) == {"id", "name", "description", "location"}
+    assert client.get("/destinations/?format=ndjson").get_data(as_text=True).count("\n") == len(destinations)
+    assert client.get("/destinations/?format=ndjson&after=nope").status_code == 400
+
+
+@pytest.fixture
+def trips(app_ctx):
+    clear_tables(Trip, User)
+    owner = User(username="pager", email="pager@example.com", password="x")
+    other = User(username="other", email="other@example.com", password="x")
+    db.session.add_all([owner, other])
+    db.session.flush()
+    db.session.add_all(
+        [Trip(user_id=owner.id, destinations=[f"Stop {i}"], estimated_cost=i) for i in range(25)]
+        + [Trip(user_id=other.id, destinations=["Elsewhere"]) for _ in range(5)]
+    )
+    db.session.commit()
+    expected = [
+        t.id for t in Trip.query.filter_by(user_id=owner.id).order_by(Trip.created_at.desc(), Trip.id.desc())
+    ]
+    headers = {"Authorization": f"Bearer {create_access_token(identity=str(owner.id))}"}
+    yield headers, expected
+    clear_tables(Trip, User)
+
+
+def test_my_trips_pages_newest_first(client, trips):
+    headers, expected = trips
+    seen, after = [], None
+    while True:
+        response = client.get("/trips", headers=headers, query_string={"limit": 10, **({"after": after} if after else {})})
+        assert response.status_code == 200
+        seen.extend(t["id"] for t in response.get_json()["trips"])
+        after = response.headers.get(NEXT_CURSOR_HEADER)
+        if after is None:
+            break
+    assert seen == expected
+
+
+def test_my_trips_export_and_cursor_checks(client, trips):
+    headers, expected = trips
+    response = client.get("/trips?format=ndjson", headers=headers)
+    assert [json.loads(line)["id"] for line in response.get_data(as_text=True).splitlines()] == expected
+
+    # another user's trip id is not a valid cursor
+    foreign = db.session.query(Trip.id).filter(Trip.id.notin_(expected)).first()[0]
+    assert client.get(f"/trips?after={foreign}", headers=headers).status_code == 400
+    assert client.get("/trips?limit=-1", headers=headers).status_code == 400
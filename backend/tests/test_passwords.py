@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from extensions import db
+from models.user_model import User
+from tests.conftest import clear_tables
+from utils.passwords import PasswordBusyError, PasswordService, make_hasher, password_service
+
+
+@pytest.fixture
+def service():
+    return PasswordService("pbkdf2", workers=1, queue_size=0, wait_seconds=0)
+
+
+def test_verify_flags_hashes_from_another_scheme(service):
+    service.configure("pbkdf2", 1000)
+    old = make_hasher("pbkdf2", 500).hash("secret")
+
+    assert service.verify(old, "secret") == (True, True)
+    assert service.verify(old, "wrong") == (False, False)
+    assert service.verify(service.hash("secret"), "secret") == (True, False)
+    assert service.verify("not-a-hash", "secret") == (False, False)
+
+
+def test_saturated_pool_rejects_instead_of_queueing(service):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hash(password):
+        started.set()
+        release.wait(5)
+        return "done"
+
+    worker = threading.Thread(target=service._run, args=(slow_hash, "x"))
+    worker.start()
+    try:
+        assert started.wait(5)
+        with pytest.raises(PasswordBusyError):
+            service.hash("secret")
+        assert service.stats()["rejected"] == 1
+    finally:
+        release.set()
+        worker.join()
+    assert service.hash("secret").startswith("pbkdf2:")
+
+
+@pytest.fixture
+def stale_user(app_ctx):
+    clear_tables(User)
+    user = User(username="old-hash", email="old@example.com", password=make_hasher("pbkdf2", 1000).hash("secret"))
+    db.session.add(user)
+    db.session.commit()
+    yield user
+    clear_tables(User)
+
+
+def test_login_upgrades_a_stale_hash(client, stale_user, monkeypatch):
+    monkeypatch.setattr(password_service, "hasher", make_hasher("pbkdf2", 2000))
+
+    response = client.post("/auth/login", json={"username": "old-hash", "password": "secret"})
+
+    assert response.status_code == 200
+    db.session.refresh(stale_user)
+    assert stale_user.password.startswith("pbkdf2:sha256:2000$")
+
+
+def test_login_answers_503_when_hashing_is_saturated(client, stale_user, monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(password_service, "slots", slots)
+    monkeypatch.setattr(password_service, "wait_seconds", 0)
+
+    response = client.post("/auth/login", json={"username": "old-hash", "password": "secret"})
+
+    assert response.status_code == 503
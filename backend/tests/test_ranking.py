@@ -0,0 +1,181 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from tests.conftest import MODE_ROWS
+from utils.mode_registry import ModeEntry
+from utils.ranking import WEIGHT_PROFILES, rank_options, resolve_weights
+
+
+def make_modes():
+    modes = {}
+    for mode_id, name, co2, cost, safety in MODE_ROWS:
+        row = SimpleNamespace(id=mode_id, name=name, co2_per_km=co2, avg_cost_per_km=cost, safety_score_base=safety)
+        row.to_dict = lambda row=row: {"id": row.id, "name": row.name}
+        modes[mode_id] = ModeEntry(row)
+    return modes
+
+
+def _normalize(value, min_val, max_val):
+    if max_val == min_val:
+        return 0.5
+    clamped = max(min(value, max_val), min_val)
+    return (clamped - min_val) / (max_val - min_val)
+
+
+def scalar_rank(distance_km, feedback, modes, weights):
+    """The per-request loop /travel/options ran before rank_options, with weights as a parameter."""
+    results = []
+    rows = [(mode_id, *feedback[mode_id]) for mode_id in feedback if mode_id in modes]
+    if not rows:
+        rows = [(mode_id, 0.0, 0, 0) for mode_id in modes]
+    for mode_id, avg_rating, total_votes, num_entries in rows:
+        mode = modes[mode_id]
+        results.append({
+            "mode_id": mode_id,
+            "avg_rating": float(avg_rating or 0.0),
+            "estimated_cost_usd": round(mode.cost_per_km * distance_km, 2),
+            "estimated_duration_minutes": round(distance_km / mode.speed_kmh * 60.0, 1),
+            "estimated_co2_kg": round(mode.co2_coeff * distance_km, 2),
+            "safety_score": round(mode.safety, 2),
+        })
+    ranges = {
+        key: (min(r[key] for r in results), max(r[key] for r in results))
+        for key in ("estimated_cost_usd", "estimated_duration_minutes", "estimated_co2_kg", "avg_rating", "safety_score")
+    }
+    for r in results:
+        norm = {key: _normalize(r[key], *ranges[key]) for key in ranges}
+        r["score"] = round(
+            weights["cost"] * (1 - norm["estimated_cost_usd"])
+            + weights["time"] * (1 - norm["estimated_duration_minutes"])
+            + weights["feedback"] * norm["avg_rating"]
+            + weights["safety"] * norm["safety_score"]
+            + weights["green"] * (1 - norm["estimated_co2_kg"]),
+            4,
+        )
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return results
+
+
+def random_requests(rng, count):
+    requests = []
+    for _ in range(count):
+        feedback = {}
+        if rng.random() < 0.7:
+            for mode_id in rng.sample(range(1, 8), rng.randint(1, 5)):  # 7 is not a registered mode
+                entries = rng.randint(1, 40)
+                feedback[mode_id] = (rng.randint(entries, entries * 5) / entries, rng.randint(0, 200), entries)
+        requests.append({"distance_km": round(rng.uniform(0, 60), 2), "feedback": feedback})
+    return requests
+
+
+@pytest.mark.parametrize("profile", sorted(WEIGHT_PROFILES))
+def test_rank_options_matches_scalar_scoring(profile):
+    modes = make_modes()
+    weights = resolve_weights(profile)
+    requests = random_requests(random.Random(profile), 200)
+
+    ranked = rank_options(requests, modes, weights)
+
+    assert len(ranked) == len(requests)
+    for req, options in zip(requests, ranked):
+        expected = scalar_rank(req["distance_km"], req["feedback"], modes, weights)
+        assert sorted(o["mode"]["id"] for o in options) == sorted(r["mode_id"] for r in expected)
+        by_mode = {r["mode_id"]: r for r in expected}
+        for option in options:
+            reference = by_mode[option["mode"]["id"]]
+            assert option["score"] == reference["score"]
+            assert option["estimated_cost_usd"] == reference["estimated_cost_usd"]
+            assert option["estimated_duration_minutes"] == reference["estimated_duration_minutes"]
+            assert option["estimated_co2_kg"] == reference["estimated_co2_kg"]
+            assert option["estimate_source"] == "heuristic"
+        scores = [o["score"] for o in options]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_routed_modes_use_the_route_distance_and_duration():
+    modes = make_modes()
+    [options] = rank_options(
+        [{"distance_km": 10.0, "feedback": {}, "routes": {3: (12.5, 41.0)}}], modes, resolve_weights()
+    )
+    bus = next(o for o in options if o["mode"]["id"] == 3)
+    walk = next(o for o in options if o["mode"]["id"] == 1)
+    assert (bus["distance_km"], bus["estimated_duration_minutes"], bus["estimate_source"]) == (12.5, 41.0, "distance_matrix")
+    assert (walk["distance_km"], walk["estimate_source"]) == (10.0, "heuristic")
+
+
+def test_resolve_weights_rescales_overrides():
+    weights = resolve_weights("cheapest", {"green": 0})
+    assert weights["green"] == 0
+    assert sum(weights.values()) == pytest.approx(1.0)
+    assert resolve_weights() == pytest.approx(WEIGHT_PROFILES["balanced"])
+
+
+@pytest.mark.parametrize("profile, overrides", [
+    ("scenic", None),
+    (["fastest"], None),
+    (None, ["cost"]),
+    (None, {"comfort": 1}),
+    (None, {"cost": "cheap"}),
+    (None, {"cost": True}),
+    (None, {"cost": float("nan")}),
+    (None, {"cost": float("inf")}),
+    (None, {"cost": -1}),
+    (None, dict.fromkeys(("cost", "time", "feedback", "safety", "green"), 0)),
+])
+def test_resolve_weights_rejects_bad_input(profile, overrides):
+    with pytest.raises(ValueError):
+        resolve_weights(profile, overrides)
+
+
+@pytest.mark.parametrize("query", [
+    "profile=scenic",
+    "w_cost=abc",
+    "w_cost=nan",
+    "w_time=-2",
+    "distance_km=inf",
+    "distance_km=-5",
+    "distance_km=ten",
+])
+def test_options_rejects_bad_parameters(client, seeded_modes, query):
+    response = client.get(f"/travel/options?origin=Mysore&destination=Hampi&{query}")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_options_ranks_every_mode_without_feedback(client, seeded_modes):
+    response = client.get("/travel/options?origin=Mysore&destination=Hampi&distance_km=12&profile=fastest")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["weights"] == pytest.approx(WEIGHT_PROFILES["fastest"])
+    assert len(body["options"]) == len(MODE_ROWS)
+
+
+@pytest.mark.parametrize("body", [
+    {"pairs": []},
+    {"pairs": [{"origin": "Mysore"}]},
+    {"pairs": [{"origin": 5, "destination": "Hampi"}]},
+    {"pairs": [{"origin": "Mysore", "destination": "Hampi", "distance_km": "far"}]},
+    {"pairs": [{"origin": "Mysore", "destination": "Hampi", "distance_km": True}]},
+    {"pairs": [{"origin": "Mysore", "destination": "Hampi"}], "profile": 3},
+    {"pairs": [{"origin": "Mysore", "destination": "Hampi"}], "weights": {"cost": -1}},
+])
+def test_batch_rejects_bad_input(client, seeded_modes, body):
+    assert client.post("/travel/options/batch", json=body).status_code == 400
+
+
+def test_batch_matches_single_pair_ranking(client, seeded_modes):
+    pairs = [
+        {"origin": "Mysore", "destination": "Hampi", "distance_km": 12},
+        {"origin": "Hampi", "destination": "Goa", "distance_km": 3.5},
+    ]
+    response = client.post("/travel/options/batch", json={"pairs": pairs, "profile": "greenest"})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    for pair, result in zip(pairs, results):
+        single = client.get(
+            f"/travel/options?origin={pair['origin']}&destination={pair['destination']}"
+            f"&distance_km={pair['distance_km']}&profile=greenest"
+        ).get_json()
+        assert result["options"] == single["options"]
@@ -0,0 +1,77 @@
+import pytest
+
+from extensions import db
+from models.local_route_feedback import LocalRouteFeedback
+from models.route_feedback_stats import RouteFeedbackStats
+from tests.conftest import MODE_ROWS, clear_tables
+
+
+@pytest.fixture
+def feedback_tables(app_ctx, seeded_modes):
+    clear_tables(LocalRouteFeedback, RouteFeedbackStats)
+    yield
+    clear_tables(LocalRouteFeedback, RouteFeedbackStats)
+
+
+def submit(client, headers, mode_id, rating, origin="Mysore", destination="Hampi"):
+    body = {"origin": origin, "destination": destination, "mode_id": mode_id, "rating": rating}
+    return client.post("/travel/feedback", json=body, headers=headers)
+
+
+def stats_for(origin="Mysore", destination="Hampi"):
+    rows = RouteFeedbackStats.query.filter_by(origin=origin, destination=destination)
+    return {row.mode_id: (row.num_entries, row.total_votes, row.rating_sum) for row in rows}
+
+
+def test_feedback_updates_the_running_totals(client, auth_headers, feedback_tables):
+    assert submit(client, auth_headers, 3, 4).status_code == 201
+    assert submit(client, auth_headers, 3, 2).status_code == 201
+    assert submit(client, auth_headers, 4, 5).status_code == 201
+    assert submit(client, auth_headers, 3, 5, destination="Goa").status_code == 201
+
+    assert stats_for() == {3: (2, 2, 6), 4: (1, 1, 5)}
+    assert stats_for(destination="Goa") == {3: (1, 1, 5)}
+    assert LocalRouteFeedback.query.count() == 4
+
+
+def test_options_rank_modes_from_the_stats_table(client, auth_headers, feedback_tables):
+    submit(client, auth_headers, 3, 4)
+    submit(client, auth_headers, 3, 2)
+    submit(client, auth_headers, 4, 5)
+
+    options = client.get("/travel/options?origin=Mysore&destination=Hampi").get_json()["options"]
+
+    by_mode = {o["mode"]["id"]: o for o in options}
+    assert set(by_mode) == {3, 4}
+    assert (by_mode[3]["avg_rating"], by_mode[3]["total_votes"], by_mode[3]["num_entries"]) == (3.0, 2, 2)
+    assert (by_mode[4]["avg_rating"], by_mode[4]["num_entries"]) == (5.0, 1)
+
+
+def test_options_do_not_read_the_raw_feedback_table(client, feedback_tables):
+    db.session.add(LocalRouteFeedback(origin="Mysore", destination="Hampi", mode_id=3, rating=5, votes=1))
+    db.session.commit()
+
+    options = client.get("/travel/options?origin=Mysore&destination=Hampi").get_json()["options"]
+
+    # no aggregate yet, so every mode is ranked without feedback
+    assert len(options) == len(MODE_ROWS)
+    assert {o["num_entries"] for o in options} == {0}
+
+
+def test_rebuild_stats_command_recomputes_from_raw_feedback(app, feedback_tables):
+    db.session.add_all([
+        LocalRouteFeedback(origin="Mysore", destination="Hampi", mode_id=3, rating=4, votes=1),
+        LocalRouteFeedback(origin="Mysore", destination="Hampi", mode_id=3, rating=1, votes=2),
+        LocalRouteFeedback(origin="Hampi", destination="Goa", mode_id=5, rating=3, votes=1),
+    ])
+    # a stale aggregate that no longer matches any feedback
+    db.session.add(RouteFeedbackStats(origin="Old", destination="Route", mode_id=1, num_entries=9, total_votes=9, rating_sum=9))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["travel", "rebuild-stats"])
+
+    assert result.exit_code == 0, result.output
+    assert "Rebuilt 2 route feedback aggregates" in result.output
+    assert stats_for() == {3: (2, 3, 5)}
+    assert stats_for("Hampi", "Goa") == {5: (1, 1, 3)}
+    assert stats_for("Old", "Route") == {}
@@ -0,0 +1,17 @@
+from sqlalchemy import inspect
+
+from extensions import db
+
+
+def test_create_all_builds_feedback_with_its_indexes(app_ctx):
+    inspector = inspect(db.engine)
+    assert "feedback" in inspector.get_table_names()
+    indexes = {index["name"]: index["column_names"] for index in inspector.get_indexes("feedback")}
+    assert indexes["ix_feedback_user_id_trip_id"] == ["user_id", "trip_id"]
+    assert indexes["ix_feedback_trip_id"] == ["trip_id"]
+    assert {fk["referred_table"] for fk in inspector.get_foreign_keys("feedback")} == {"user", "trips"}
+
+
+def test_create_all_builds_the_my_trips_index(app_ctx):
+    indexes = {index["name"]: index["column_names"] for index in inspect(db.engine).get_indexes("trips")}
+    assert indexes["ix_trips_user_id_created_at"] == ["user_id", "created_at"]
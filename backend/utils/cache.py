@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from extensions import db
+from utils.telemetry import log_event
+
+
+class TTLCache:
+    """Small thread-safe in-process LRU cache where every entry also expires after a TTL."""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class TieredCache:
+    """In-process TTLCache in front of a database table; the geocode, places, response and
+    itinerary caches are all built on it.
+
+    lookup() tries memory, then the ``model`` row whose primary key is the cache key, skipping
+    rows older than ``db_ttl``; database hits are copied back into memory. Writes land in memory
+    first and are persisted best effort: a failed commit is rolled back and logged, never raised.
+    """
+
+    model = None  # table keyed by the cache key; subclasses with other lookups read it themselves
+    write_failed_event = "cache_write_failed"
+
+    def __init__(self, maxsize, ttl, persist=True, db_ttl=None):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.persist = persist
+        self.db_ttl = db_ttl
+        self._lock = threading.Lock()
+        self.db_hits = 0
+
+    def is_fresh(self, created_at):
+        return not (self.db_ttl and created_at and created_at < datetime.utcnow() - timedelta(seconds=self.db_ttl))
+
+    def to_value(self, entry):
+        return entry.to_dict()
+
+    def lookup(self, key):
+        value = self.memory.get(key)
+        if value is not None or not self.persist:
+            return value
+        entry = db.session.get(self.model, key)
+        if entry is None or not self.is_fresh(entry.created_at):
+            return None
+        value = self.to_value(entry)
+        self.memory.set(key, value)
+        with self._lock:
+            self.db_hits += 1
+        return value
+
+    def store(self, key, value, row):
+        """Cache ``value`` in memory and merge ``row`` (the matching model instance) into the table."""
+        self.memory.set(key, value)
+        if self.persist:
+            self.write(lambda: db.session.merge(row))
+
+    def write(self, apply):
+        """Run ``apply`` and commit; the in-memory entry is already stored, so failures are only logged."""
+        try:
+            apply()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            log_event(self.write_failed_event, level=logging.WARNING, error=str(e))
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import threading
+import time
+
+from flask import Response, request
+from sqlalchemy import func
+
+from extensions import db
+from models.destination import Destination
+from models.reference_version import ReferenceVersion
+from utils.cache import TTLCache
+
+# How often a process re-reads the catalog version (one single-row query plus max(id)). Writes
+# made through this process are visible immediately; other processes catch up within this window.
+DESTINATION_CACHE_CHECK_SECONDS = float(os.getenv("DESTINATION_CACHE_CHECK_SECONDS", 5))
+DESTINATION_CACHE_SIZE = int(os.getenv("DESTINATION_CACHE_SIZE", 2000))
+DESTINATION_CACHE_TTL_SECONDS = int(os.getenv("DESTINATION_CACHE_TTL_SECONDS", 3600))
+DESTINATION_CACHE_MAX_AGE = int(os.getenv("DESTINATION_CACHE_MAX_AGE", 0))
+VERSION_NAME = "destinations"
+
+
+def _current_version():
+    # max(id) catches rows inserted outside the app (e.g. seed.sql); edits have to bump the counter
+    return ReferenceVersion.current(VERSION_NAME, db.session.query(func.max(Destination.id)))
+
+
+def bump_version():
+    """Record a change to the destination catalog. Caller commits, then calls invalidate()."""
+    ReferenceVersion.bump(VERSION_NAME)
+
+
+class DestinationResponseCache:
+    """Rendered destination responses keyed on (catalog version, request path + query string)."""
+
+    def __init__(self, check_seconds, maxsize, ttl, max_age):
+        self.check_seconds = check_seconds
+        self.max_age = max_age
+        self.responses = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.version = None
+        self.checked_at = 0.0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+
+    def current_version(self):
+        with self._lock:
+            if self.version is None or time.monotonic() - self.checked_at >= self.check_seconds:
+                version = _current_version()
+                if version != self.version:
+                    self.responses.clear()
+                self.version = version
+                self.checked_at = time.monotonic()
+            return self.version
+
+    def invalidate(self):
+        with self._lock:
+            self.version = None
+            self.responses.clear()
+
+    def _etag(self, version, key):
+        digest = hashlib.sha1(f"{version}:{key}".encode("utf-8")).hexdigest()[:20]
+        return f"dest-{digest}"
+
+    def _finish(self, response, etag):
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = f"public, max-age={self.max_age}, must-revalidate"
+        return response
+
+    def serve(self, build):
+        """Answer a read from cache, with a 304 when the client already holds this version.
+
+        ``build`` renders the response on a miss; only 200s are stored.
+        """
+        key = request.full_path
+        version = self.current_version()
+        etag = self._etag(version, key)
+        if request.if_none_match.contains(etag):
+            self.not_modified += 1
+            return self._finish(Response(status=304), etag)
+
+        cached = self.responses.get((version, key))
+        if cached is None:
+            response, status = build()
+            if status != 200:
+                return response, status
+            cached = (response.get_data(), response.mimetype, {
+                name: value for name, value in response.headers.items()
+                if name not in ("Content-Type", "Content-Length")
+            })
+            self.responses.set((version, key), cached)
+
+        body, mimetype, headers = cached
+        return self._finish(Response(body, status=200, mimetype=mimetype, headers=headers), etag)
+
+    def stats(self):
+        stats = self.responses.stats()
+        stats["version"] = self.version[0] if self.version else None
+        stats["not_modified"] = self.not_modified
+        return stats
+
+
+destination_cache = DestinationResponseCache(
+    DESTINATION_CACHE_CHECK_SECONDS, DESTINATION_CACHE_SIZE, DESTINATION_CACHE_TTL_SECONDS, DESTINATION_CACHE_MAX_AGE
+)
@@ -0,0 +1,160 @@
+import csv
+import io
+import json
+import os
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models.destination import Destination
+from utils.destination_cache import bump_version, destination_cache
+
+DESTINATION_IMPORT_BATCH_SIZE = int(os.getenv("DESTINATION_IMPORT_BATCH_SIZE", 1000))
+MAX_REPORTED_ERRORS = 100
+FIELDS = ("id", "name", "description", "location")
+LIMITS = {"name": 100, "location": 100}
+
+FORMATS = {"csv", "ndjson"}
+
+
+class ImportFormatError(ValueError):
+    """The upload is not CSV/NDJSON we can read (as opposed to individual bad rows)."""
+
+
+def format_for(content_type, explicit=None):
+    fmt = (explicit or "").lower()
+    if not fmt:
+        content_type = (content_type or "").lower()
+        fmt = "csv" if "csv" in content_type else "ndjson"
+    if fmt not in FORMATS:
+        raise ImportFormatError(f"format must be one of {', '.join(sorted(FORMATS))}")
+    return fmt
+
+
+def iter_records(stream, fmt):
+    """Yield (line number, record dict) from a binary stream without reading it all into memory."""
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text_stream)
+        if not reader.fieldnames or "name" not in reader.fieldnames:
+            raise ImportFormatError("CSV needs a header row with name, description and location")
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_num, line in enumerate(text_stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_num, e
+            continue
+        yield line_num, record
+
+
+def validate(record):
+    """Row dict for the destination table, or raise ValueError with the reason."""
+    if isinstance(record, Exception):
+        raise ValueError(f"invalid JSON: {record}")
+    if not isinstance(record, dict):
+        raise ValueError("expected an object")
+    row = {}
+    for field in ("name", "description", "location"):
+        value = record.get(field)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"{field} is required")
+        value = value.strip()
+        if field in LIMITS and len(value) > LIMITS[field]:
+            raise ValueError(f"{field} is longer than {LIMITS[field]} characters")
+        row[field] = value
+    if record.get("id") not in (None, ""):
+        try:
+            row["id"] = int(record["id"])
+        except (TypeError, ValueError):
+            raise ValueError("id must be an integer")
+    return row
+
+
+def _sync_id_sequence():
+    # explicit ids bypass the serial sequence; move it past them before anything else draws from it
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text(
+            "SELECT setval(pg_get_serial_sequence('destination', 'id'), "
+            "(SELECT COALESCE(MAX(id), 1) FROM destination))"
+        ))
+
+
+def _upsert(rows):
+    with_id = [row for row in rows if "id" in row]
+    without_id = [row for row in rows if "id" not in row]
+    if with_id:
+        # rows that carry an id replace the existing destination (re-importing an export is
+        # idempotent). They go first, so an explicit id never lands on a row this batch just
+        # auto-assigned.
+        dialect = db.engine.dialect.name
+        stmt = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(Destination)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={field: stmt.excluded[field] for field in ("name", "description", "location")},
+        )
+        db.session.execute(stmt, with_id)
+        _sync_id_sequence()
+    if without_id:
+        db.session.execute(insert(Destination), without_id)
+
+
+def new_summary():
+    return {"imported": 0, "rejected": 0, "failed_batches": 0, "errors": []}
+
+
+def import_destinations(records, batch_size=DESTINATION_IMPORT_BATCH_SIZE, summary=None):
+    """Validate and upsert (line, record) pairs in batches, one transaction per batch.
+
+    Bad rows are skipped and reported; a batch that fails as a whole is rolled back and counted
+    as failed. Returns the summary dict, which is filled in place: if reading the stream fails
+    part way (bad encoding, broken CSV quoting) the exception propagates, and the caller's
+    ``summary`` still says how many rows were committed before it.
+    """
+    summary = new_summary() if summary is None else summary
+
+    def report(line, message, rows=1):
+        summary["rejected"] += rows
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            summary["errors"].append({"line": line, "error": message})
+
+    def flush(batch):
+        try:
+            _upsert([row for _, row in batch])
+            db.session.commit()
+            summary["imported"] += len(batch)
+        except Exception as e:
+            db.session.rollback()
+            summary["failed_batches"] += 1
+            report(batch[0][0], f"batch of {len(batch)} rows failed: {str(e)}", rows=len(batch))
+
+    batch = []
+    try:
+        for line, record in records:
+            try:
+                batch.append((line, validate(record)))
+            except ValueError as e:
+                report(line, str(e))
+                continue
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    finally:
+        # batches committed before a stream error are kept, so publish them either way
+        if summary["imported"]:
+            bump_version()
+            db.session.commit()
+            destination_cache.invalidate()
+    return summary
+
+
+def export_statement():
+    return select(*(getattr(Destination, field) for field in FIELDS)).order_by(Destination.id)
@@ -0,0 +1,242 @@
+import bisect
+import heapq
+import os
+import re
+import threading
+import unicodedata
+
+from sqlalchemy import column, func, inspect, literal_column, or_, select, table, text
+
+from extensions import db
+from models.destination import Destination
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", 100))
+# Depth of the prefix trie; longer prefixes are narrowed by binary search inside the node's range
+# and ranked over that whole range
+AUTOCOMPLETE_TRIE_DEPTH = int(os.getenv("AUTOCOMPLETE_TRIE_DEPTH", 3))
+
+# Postgres: weighted tsvector over name (A), location (B) and description (C), GIN-indexed as an
+# expression so no extra column is needed. The query must use exactly the same expression.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+POSTGRES_INDEX_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_destination_search ON destination USING gin (({SEARCH_VECTOR_SQL}))",
+]
+
+# SQLite: external-content FTS5 table kept in sync with destination by triggers
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS destination_fts USING fts5("
+    "name, description, location, content='destination', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS destination_fts_ai AFTER INSERT ON destination BEGIN "
+    "INSERT INTO destination_fts(rowid, name, description, location) "
+    "VALUES (new.id, new.name, new.description, new.location); END",
+    "CREATE TRIGGER IF NOT EXISTS destination_fts_ad AFTER DELETE ON destination BEGIN "
+    "INSERT INTO destination_fts(destination_fts, rowid, name, description, location) "
+    "VALUES ('delete', old.id, old.name, old.description, old.location); END",
+    "CREATE TRIGGER IF NOT EXISTS destination_fts_au AFTER UPDATE ON destination BEGIN "
+    "INSERT INTO destination_fts(destination_fts, rowid, name, description, location) "
+    "VALUES ('delete', old.id, old.name, old.description, old.location); "
+    "INSERT INTO destination_fts(rowid, name, description, location) "
+    "VALUES (new.id, new.name, new.description, new.location); END",
+]
+# bm25 column weights: name, description, location
+SQLITE_BM25 = "bm25(destination_fts, 10.0, 1.0, 4.0)"
+
+
+def ensure_search_index():
+    """Create the full-text index if it is missing (idempotent; runs at startup)."""
+    bind = db.engine
+    if bind.dialect.name == "postgresql":
+        with bind.begin() as conn:
+            for statement in POSTGRES_INDEX_DDL:
+                conn.execute(text(statement))
+    elif bind.dialect.name == "sqlite":
+        exists = "destination_fts" in inspect(bind).get_table_names()
+        with bind.begin() as conn:
+            for statement in SQLITE_FTS_DDL:
+                conn.execute(text(statement))
+            if not exists:
+                # index the rows that were there before the triggers
+                conn.execute(text("INSERT INTO destination_fts(destination_fts) VALUES ('rebuild')"))
+
+
+def normalize(value):
+    value = unicodedata.normalize("NFKD", value or "")
+    return "".join(ch for ch in value if not unicodedata.combining(ch)).lower().strip()
+
+
+def _tokens(q):
+    return re.findall(r"\w+", normalize(q))[:10]
+
+
+def search(q, limit):
+    """Ranked full-text matches on name, description and location; the last term matches as a prefix."""
+    tokens = _tokens(q)
+    if not tokens:
+        return []
+    columns = [Destination.id, Destination.name, Destination.description, Destination.location]
+    dialect = db.engine.dialect.name
+
+    if dialect == "postgresql":
+        query = func.to_tsquery("simple", " & ".join(tokens[:-1] + [tokens[-1] + ":*"]))
+        vector = literal_column(f"({SEARCH_VECTOR_SQL})")
+        rank = func.ts_rank(vector, query).label("rank")
+        stmt = select(*columns, rank).where(vector.op("@@")(query)).order_by(rank.desc(), Destination.id)
+    elif dialect == "sqlite":
+        match = " ".join(f'"{token}"' for token in tokens[:-1]) + f' "{tokens[-1]}"*'
+        rank = literal_column(SQLITE_BM25).label("rank")
+        fts = table("destination_fts", column("rowid"))
+        stmt = (
+            select(*columns, rank)
+            .join(fts, fts.c.rowid == Destination.id)
+            .where(literal_column("destination_fts").op("MATCH")(match.strip()))
+            .order_by(rank, Destination.id)  # bm25 is lower-is-better
+        )
+    else:
+        # no full-text index: plain substring scan
+        conditions = [or_(*(col.ilike(f"%{token}%") for col in columns[1:])) for token in tokens]
+        stmt = select(*columns, literal_column("0").label("rank")).where(*conditions).order_by(Destination.id)
+
+    rows = db.session.execute(stmt.limit(limit)).all()
+    return [
+        {
+            "id": row.id,
+            "name": row.name,
+            "description": row.description,
+            "location": row.location,
+            "rank": round(abs(float(row.rank or 0)), 6),
+        }
+        for row in rows
+    ]
+
+
+class PrefixTrie:
+    """Shallow trie over a sorted array of (key, name, id) entries for autocomplete.
+
+    Every destination is indexed under its full name and under each later word, so "pal" finds
+    "Mysore Palace". Nodes down to ``depth`` characters store their [lo, hi) slice of the array
+    and their ``keep`` best suggestions, merged bottom-up at build time, so a short prefix is
+    answered without scanning its slice. Deeper prefixes are narrowed with bisect inside the
+    node's slice and ranked over all of it. Memory stays at a few thousand nodes even for
+    hundreds of thousands of destinations.
+    """
+
+    def __init__(self, depth, keep):
+        self.depth = depth
+        self.keep = keep
+        self.keys = []
+        self.ranks = []
+        self.root = {}
+
+    @classmethod
+    def build(cls, rows, depth, keep=SEARCH_MAX_LIMIT):
+        trie = cls(depth, keep)
+        entries = []
+        for dest_id, name in rows:
+            words = normalize(name).split()
+            for i in range(len(words)):
+                # names that start with the prefix first, then shorter names
+                entries.append((" ".join(words[i:]), (i > 0, len(name), name, dest_id)))
+        entries.sort()
+        trie.keys = [key for key, _ in entries]
+        trie.ranks = [rank for _, rank in entries]
+        for index, key in enumerate(trie.keys):
+            node = trie.root
+            for ch in key[:depth]:
+                child = node.get(ch)
+                if child is None:
+                    child = node[ch] = {"": [index, index + 1, None]}
+                else:
+                    child[""][1] = index + 1
+                node = child
+        for child in _children(trie.root):
+            trie._fill_best(child, 1)
+        return trie
+
+    def _fill_best(self, node, depth):
+        lo, hi, _ = node[""]
+        children = _children(node)
+        if depth >= self.depth or not children:
+            candidates = self.ranks[lo:hi]
+        else:
+            # keys that end at this node sort first in its slice; the rest are under the children
+            candidates = []
+            for index in range(lo, hi):
+                if len(self.keys[index]) != depth:
+                    break
+                candidates.append(self.ranks[index])
+            for child in children:
+                self._fill_best(child, depth + 1)
+                candidates.extend(child[""][2])
+        node[""][2] = _best(candidates, self.keep)
+
+    def _range(self, prefix):
+        node = self.root
+        for ch in prefix[:self.depth]:
+            node = node.get(ch)
+            if node is None:
+                return None, 0, 0
+        lo, hi, best = node[""]
+        if len(prefix) > self.depth:
+            lo = bisect.bisect_left(self.keys, prefix, lo, hi)
+            hi = bisect.bisect_left(self.keys, prefix + "\uffff", lo, hi)
+            best = None
+        return best, lo, hi
+
+    def complete(self, prefix, limit):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        best, lo, hi = self._range(prefix)
+        if best is None or limit > self.keep:
+            best = _best(self.ranks[lo:hi], limit)
+        return [{"id": dest_id, "name": name} for _, _, name, dest_id in best[:limit]]
+
+    def __len__(self):
+        return len(self.keys)
+
+
+def _children(node):
+    return [child for ch, child in node.items() if ch]
+
+
+def _best(ranks, limit):
+    """The ``limit`` best-ranked (starts_later, length, name, id) tuples, one per destination."""
+    best = {}
+    for rank in ranks:
+        current = best.get(rank[3])
+        if current is None or rank < current:
+            best[rank[3]] = rank
+    return heapq.nsmallest(limit, best.values())
+
+
+class AutocompleteIndex:
+    """Process-local PrefixTrie, rebuilt when the destination catalog version moves."""
+
+    def __init__(self, depth):
+        self.depth = depth
+        self.trie = None
+        self.version = None
+        self.builds = 0
+        self._lock = threading.Lock()
+
+    def complete(self, prefix, limit, version):
+        with self._lock:
+            if self.trie is None or version != self.version:
+                rows = db.session.execute(select(Destination.id, Destination.name)).all()
+                self.trie = PrefixTrie.build(rows, self.depth)
+                self.version = version
+                self.builds += 1
+            trie = self.trie
+        return trie.complete(prefix, limit)
+
+    def stats(self):
+        return {"entries": len(self.trie) if self.trie else 0, "builds": self.builds}
+
+
+autocomplete_index = AutocompleteIndex(AUTOCOMPLETE_TRIE_DEPTH)
@@ -0,0 +1,115 @@
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from utils.cache import TTLCache
+from utils.geo import grid_cell
+from utils.maps_client import maps_client
+
+DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+# On by default: a cache miss waits at most DISTANCE_MATRIX_DEADLINE_SECONDS, then unresolved
+# modes are ranked with the distance_km heuristic
+DISTANCE_MATRIX_ENABLED = os.getenv("DISTANCE_MATRIX_ENABLED", "1") == "1"
+# How long /travel/options waits for Google before ranking with the heuristics instead
+DISTANCE_MATRIX_DEADLINE_SECONDS = float(os.getenv("DISTANCE_MATRIX_DEADLINE_SECONDS", 1.5))
+DISTANCE_MATRIX_CACHE_SIZE = int(os.getenv("DISTANCE_MATRIX_CACHE_SIZE", 8192))
+DISTANCE_MATRIX_TTL_SECONDS = int(os.getenv("DISTANCE_MATRIX_TTL_SECONDS", 30 * 60))
+# Pairs Google answered but could not route (NOT_FOUND, ZERO_RESULTS, ...) are not asked again for this long
+DISTANCE_MATRIX_NEGATIVE_TTL_SECONDS = int(os.getenv("DISTANCE_MATRIX_NEGATIVE_TTL_SECONDS", 5 * 60))
+DISTANCE_MATRIX_CELL_METERS = float(os.getenv("DISTANCE_MATRIX_CELL_METERS", 250))
+
+# Statuses that say nothing about the pair itself; those answers are not cached
+TRANSIENT_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+
+COORDINATE_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+# Our transport modes mapped onto the travel modes Google can route
+GOOGLE_MODES = {
+    "walk": "walking",
+    "walking": "walking",
+    "bike": "bicycling",
+    "bicycle": "bicycling",
+    "metro": "transit",
+    "train": "transit",
+    "bus": "transit",
+}
+
+
+def google_mode_for(mode_name):
+    return GOOGLE_MODES.get((mode_name or "").lower(), "driving")
+
+
+def place_key(place):
+    """Cache key for an origin/destination: coordinates snap to a grid cell, text is normalized."""
+    match = COORDINATE_RE.match(place)
+    if match:
+        return grid_cell(float(match.group(1)), float(match.group(2)), DISTANCE_MATRIX_CELL_METERS)
+    return " ".join(place.casefold().split())
+
+
+class DistanceMatrix:
+    """Real distance/duration per Google travel mode behind a snapped-location cache.
+
+    Distance Matrix routes one travel mode per call, so a lookup issues at most one call per
+    distinct Google mode (walking, bicycling, transit, driving), all in parallel. Each call,
+    retries included, is bounded by the caller's deadline. Pairs Google cannot route are
+    remembered in a short-lived negative cache.
+    """
+
+    def __init__(self, maxsize, ttl, negative_ttl, max_workers=16):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.unroutable = TTLCache(maxsize=maxsize, ttl=negative_ttl)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="distance-matrix")
+        self.api_key = os.getenv("GOOGLE_MAPS_API_KEY")
+
+    def _unroutable(self, key, status):
+        if status not in TRANSIENT_STATUSES:
+            self.unroutable.set(key, status)
+        return None
+
+    def _fetch(self, key, google_mode, origin, destination, deadline=None):
+        params = {"origins": origin, "destinations": destination, "mode": google_mode, "key": self.api_key}
+        data = maps_client.get(DISTANCE_MATRIX_URL, params=params, timeout=10, deadline=deadline).json()
+        if data.get("status") != "OK":
+            return self._unroutable(key, data.get("status"))
+        element = data["rows"][0]["elements"][0]
+        if element.get("status") != "OK":
+            return self._unroutable(key, element.get("status"))
+        result = (element["distance"]["value"] / 1000.0, element["duration"]["value"] / 60.0)
+        self.cache.set(key, result)
+        return result
+
+    def resolve(self, origin, destination, google_modes, deadline=None, fetch=True):
+        """{google_mode: (distance_km, minutes)} for whatever is cached or arrives before the deadline."""
+        origin_key, destination_key = place_key(origin), place_key(destination)
+        fetch_deadline = time.monotonic() + deadline if deadline is not None else None
+        resolved, futures = {}, {}
+        for google_mode in set(google_modes):
+            key = (google_mode, origin_key, destination_key)
+            cached = self.cache.get(key)
+            if cached is not None:
+                resolved[google_mode] = cached
+            elif fetch and self.unroutable.get(key) is None:
+                futures[google_mode] = self.executor.submit(
+                    self._fetch, key, google_mode, origin, destination, fetch_deadline
+                )
+
+        if futures:
+            wait(futures.values(), timeout=deadline)
+            for google_mode, future in futures.items():
+                if future.done() and not future.exception() and future.result():
+                    resolved[google_mode] = future.result()
+        return resolved
+
+    def stats(self):
+        stats = self.cache.stats()
+        stats["unroutable"] = self.unroutable.stats()
+        return stats
+
+
+distance_matrix = DistanceMatrix(
+    maxsize=DISTANCE_MATRIX_CACHE_SIZE,
+    ttl=DISTANCE_MATRIX_TTL_SECONDS,
+    negative_ttl=DISTANCE_MATRIX_NEGATIVE_TTL_SECONDS,
+)
@@ -0,0 +1,180 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from extensions import db
+from models.local_route_feedback import LocalRouteFeedback
+from utils.route_stats import record_feedback
+from utils.telemetry import log_event
+
+FEEDBACK_WRITE_BEHIND = os.getenv("FEEDBACK_WRITE_BEHIND", "0") == "1"
+FEEDBACK_QUEUE_SIZE = int(os.getenv("FEEDBACK_QUEUE_SIZE", 10000))
+FEEDBACK_FLUSH_SECONDS = float(os.getenv("FEEDBACK_FLUSH_SECONDS", 1.0))
+FEEDBACK_FLUSH_BATCH = int(os.getenv("FEEDBACK_FLUSH_BATCH", 500))
+# How long a submission may wait for queue space before the client is told to back off
+FEEDBACK_ENQUEUE_TIMEOUT_SECONDS = float(os.getenv("FEEDBACK_ENQUEUE_TIMEOUT_SECONDS", 0.05))
+# A failed group commit is retried this many times (exponential backoff) before rows are written one by one
+FEEDBACK_FLUSH_RETRIES = int(os.getenv("FEEDBACK_FLUSH_RETRIES", 3))
+FEEDBACK_RETRY_BACKOFF_SECONDS = float(os.getenv("FEEDBACK_RETRY_BACKOFF_SECONDS", 0.5))
+
+
+def insert_feedback_rows(rows):
+    """Insert many feedback rows with one executemany and fold them into the route aggregates.
+
+    Each row is a dict of LocalRouteFeedback columns. Commit is left to the caller.
+    """
+    if not rows:
+        return
+    now = datetime.utcnow()
+    for row in rows:
+        row.setdefault("votes", 1)
+        row.setdefault("created_at", now)
+    db.session.execute(insert(LocalRouteFeedback), rows)
+
+    totals = {}
+    for row in rows:
+        key = (row["origin"], row["destination"], row["mode_id"])
+        entries, votes, rating_sum = totals.get(key, (0, 0, 0))
+        totals[key] = (entries + 1, votes + row["votes"], rating_sum + row["rating"])
+    for (origin, destination, mode_id), (entries, votes, rating_sum) in totals.items():
+        record_feedback(origin, destination, mode_id, rating_sum, votes=votes, entries=entries)
+
+
+class FeedbackWriteBehind:
+    """Bounded queue of single feedback submissions, flushed by a background thread in group commits."""
+
+    def __init__(self, maxsize, flush_seconds, flush_batch, enqueue_timeout, retries=0, retry_backoff=0.0):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.flush_seconds = flush_seconds
+        self.flush_batch = flush_batch
+        self.enqueue_timeout = enqueue_timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.app = None
+        self.flushed = 0
+        self.rejected = 0
+        self.retried = 0
+        self.failed = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        atexit.register(self.shutdown)
+
+    def submit(self, row):
+        """Queue a row; returns False when the queue is full (the caller should answer 503)."""
+        self._ensure_thread()
+        try:
+            self.queue.put(row, timeout=self.enqueue_timeout)
+            return True
+        except queue.Full:
+            self.rejected += 1
+            return False
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+                self._thread.start()
+
+    def _drain(self, first=None):
+        batch = [first] if first is not None else []
+        while len(batch) < self.flush_batch:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _collect(self, first):
+        """Rows arriving within flush_seconds of ``first``, cut short once the batch is full."""
+        batch = [first]
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.flush_batch and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, rows, attempt):
+        try:
+            insert_feedback_rows(rows)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            log_event("feedback_flush_failed", level=logging.WARNING, rows=len(rows), attempt=attempt, error=str(e))
+            return False
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        with self.app.app_context():
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self.retried += 1
+                    self._stop.wait(self.retry_backoff * 2 ** (attempt - 1))
+                if self._commit(batch, attempt):
+                    self.flushed += len(batch)
+                    return
+            # Still failing: write rows one at a time so a single bad row cannot sink the rest.
+            # Rows the database rejects on their own are logged in full so they can be replayed.
+            for row in batch:
+                if self._commit([row], "single"):
+                    self.flushed += 1
+                else:
+                    self.failed += 1
+                    log_event("feedback_row_dropped", level=logging.ERROR, row=row)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self.queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                continue
+            # give concurrent submissions a moment to pile up into the same commit
+            self._flush(self._collect(first))
+
+    def flush(self):
+        """Write everything queued so far from the calling thread."""
+        while not self.queue.empty():
+            self._flush(self._drain())
+
+    def shutdown(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_seconds * 2)
+        if self.app is not None:
+            self.flush()
+
+    def stats(self):
+        return {
+            "enabled": FEEDBACK_WRITE_BEHIND,
+            "queued": self.queue.qsize(),
+            "flushed": self.flushed,
+            "rejected": self.rejected,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+feedback_writer = FeedbackWriteBehind(
+    maxsize=FEEDBACK_QUEUE_SIZE,
+    flush_seconds=FEEDBACK_FLUSH_SECONDS,
+    flush_batch=FEEDBACK_FLUSH_BATCH,
+    enqueue_timeout=FEEDBACK_ENQUEUE_TIMEOUT_SECONDS,
+    retries=FEEDBACK_FLUSH_RETRIES,
+    retry_backoff=FEEDBACK_RETRY_BACKOFF_SECONDS,
+)
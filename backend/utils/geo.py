@@ -0,0 +1,43 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+METERS_PER_DEGREE_LAT = 111320.0
+
+
+def grid_cell(lat, lng, cell_meters):
+    """Snap a coordinate to a (row, col) cell of a roughly square grid with the given edge length."""
+    lat_step = cell_meters / METERS_PER_DEGREE_LAT
+    row = math.floor(lat / lat_step)
+    # widen the longitude step away from the equator so cells stay about cell_meters wide
+    lng_step = lat_step / max(math.cos(math.radians((row + 0.5) * lat_step)), 0.01)
+    col = math.floor(lng / lng_step)
+    return row, col
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def cell_center(row, col, cell_meters):
+    """Centre coordinate of a cell returned by grid_cell."""
+    lat_step = cell_meters / METERS_PER_DEGREE_LAT
+    lng_step = lat_step / max(math.cos(math.radians((row + 0.5) * lat_step)), 0.01)
+    return (row + 0.5) * lat_step, (col + 0.5) * lng_step
+
+
+def neighbour_cells(lat, lng, cell_meters):
+    """The cell containing the point plus the eight cells around it, home cell first."""
+    lat_step = cell_meters / METERS_PER_DEGREE_LAT
+    lng_step = lat_step / max(math.cos(math.radians(lat)), 0.01)
+    cells = [grid_cell(lat, lng, cell_meters)]
+    for d_lat in (-1, 0, 1):
+        for d_lng in (-1, 0, 1):
+            cell = grid_cell(lat + d_lat * lat_step, lng + d_lng * lng_step, cell_meters)
+            if cell not in cells:
+                cells.append(cell)
+    return cells
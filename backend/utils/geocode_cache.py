@@ -0,0 +1,72 @@
+import os
+from datetime import datetime
+from urllib.parse import unquote
+
+from models.geocode_cache import GeocodeCacheEntry
+from utils.cache import TieredCache
+
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", 2048))
+GEOCODE_CACHE_TTL_SECONDS = int(os.getenv("GEOCODE_CACHE_TTL_SECONDS", 24 * 3600))
+# Persistent tier in the app database; landmarks rarely move so it can keep entries much longer
+GEOCODE_CACHE_PERSIST = os.getenv("GEOCODE_CACHE_PERSIST", "1") == "1"
+GEOCODE_CACHE_DB_TTL_SECONDS = int(os.getenv("GEOCODE_CACHE_DB_TTL_SECONDS", 30 * 24 * 3600))
+
+
+def normalize_destination(destination):
+    """Cache key for a free-text destination: unquoted, case-folded, whitespace-collapsed."""
+    return " ".join(unquote(destination or "").casefold().split())
+
+
+class GeocodeCache(TieredCache):
+    """Two-tier geocode cache: in-process LRU with TTL in front of an optional DB table."""
+
+    model = GeocodeCacheEntry
+    write_failed_event = "geocode_cache_write_failed"
+
+    def __init__(self, maxsize, ttl, persist=True, db_ttl=None):
+        super().__init__(maxsize, ttl, persist=persist, db_ttl=db_ttl)
+        self.upstream_calls = 0
+        self.upstream_ms_total = 0.0
+
+    def get(self, key):
+        """Return {"lat", "lng", "formatted_address"} for a normalized key, or None on a miss."""
+        return self.lookup(key)
+
+    def set(self, key, value):
+        self.store(key, value, GeocodeCacheEntry(
+            key=key,
+            lat=value["lat"],
+            lng=value["lng"],
+            formatted_address=value.get("formatted_address"),
+            created_at=datetime.utcnow(),
+        ))
+
+    def record_upstream(self, elapsed_ms):
+        with self._lock:
+            self.upstream_calls += 1
+            self.upstream_ms_total += elapsed_ms
+
+    def stats(self):
+        memory = self.memory.stats()
+        hits = memory["hits"] + self.db_hits
+        misses = memory["misses"] - self.db_hits
+        avg_upstream_ms = self.upstream_ms_total / self.upstream_calls if self.upstream_calls else 0.0
+        return {
+            "memory": memory,
+            "persistent": self.persist,
+            "db_hits": self.db_hits,
+            "hits": hits,
+            "misses": misses,
+            "upstream_calls": self.upstream_calls,
+            "avg_upstream_ms": round(avg_upstream_ms, 1),
+            # every hit is one geocode round trip we did not make
+            "estimated_saved_ms": round(hits * avg_upstream_ms, 1),
+        }
+
+
+geocode_cache = GeocodeCache(
+    maxsize=GEOCODE_CACHE_SIZE,
+    ttl=GEOCODE_CACHE_TTL_SECONDS,
+    persist=GEOCODE_CACHE_PERSIST,
+    db_ttl=GEOCODE_CACHE_DB_TTL_SECONDS,
+)
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+
+from sqlalchemy import event
+
+from extensions import db
+from models.token_blocklist import TokenBlocklist
+from models.user_model import User
+from utils.cache import TTLCache
+
+# Short TTL: it bounds how long another worker can keep serving a user that was updated or a
+# token that was revoked elsewhere. Changes made through this process invalidate immediately.
+IDENTITY_CACHE_TTL_SECONDS = int(os.getenv("IDENTITY_CACHE_TTL_SECONDS", 60))
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", 10000))
+
+
+class UserIdentity:
+    """The user fields an authenticated request needs, detached from the DB session."""
+
+    __slots__ = ("id", "username", "email")
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+
+    def to_dict(self):
+        return {"id": self.id, "username": self.username, "email": self.email}
+
+
+def _lookup_user(identity):
+    # tokens carry the user id; tokens issued before that carried the username
+    identity = str(identity)
+    if identity.isdigit():
+        return db.session.get(User, int(identity))
+    return User.query.filter_by(username=identity).first()
+
+
+class IdentityCache:
+    def __init__(self, maxsize, ttl):
+        self.ttl = ttl
+        self.identities = TTLCache(maxsize=maxsize, ttl=ttl)  # (identity, jti) -> (identity, loaded_at)
+        self.revoked = TTLCache(maxsize=maxsize, ttl=ttl)  # jti -> bool
+        # user id -> when it last changed. Entries loaded before that are stale; records older than
+        # the TTL are pruned because every entry they could invalidate has expired by then.
+        self._updated = {}
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti):
+        revoked = self.revoked.get(jti)
+        if revoked is None:
+            revoked = db.session.query(TokenBlocklist.id).filter_by(jti=jti).first() is not None
+            self.revoked.set(jti, revoked)
+        return revoked
+
+    def load(self, identity, jti):
+        """UserIdentity for a token's subject; None when the token is revoked or the user is gone."""
+        if self.is_revoked(jti):
+            return None
+        key = (str(identity), jti)
+        cached = self.identities.get(key)
+        if cached is not None:
+            user_identity, loaded_at = cached
+            if self._updated.get(user_identity.id, float("-inf")) < loaded_at:
+                return user_identity
+        loaded_at = time.monotonic()
+        user = _lookup_user(identity)
+        if user is None:
+            return None
+        user_identity = UserIdentity(user)
+        self.identities.set(key, (user_identity, loaded_at))
+        return user_identity
+
+    def invalidate_user(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            self._updated[user_id] = now
+            cutoff = now - self.ttl
+            for stale in [uid for uid, at in self._updated.items() if at < cutoff]:
+                del self._updated[stale]
+
+    def revoke(self, jti):
+        """Add a token to the blocklist (caller commits) and stop serving it from this process."""
+        if db.session.query(TokenBlocklist.id).filter_by(jti=jti).first() is None:
+            db.session.add(TokenBlocklist(jti=jti))
+        self.revoked.set(jti, True)
+
+    def stats(self):
+        return {
+            "identities": self.identities.stats(),
+            "revocations": self.revoked.stats(),
+            "recent_updates": len(self._updated),
+        }
+
+
+identity_cache = IdentityCache(maxsize=IDENTITY_CACHE_SIZE, ttl=IDENTITY_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    identity_cache.invalidate_user(target.id)
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+from models.itinerary import Itinerary
+from utils.cache import TieredCache
+from utils.ranking import finite_number
+
+ITINERARY_CACHE_SIZE = int(os.getenv("ITINERARY_CACHE_SIZE", 256))
+ITINERARY_CACHE_TTL_SECONDS = int(os.getenv("ITINERARY_CACHE_TTL_SECONDS", 6 * 3600))
+ITINERARY_DB_TTL_SECONDS = int(os.getenv("ITINERARY_DB_TTL_SECONDS", 30 * 24 * 3600))
+MAX_TRIP_DAYS = 30
+MAX_TRAVELERS = 20
+
+HEADER_RE = re.compile(r"^\s*\*\*(?P<title>[^*]+?):?\*\*:?\s*$")
+DAY_RE = re.compile(r"^day\s+(?P<day>\d+)\s*[:\-–]?\s*(?P<title>.*)$", re.IGNORECASE)
+BULLET_RE = re.compile(r"^\s*[\*\-]\s+(?P<body>.+)$")
+LABELLED_RE = re.compile(r"^\*\*(?P<label>[^*]+?):?\*\*:?\s*(?P<text>.*)$")
+TIME_RE = re.compile(r"\((?P<time>\d{1,2}:\d{2}\s*[AP]M)\)", re.IGNORECASE)
+COST_RE = re.compile(r"\$(?P<low>\d+(?:\.\d+)?)(?:\s*-\s*\$?(?P<high>\d+(?:\.\d+)?))?")
+
+
+# -------------------------------
+# Trip parameters
+# -------------------------------
+def _count_param(data, name, default, maximum):
+    """Whole number in 1..maximum; only a missing or empty value falls back to the default."""
+    value = data.get(name)
+    if value in (None, ""):
+        return default
+    value = finite_number(value, name)
+    if not value.is_integer() or not 1 <= value <= maximum:
+        raise ValueError(f"{name} must be a whole number from 1 to {maximum}")
+    return int(value)
+
+
+def normalize_trip_params(data):
+    """Canonical trip parameters; raises ValueError for invalid input."""
+    destination = data.get("destination") or ""
+    style = data.get("style") or "balanced"
+    if not isinstance(destination, str) or not isinstance(style, str):
+        raise ValueError("destination and style must be strings")
+    destination = " ".join(destination.split())
+    if not destination:
+        raise ValueError("destination is required")
+    days = _count_param(data, "days", 3, MAX_TRIP_DAYS)
+    travelers = _count_param(data, "travelers", 1, MAX_TRAVELERS)
+    budget = data.get("budget")
+    if budget in (None, ""):
+        budget = None
+    else:
+        budget = round(finite_number(budget, "budget"), 2)
+        if budget < 0:
+            raise ValueError("budget must be >= 0")
+    interests = data.get("interests") or []
+    if isinstance(interests, str):
+        interests = interests.split(",")
+    if not isinstance(interests, list) or not all(isinstance(i, str) for i in interests):
+        raise ValueError("interests must be a list of strings or a comma-separated string")
+    return {
+        "destination": destination.casefold(),
+        "days": days,
+        "travelers": travelers,
+        "budget": budget,
+        "style": " ".join(style.casefold().split()),
+        "interests": sorted({i.strip().casefold() for i in interests if i.strip()}),
+    }
+
+
+def trip_key(params, model):
+    return hashlib.sha256(f"{model}\n{json.dumps(params, sort_keys=True)}".encode("utf-8")).hexdigest()
+
+
+def build_prompt(params):
+    budget = f" with a ${params['budget']:g} budget" if params["budget"] is not None else ""
+    interests = f" Focus on: {', '.join(params['interests'])}." if params["interests"] else ""
+    return (
+        f"Plan a {params['days']}-day {params['style']} trip to {params['destination'].title()} "
+        f"for {params['travelers']} traveler(s){budget}.{interests}\n"
+        "Format the answer in markdown exactly like this:\n"
+        "**Overall Budget Breakdown:** followed by bullets '*   **Item:** $low - $high (note)'\n"
+        "**Travel Tips:** followed by bullets '*   **Topic:** tip'\n"
+        "Then one section per day with the header '**Day N: Title**' and bullets "
+        "'*   **Morning (9:00 AM):** activity (approx. $cost)'."
+    )
+
+
+# -------------------------------
+# Parsing raw itinerary text
+# -------------------------------
+def _parse_cost(text):
+    match = COST_RE.search(text)
+    if not match:
+        return None
+    low = float(match.group("low"))
+    high = float(match.group("high")) if match.group("high") else low
+    return {"min": low, "max": high}
+
+
+def _parse_bullet(body):
+    labelled = LABELLED_RE.match(body.strip())
+    label, text = (labelled.group("label").strip(), labelled.group("text").strip()) if labelled else (None, body.strip())
+    time_match = TIME_RE.search(label or "")
+    return {
+        "label": TIME_RE.sub("", label).strip() if label else None,
+        "time": time_match.group("time").upper() if time_match else None,
+        "text": text,
+        "cost_usd": _parse_cost(text),
+    }
+
+
+def parse_sections(text):
+    """Split raw itinerary text into (title, lines) sections; text before the first header is the intro."""
+    sections = [("", [])]
+    for line in text.splitlines():
+        header = HEADER_RE.match(line)
+        if header:
+            sections.append((header.group("title").strip(), []))
+        elif line.strip() and line.strip() != "---":
+            sections[-1][1].append(line)
+    return sections
+
+
+def parse_day(title, lines):
+    match = DAY_RE.match(title)
+    return {
+        "day": int(match.group("day")),
+        "title": match.group("title").strip(),
+        "activities": [_parse_bullet(m.group("body")) for m in map(BULLET_RE.match, lines) if m],
+    }
+
+
+def parse_itinerary(text):
+    """Structured days/activities/budget/tips from the raw markdown an LLM returns."""
+    result = {"overview": "", "budget": [], "tips": [], "days": [], "sections": []}
+    for title, lines in parse_sections(text):
+        bullets = [_parse_bullet(m.group("body")) for m in map(BULLET_RE.match, lines) if m]
+        lowered = title.lower()
+        if not title:
+            result["overview"] = " ".join(line.strip() for line in lines)
+        elif DAY_RE.match(title):
+            result["days"].append(parse_day(title, lines))
+        elif "budget" in lowered and not result["budget"]:
+            result["budget"] = [
+                {"item": b["label"] or b["text"], "cost_usd": b["cost_usd"], "note": b["text"]} for b in bullets
+            ]
+        elif "tip" in lowered and not result["tips"]:
+            result["tips"] = [{"topic": b["label"], "text": b["text"]} for b in bullets]
+        else:
+            result["sections"].append({
+                "title": title,
+                "items": bullets or [{"label": None, "time": None, "text": " ".join(lines), "cost_usd": None}],
+            })
+    return result
+
+
+class DayStreamParser:
+    """Feed streamed text in; get back each day once its section is complete (the next header arrived)."""
+
+    def __init__(self):
+        self.text = ""
+        self.emitted = 0
+
+    def _days(self, final):
+        sections = parse_sections(self.text if final else self.text[: self.text.rfind("\n") + 1])
+        complete = sections if final else sections[:-1]  # the last section may still be growing
+        return [parse_day(title, lines) for title, lines in complete if DAY_RE.match(title)]
+
+    def feed(self, chunk):
+        self.text += chunk
+        days = self._days(final=False)
+        new_days = days[self.emitted:]
+        self.emitted = len(days)
+        return new_days
+
+    def finish(self):
+        days = self._days(final=True)
+        new_days = days[self.emitted:]
+        self.emitted = len(days)
+        return new_days
+
+
+# -------------------------------
+# Storage keyed by trip parameters
+# -------------------------------
+class ItineraryStore(TieredCache):
+    """Parsed itineraries keyed on trip parameters: in-process LRU with TTL, then the itineraries table."""
+
+    model = Itinerary
+    write_failed_event = "itinerary_store_write_failed"
+
+    def __init__(self, maxsize, ttl, db_ttl=None):
+        super().__init__(maxsize, ttl, db_ttl=db_ttl)
+
+    def get(self, key):
+        return self.lookup(key)
+
+    def set(self, key, params, model, raw_text, itinerary):
+        record = {
+            "trip": params,
+            "itinerary": itinerary,
+            "raw_text": raw_text,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+        self.store(key, record, Itinerary(
+            key=key,
+            params=json.dumps(params),
+            model=model,
+            raw_text=raw_text,
+            itinerary=json.dumps(itinerary),
+            created_at=datetime.utcnow(),
+        ))
+        return record
+
+    def stats(self):
+        return self.memory.stats()
+
+
+itinerary_store = ItineraryStore(
+    maxsize=ITINERARY_CACHE_SIZE,
+    ttl=ITINERARY_CACHE_TTL_SECONDS,
+    db_ttl=ITINERARY_DB_TTL_SECONDS,
+)
@@ -0,0 +1,298 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import google.generativeai as genai
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.telemetry import log_event
+
+# Engine selection: the primary engine serves every request; when its recent latency or error
+# rate crosses a threshold, requests go to the fallback engine for a cooldown period.
+LLM_ENGINE = os.getenv("LLM_ENGINE", "gemini")  # gemini | ollama
+LLM_FALLBACK_ENGINE = os.getenv("LLM_FALLBACK_ENGINE", "")  # "" disables fallback
+LLM_FALLBACK_LATENCY_SECONDS = float(os.getenv("LLM_FALLBACK_LATENCY_SECONDS", 20))
+LLM_FALLBACK_ERROR_RATE = float(os.getenv("LLM_FALLBACK_ERROR_RATE", 0.5))
+LLM_FALLBACK_COOLDOWN_SECONDS = float(os.getenv("LLM_FALLBACK_COOLDOWN_SECONDS", 60))
+LLM_HEALTH_WINDOW = int(os.getenv("LLM_HEALTH_WINDOW", 20))
+
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "gemini-2.5-flash")
+CHAT_TIMEOUT_SECONDS = float(os.getenv("CHAT_TIMEOUT_SECONDS", 60))
+# In-flight generations are capped across engines so a burst of chat requests cannot tie up
+# every worker thread.
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", 8))
+CHAT_QUEUE_WAIT_SECONDS = float(os.getenv("CHAT_QUEUE_WAIT_SECONDS", 5))
+
+OLLAMA_API_URL = os.getenv("OLLAMA_API_URL", "http://localhost:11434/api/generate")
+OLLAMA_MODEL_NAME = os.getenv("OLLAMA_MODEL_NAME", "llama3")
+OLLAMA_POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", 8))
+OLLAMA_BATCH_WINDOW_MS = float(os.getenv("OLLAMA_BATCH_WINDOW_MS", 20))
+OLLAMA_MAX_BATCH = int(os.getenv("OLLAMA_MAX_BATCH", 8))
+
+chat_slots = threading.BoundedSemaphore(CHAT_MAX_CONCURRENCY)
+
+
+class ChatBusyError(Exception):
+    """No generation slot became free within CHAT_QUEUE_WAIT_SECONDS."""
+
+
+class GeminiEngine:
+    name = "gemini"
+
+    def __init__(self, model_name, timeout):
+        # one client for the whole process instead of one per request
+        self.model = model_name
+        self.client = genai.GenerativeModel(model_name)
+        self.timeout = timeout
+
+    def generate(self, prompt):
+        result = self.client.generate_content(prompt, request_options={"timeout": self.timeout})
+        return result.text
+
+    def stream(self, prompt):
+        for chunk in self.client.generate_content(prompt, stream=True, request_options={"timeout": self.timeout}):
+            if chunk.text:
+                yield chunk.text
+
+
+class OllamaEngine:
+    """Local Ollama server reached over a keep-alive connection pool.
+
+    Ollama's /api/generate takes one prompt per call, so non-streaming prompts are micro-batched:
+    prompts arriving within OLLAMA_BATCH_WINDOW_MS are collected, identical prompts share one
+    generation, and the batch is sent concurrently over the pooled connections.
+    """
+
+    name = "ollama"
+
+    def __init__(self, url, model_name, timeout, pool_size, batch_window_ms, max_batch):
+        self.url = url
+        self.model = model_name
+        self.timeout = timeout
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch = max_batch
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.batch_executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="ollama")
+        self.pending = queue.Queue()
+        self.batches = 0
+        self.coalesced = 0
+        self._dispatcher = None
+        self._lock = threading.Lock()
+
+    def _post(self, prompt, stream=False):
+        response = self.session.post(
+            self.url,
+            json={"model": self.model, "prompt": prompt, "stream": stream},
+            timeout=self.timeout,
+            stream=stream,
+        )
+        response.raise_for_status()
+        return response
+
+    def _ensure_dispatcher(self):
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, name="ollama-batcher", daemon=True)
+                self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        while True:
+            batch = [self.pending.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            by_prompt = {}
+            for prompt, future in batch:
+                by_prompt.setdefault(prompt, []).append(future)
+            self.batches += 1
+            self.coalesced += len(batch) - len(by_prompt)
+            for prompt, futures in by_prompt.items():
+                self.batch_executor.submit(self._run_batch_item, prompt, futures)
+
+    def _run_batch_item(self, prompt, futures):
+        try:
+            text = self._post(prompt).json().get("response", "")
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        for future in futures:
+            future.set_result(text)
+
+    def generate(self, prompt):
+        self._ensure_dispatcher()
+        future = Future()
+        self.pending.put((prompt, future))
+        return future.result(timeout=self.timeout)
+
+    def stream(self, prompt):
+        with self._post(prompt, stream=True) as response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
+
+
+class EngineHealth:
+    """Rolling latency/error window for one engine."""
+
+    def __init__(self, window, max_latency, max_error_rate):
+        self.samples = deque(maxlen=window)
+        self.max_latency = max_latency
+        self.max_error_rate = max_error_rate
+        self._lock = threading.Lock()
+
+    def record(self, ok, latency):
+        with self._lock:
+            self.samples.append((ok, latency))
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+
+    def degraded(self):
+        with self._lock:
+            samples = list(self.samples)
+        if len(samples) < 5:
+            return False
+        error_rate = sum(1 for ok, _ in samples if not ok) / len(samples)
+        avg_latency = sum(latency for _, latency in samples) / len(samples)
+        return error_rate > self.max_error_rate or avg_latency > self.max_latency
+
+
+class EngineRouter:
+    def __init__(self, primary, health, fallback=None, cooldown=60):
+        self.primary = primary
+        self.fallback = fallback
+        self.health = health
+        self.cooldown = cooldown
+        self.degraded_until = 0.0
+        self.fallback_calls = 0
+
+    def _select(self):
+        if self.fallback is None:
+            return self.primary
+        if time.monotonic() < self.degraded_until:
+            return self.fallback
+        if self.health.degraded():
+            log_event(
+                "llm_engine_degraded",
+                level=logging.WARNING,
+                engine=self.primary.name,
+                fallback=self.fallback.name,
+                cooldown_seconds=self.cooldown,
+            )
+            self.degraded_until = time.monotonic() + self.cooldown
+            self.health.reset()
+            return self.fallback
+        return self.primary
+
+    def generate(self, prompt):
+        engine = self._select()
+        started = time.monotonic()
+        try:
+            text = engine.generate(prompt)
+        except Exception:
+            if engine is not self.primary:
+                raise
+            self.health.record(False, time.monotonic() - started)
+            if self.fallback is None:
+                raise
+            # the primary just failed: answer this request from the fallback right away
+            engine = self.fallback
+            text = engine.generate(prompt)
+        else:
+            if engine is self.primary:
+                self.health.record(True, time.monotonic() - started)
+        if engine is not self.primary:
+            self.fallback_calls += 1
+        return text, engine.model
+
+    def stream(self, prompt):
+        # The engine is fixed once the first chunk is out, so fallback only applies at selection
+        engine = self._select()
+        if engine is not self.primary:
+            self.fallback_calls += 1
+        return engine, engine.stream(prompt)
+
+    def record_stream(self, engine, ok, latency):
+        if engine is self.primary:
+            self.health.record(ok, latency)
+
+    def stats(self):
+        return {
+            "primary": self.primary.name,
+            "fallback": self.fallback.name if self.fallback else None,
+            "on_fallback": time.monotonic() < self.degraded_until,
+            "fallback_calls": self.fallback_calls,
+        }
+
+
+def build_engine(name):
+    if name == "gemini":
+        return GeminiEngine(GEMINI_MODEL_NAME, CHAT_TIMEOUT_SECONDS)
+    if name == "ollama":
+        return OllamaEngine(
+            OLLAMA_API_URL, OLLAMA_MODEL_NAME, CHAT_TIMEOUT_SECONDS,
+            OLLAMA_POOL_SIZE, OLLAMA_BATCH_WINDOW_MS, OLLAMA_MAX_BATCH,
+        )
+    raise ValueError(f"Unknown LLM engine: {name}")
+
+
+llm_router = EngineRouter(
+    primary=build_engine(LLM_ENGINE),
+    fallback=build_engine(LLM_FALLBACK_ENGINE) if LLM_FALLBACK_ENGINE else None,
+    health=EngineHealth(LLM_HEALTH_WINDOW, LLM_FALLBACK_LATENCY_SECONDS, LLM_FALLBACK_ERROR_RATE),
+    cooldown=LLM_FALLBACK_COOLDOWN_SECONDS,
+)
+# Responses are cached under the primary engine's model; fallback answers are never cached
+LLM_MODEL_NAME = llm_router.primary.model
+
+
+def generate(prompt):
+    """Full response text for a prompt, as (text, model that produced it)."""
+    if not chat_slots.acquire(timeout=CHAT_QUEUE_WAIT_SECONDS):
+        raise ChatBusyError("Chat is busy, please retry")
+    try:
+        return llm_router.generate(prompt)
+    finally:
+        chat_slots.release()
+
+
+def generate_stream(prompt):
+    """Yield (text chunk, model) pairs as the selected engine produces them."""
+    if not chat_slots.acquire(timeout=CHAT_QUEUE_WAIT_SECONDS):
+        raise ChatBusyError("Chat is busy, please retry")
+    started = time.monotonic()
+    engine = None
+    try:
+        engine, chunks = llm_router.stream(prompt)
+        for text in chunks:
+            yield text, engine.model
+        llm_router.record_stream(engine, True, time.monotonic() - started)
+    except Exception:
+        if engine is not None:
+            llm_router.record_stream(engine, False, time.monotonic() - started)
+        raise
+    finally:
+        chat_slots.release()
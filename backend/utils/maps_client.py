@@ -0,0 +1,139 @@
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Shared keep-alive client for every Google Maps call, so requests reuse pooled TCP/TLS
+# connections instead of opening a new one to maps.googleapis.com each time.
+MAPS_POOL_CONNECTIONS = int(os.getenv("MAPS_POOL_CONNECTIONS", 4))  # distinct hosts kept pooled
+MAPS_POOL_MAXSIZE = int(os.getenv("MAPS_POOL_MAXSIZE", 32))  # open connections per host
+MAPS_MAX_RETRIES = int(os.getenv("MAPS_MAX_RETRIES", 3))
+MAPS_BACKOFF_BASE_SECONDS = float(os.getenv("MAPS_BACKOFF_BASE_SECONDS", 0.2))
+MAPS_BACKOFF_MAX_SECONDS = float(os.getenv("MAPS_BACKOFF_MAX_SECONDS", 2.0))
+MAPS_BREAKER_THRESHOLD = int(os.getenv("MAPS_BREAKER_THRESHOLD", 5))
+MAPS_BREAKER_RESET_SECONDS = float(os.getenv("MAPS_BREAKER_RESET_SECONDS", 30))
+
+RETRY_STATUSES = {"OVER_QUERY_LIMIT"}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised without touching the network while the breaker is open."""
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures and lets one trial call through after `reset_seconds`."""
+
+    def __init__(self, threshold, reset_seconds):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_seconds:
+                # half-open: the next call decides whether we close again
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        return "open" if self.opened_at is not None else "closed"
+
+
+class MapsClient:
+    def __init__(self, pool_connections, pool_maxsize, max_retries, backoff_base, backoff_max, breaker):
+        self.session = requests.Session()
+        # pool_block caps concurrent connections per host instead of opening throwaway extras
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+
+    def _backoff(self, attempt, deadline=None):
+        """Sleep before the next attempt; False (without sleeping) if that would pass the deadline."""
+        # full jitter: sleep a random amount up to the exponential step
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return False
+        time.sleep(delay)
+        return True
+
+    def get(self, url, params=None, timeout=10, deadline=None):
+        """GET a Maps endpoint, retrying OVER_QUERY_LIMIT and connection errors with jittered backoff.
+
+        ``deadline`` (a time.monotonic() value) bounds the whole call, retries and backoff included:
+        each attempt's timeout is cut to the time left, and no retry starts that cannot finish.
+        The breaker counts the call once, as a failure only if its final attempt failed.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("Google Maps circuit breaker is open")
+
+        attempt = 0
+        while True:
+            last_attempt = attempt == self.max_retries
+            attempt_timeout = timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise requests.exceptions.Timeout("deadline passed before the request was sent")
+                attempt_timeout = min(timeout, remaining)
+            try:
+                response = self.session.get(url, params=params, timeout=attempt_timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if last_attempt or not self._backoff(attempt, deadline):
+                    self.breaker.record_failure()
+                    raise
+                attempt += 1
+                continue
+
+            retry = response.status_code >= 500
+            if not retry:
+                try:
+                    retry = response.json().get("status") in RETRY_STATUSES
+                except ValueError:
+                    pass
+            if not retry:
+                self.breaker.record_success()
+                return response
+            if last_attempt or not self._backoff(attempt, deadline):
+                self.breaker.record_failure()
+                return response
+            attempt += 1
+
+    def stats(self):
+        return {
+            "breaker_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+        }
+
+
+maps_client = MapsClient(
+    pool_connections=MAPS_POOL_CONNECTIONS,
+    pool_maxsize=MAPS_POOL_MAXSIZE,
+    max_retries=MAPS_MAX_RETRIES,
+    backoff_base=MAPS_BACKOFF_BASE_SECONDS,
+    backoff_max=MAPS_BACKOFF_MAX_SECONDS,
+    breaker=CircuitBreaker(MAPS_BREAKER_THRESHOLD, MAPS_BREAKER_RESET_SECONDS),
+)
@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+
+from sqlalchemy import func
+
+from extensions import db
+from models.reference_version import ReferenceVersion
+from models.transport_mode import TransportMode
+
+# How often a process checks the transport_modes version counter (one single-row query)
+MODE_REGISTRY_CHECK_SECONDS = float(os.getenv("MODE_REGISTRY_CHECK_SECONDS", 30))
+VERSION_NAME = "transport_modes"
+
+# Rough door-to-door speeds used for duration estimates, by lowercased mode name
+MODE_SPEEDS_KMH = {
+    "walk": 4.5,
+    "walking": 4.5,
+    "bike": 15.0,
+    "bicycle": 15.0,
+    "metro": 30.0,
+    "train": 30.0,
+    "bus": 20.0,
+}
+DEFAULT_SPEED_KMH = 25.0
+DEFAULT_COST_PER_KM = 0.8
+DEFAULT_CO2_PER_KM = 0.05
+DEFAULT_SAFETY = 0.6
+
+
+class ModeEntry:
+    """Read-only snapshot of a TransportMode row with the per-mode coefficients precomputed."""
+
+    __slots__ = (
+        "id", "name", "co2_per_km", "avg_cost_per_km", "safety_score_base",
+        "speed_kmh", "cost_per_km", "co2_coeff", "safety", "_dict",
+    )
+
+    def __init__(self, mode):
+        self.id = mode.id
+        self.name = mode.name
+        self.co2_per_km = mode.co2_per_km
+        self.avg_cost_per_km = mode.avg_cost_per_km
+        self.safety_score_base = mode.safety_score_base
+        self.speed_kmh = MODE_SPEEDS_KMH.get((mode.name or "").lower(), DEFAULT_SPEED_KMH)
+        self.cost_per_km = mode.avg_cost_per_km or DEFAULT_COST_PER_KM
+        self.co2_coeff = mode.co2_per_km or DEFAULT_CO2_PER_KM
+        self.safety = mode.safety_score_base or DEFAULT_SAFETY
+        self._dict = mode.to_dict()
+
+    def to_dict(self):
+        return dict(self._dict)
+
+
+def _current_version():
+    # the row count catches inserts/deletes made outside the app; in-place edits have to bump the counter
+    return ReferenceVersion.current(VERSION_NAME, db.session.query(func.count(TransportMode.id)))
+
+
+def bump_version():
+    """Record a change to transport_modes; every process reloads on its next check. Caller commits."""
+    ReferenceVersion.bump(VERSION_NAME)
+
+
+class TransportModeRegistry:
+    """Process-local copy of the transport_modes table, reloaded when its version counter moves."""
+
+    def __init__(self, check_seconds):
+        self.check_seconds = check_seconds
+        self.modes = {}
+        self.version = None
+        self.checked_at = 0.0
+        self.loads = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            version = _current_version()
+            self.modes = {mode.id: ModeEntry(mode) for mode in TransportMode.query.all()}
+            self.version = version
+            self.checked_at = time.monotonic()
+            self.loads += 1
+
+    def invalidate(self):
+        with self._lock:
+            self.version = None
+
+    def _refresh(self):
+        if self.version is not None and time.monotonic() - self.checked_at < self.check_seconds:
+            return
+        if self.version is None or _current_version() != self.version:
+            self.load()
+        else:
+            self.checked_at = time.monotonic()
+
+    def get(self, mode_id):
+        self._refresh()
+        return self.modes.get(mode_id)
+
+    def all(self):
+        self._refresh()
+        return self.modes
+
+    def stats(self):
+        return {"modes": len(self.modes), "version": self.version[0] if self.version else None, "loads": self.loads}
+
+
+mode_registry = TransportModeRegistry(MODE_REGISTRY_CHECK_SECONDS)
@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+import os
+
+from flask import Response, jsonify, request, stream_with_context, url_for
+
+from extensions import db
+
+DEFAULT_PAGE_LIMIT = int(os.getenv("DEFAULT_PAGE_LIMIT", 100))
+MAX_PAGE_LIMIT = int(os.getenv("MAX_PAGE_LIMIT", 1000))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+NEXT_CURSOR_HEADER = "X-Next-After"
+
+
+def page_args(args):
+    """(limit, after) from the query string; raises ValueError on bad input."""
+    limit = int(args.get("limit", DEFAULT_PAGE_LIMIT))
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    after = args.get("after")
+    return min(limit, MAX_PAGE_LIMIT), int(after) if after not in (None, "") else None
+
+
+def keyset_page(query, key, limit, after, descending=False):
+    """One page ordered by ``key``; returns (rows, next_after) where next_after is None on the last page."""
+    if after is not None:
+        query = query.filter(key < after if descending else key > after)
+    rows = query.order_by(key.desc() if descending else key).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, getattr(rows[-1], key.key)
+
+
+def with_next_link(response, limit, next_after):
+    """Advertise the next page in headers so list bodies keep their existing shape."""
+    if next_after is not None:
+        args = {**request.args.to_dict(), "limit": limit, "after": next_after}
+        response.headers[NEXT_CURSOR_HEADER] = str(next_after)
+        response.headers["Link"] = f'<{url_for(request.endpoint, **request.view_args, **args)}>; rel="next"'
+    return response
+
+
+def paged_json(items, limit, next_after):
+    return with_next_link(jsonify(items), limit, next_after)
+
+
+def wants_export(args):
+    return args.get("format") == "ndjson"
+
+
+def ndjson_export(stmt, to_dict=None, batch_size=EXPORT_BATCH_SIZE):
+    """Stream a Core select as NDJSON from a server-side cursor, ``batch_size`` rows at a time.
+
+    Rows are plain Row tuples (no ORM identity map), so memory stays flat however large the
+    table is. ``to_dict`` defaults to the row's column mapping.
+    """
+    to_dict = to_dict or (lambda row: row._asdict())
+
+    def generate():
+        result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+        for partition in result.partitions():
+            yield "".join(json.dumps(to_dict(row), default=str) + "\n" for row in partition)
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def csv_rows(stmt, fields, batch_size=EXPORT_BATCH_SIZE):
+    """CSV text chunks, header first, one chunk per ``batch_size`` rows of a server-side cursor."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    for partition in result.partitions():
+        writer.writerows(partition)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def csv_export(stmt, fields, filename, batch_size=EXPORT_BATCH_SIZE):
+    """Stream a Core select as a CSV download."""
+    return Response(
+        stream_with_context(csv_rows(stmt, fields, batch_size)),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
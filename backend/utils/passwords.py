@@ -0,0 +1,155 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from extensions import bcrypt
+
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")  # bcrypt | pbkdf2 | scrypt
+BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+PBKDF2_ITERATIONS = int(os.getenv("PBKDF2_ITERATIONS", 600000))
+SCRYPT_COST = int(os.getenv("SCRYPT_COST", 2 ** 15))
+
+# Hashing is CPU-bound (bcrypt/hashlib release the GIL). A small pool caps how many hashes run at
+# once, and so how many cores a login storm can take. It does not take the hash off the request
+# thread: under sync WSGI workers the request thread blocks until its hash is done. So once the
+# pool and its short queue are full, login and signup answer 503 straight away rather than park
+# more request threads behind it (PASSWORD_QUEUE_WAIT_SECONDS > 0 lets them wait that long).
+PASSWORD_VERIFY_WORKERS = int(os.getenv("PASSWORD_VERIFY_WORKERS", max(2, (os.cpu_count() or 2) // 2)))
+PASSWORD_QUEUE_SIZE = int(os.getenv("PASSWORD_QUEUE_SIZE", 16))
+PASSWORD_QUEUE_WAIT_SECONDS = float(os.getenv("PASSWORD_QUEUE_WAIT_SECONDS", 0))
+
+
+class PasswordBusyError(Exception):
+    """The hashing pool and its queue are full (after PASSWORD_QUEUE_WAIT_SECONDS, if set)."""
+
+
+class BcryptHasher:
+    scheme = "bcrypt"
+
+    def __init__(self, rounds):
+        self.rounds = rounds
+
+    def owns(self, hashed):
+        return hashed.startswith(("$2a$", "$2b$", "$2y$"))
+
+    def hash(self, password):
+        return bcrypt.generate_password_hash(password, rounds=self.rounds).decode("utf-8")
+
+    def verify(self, hashed, password):
+        return bcrypt.check_password_hash(hashed, password)
+
+    def needs_rehash(self, hashed):
+        # $2b$12$... -> the cost is the third field
+        return not self.owns(hashed) or int(hashed.split("$")[2]) != self.rounds
+
+
+class WerkzeugHasher:
+    """pbkdf2/scrypt hashes in werkzeug's "method$salt$hash" format (what signup used to write)."""
+
+    def __init__(self, scheme, cost):
+        self.scheme = scheme
+        self.method = f"pbkdf2:sha256:{cost}" if scheme == "pbkdf2" else f"scrypt:{cost}:8:1"
+
+    def owns(self, hashed):
+        return hashed.startswith(("pbkdf2:", "scrypt:"))
+
+    def hash(self, password):
+        return generate_password_hash(password, method=self.method)
+
+    def verify(self, hashed, password):
+        return check_password_hash(hashed, password)
+
+    def needs_rehash(self, hashed):
+        return hashed.split("$", 1)[0] != self.method
+
+
+def make_hasher(scheme, cost=None):
+    if scheme == "bcrypt":
+        return BcryptHasher(cost or BCRYPT_LOG_ROUNDS)
+    if scheme == "pbkdf2":
+        return WerkzeugHasher(scheme, cost or PBKDF2_ITERATIONS)
+    if scheme == "scrypt":
+        return WerkzeugHasher(scheme, cost or SCRYPT_COST)
+    raise ValueError(f"Unknown password hash scheme: {scheme}")
+
+
+class PasswordService:
+    """Hashes with the configured scheme, verifies any known scheme, and flags stale hashes."""
+
+    def __init__(self, scheme, workers, queue_size, wait_seconds):
+        self.configure(scheme)
+        self.fallbacks = [BcryptHasher(BCRYPT_LOG_ROUNDS), WerkzeugHasher("pbkdf2", PBKDF2_ITERATIONS)]
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.wait_seconds = wait_seconds
+        self.verified = 0
+        self.rehashed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def configure(self, scheme, cost=None):
+        self.hasher = make_hasher(scheme, cost)
+
+    def _hasher_for(self, hashed):
+        for hasher in [self.hasher] + self.fallbacks:
+            if hasher.owns(hashed):
+                return hasher
+        return None
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _run(self, fn, *args):
+        """Run fn on the pool and block the calling (request) thread until it returns.
+
+        The pool bounds how many hashes run at once; it does not free the caller. When every
+        worker and queue slot is taken, raise PasswordBusyError instead of queueing further.
+        """
+        if not self.slots.acquire(timeout=self.wait_seconds):
+            self._count("rejected")
+            raise PasswordBusyError("Too many logins in progress, please retry")
+        try:
+            return self.pool.submit(fn, *args).result()
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        return self._run(self.hasher.hash, password)
+
+    def verify(self, hashed, password):
+        """(valid, needs_rehash) for a stored hash, checked on the worker pool.
+
+        needs_rehash is only True for a valid password whose hash uses another scheme or cost.
+        Blocks the caller until the check is done; raises PasswordBusyError when the pool is saturated.
+        """
+        hasher = self._hasher_for(hashed or "")
+        if hasher is None:
+            return False, False
+        self._count("verified")
+        valid = self._run(hasher.verify, hashed, password)
+        return valid, valid and self.needs_rehash(hashed)
+
+    def needs_rehash(self, hashed):
+        return self.hasher.needs_rehash(hashed)
+
+    def record_rehash(self):
+        self._count("rehashed")
+
+    def stats(self):
+        return {
+            "scheme": self.hasher.scheme,
+            "verified": self.verified,
+            "rehashed": self.rehashed,
+            "rejected": self.rejected,
+        }
+
+
+password_service = PasswordService(
+    PASSWORD_HASH_SCHEME,
+    workers=PASSWORD_VERIFY_WORKERS,
+    queue_size=PASSWORD_QUEUE_SIZE,
+    wait_seconds=PASSWORD_QUEUE_WAIT_SECONDS,
+)
@@ -0,0 +1,122 @@
+import json
+import os
+from datetime import datetime
+
+from extensions import db
+from models.place_tile import PlaceTile
+from utils.cache import TieredCache
+from utils.geo import grid_cell, haversine_km, neighbour_cells
+
+PLACES_TILE_METERS = float(os.getenv("PLACES_TILE_METERS", 1000))
+PLACES_CACHE_SIZE = int(os.getenv("PLACES_CACHE_SIZE", 8192))
+PLACES_CACHE_TTL_SECONDS = int(os.getenv("PLACES_CACHE_TTL_SECONDS", 24 * 3600))
+# Warmed tiles live in the database so every worker (and the offline warm-up command) shares them
+PLACES_CACHE_PERSIST = os.getenv("PLACES_CACHE_PERSIST", "1") == "1"
+PLACES_CACHE_DB_TTL_SECONDS = int(os.getenv("PLACES_CACHE_DB_TTL_SECONDS", 7 * 24 * 3600))
+
+
+def place_location(place):
+    location = (place.get("geometry") or {}).get("location") or {}
+    return location.get("lat"), location.get("lng")
+
+
+class PlacesTileCache(TieredCache):
+    """Nearby-search results stored per (tile, radius, place type).
+
+    A lookup needs the tile the user stands in; results from the surrounding tiles are merged
+    in and everything is filtered by real distance to the user. Tiles are read from the table in
+    one query per lookup rather than by primary key, so this uses the tiers directly.
+    """
+
+    write_failed_event = "places_cache_write_failed"
+
+    def __init__(self, tile_meters, maxsize, ttl, persist=True, db_ttl=None):
+        super().__init__(maxsize, ttl, persist=persist, db_ttl=db_ttl)
+        self.tile_meters = tile_meters
+        self.lookups = 0
+        self.tile_hits = 0
+
+    def _load_from_db(self, cells, radius, place_type):
+        rows = PlaceTile.query.filter(
+            db.tuple_(PlaceTile.tile_row, PlaceTile.tile_col).in_(cells),
+            PlaceTile.radius == radius,
+            PlaceTile.place_type == place_type,
+        ).all()
+        found = {}
+        for row in rows:
+            if not self.is_fresh(row.created_at):
+                continue
+            results = json.loads(row.results)
+            found[(row.tile_row, row.tile_col)] = results
+            self.memory.set(((row.tile_row, row.tile_col), radius, place_type), results)
+        return found
+
+    def get(self, lat, lng, radius, place_type):
+        """Cached places within `radius` metres of (lat, lng), or None if the home tile is cold."""
+        cells = neighbour_cells(lat, lng, self.tile_meters)
+        tiles = {}
+        for cell in cells:
+            results = self.memory.get((cell, radius, place_type))
+            if results is not None:
+                tiles[cell] = results
+
+        missing = [cell for cell in cells if cell not in tiles]
+        if missing and self.persist:
+            tiles.update(self._load_from_db(missing, radius, place_type))
+
+        with self._lock:
+            self.lookups += 1
+            if cells[0] not in tiles:
+                return None
+            self.tile_hits += 1
+
+        merged = []
+        seen_ids = set()
+        radius_km = radius / 1000.0
+        for cell in cells:
+            for place in tiles.get(cell, []):
+                place_id = place.get("place_id")
+                if place_id in seen_ids:
+                    continue
+                place_lat, place_lng = place_location(place)
+                if place_lat is None or haversine_km(lat, lng, place_lat, place_lng) > radius_km:
+                    continue
+                seen_ids.add(place_id)
+                merged.append(place)
+        return merged
+
+    def set(self, lat, lng, radius, place_type, results):
+        cell = grid_cell(lat, lng, self.tile_meters)
+        self.memory.set((cell, radius, place_type), results)
+        if not self.persist:
+            return
+
+        def upsert():
+            tile = PlaceTile.query.filter_by(
+                tile_row=cell[0], tile_col=cell[1], radius=radius, place_type=place_type
+            ).first()
+            if tile is None:
+                tile = PlaceTile(tile_row=cell[0], tile_col=cell[1], radius=radius, place_type=place_type)
+                db.session.add(tile)
+            tile.results = json.dumps(results)
+            tile.created_at = datetime.utcnow()
+
+        self.write(upsert)
+
+    def stats(self):
+        return {
+            **self.memory.stats(),
+            "tile_meters": self.tile_meters,
+            "persistent": self.persist,
+            "lookups": self.lookups,
+            "tile_hits": self.tile_hits,
+        }
+
+
+places_cache = PlacesTileCache(
+    tile_meters=PLACES_TILE_METERS,
+    maxsize=PLACES_CACHE_SIZE,
+    ttl=PLACES_CACHE_TTL_SECONDS,
+    persist=PLACES_CACHE_PERSIST,
+    db_ttl=PLACES_CACHE_DB_TTL_SECONDS,
+)
@@ -0,0 +1,143 @@
+import math
+
+import numpy as np
+
+# Weight profiles for multi-criteria ranking; "balanced" matches the original hard-coded weights
+WEIGHT_PROFILES = {
+    "balanced": {"cost": 0.25, "time": 0.20, "feedback": 0.30, "safety": 0.15, "green": 0.10},
+    "cheapest": {"cost": 0.55, "time": 0.15, "feedback": 0.15, "safety": 0.10, "green": 0.05},
+    "fastest": {"cost": 0.10, "time": 0.55, "feedback": 0.15, "safety": 0.15, "green": 0.05},
+    "greenest": {"cost": 0.10, "time": 0.10, "feedback": 0.15, "safety": 0.10, "green": 0.55},
+    "safest": {"cost": 0.10, "time": 0.10, "feedback": 0.20, "safety": 0.55, "green": 0.05},
+}
+WEIGHT_KEYS = ("cost", "time", "feedback", "safety", "green")
+DEFAULT_PROFILE = "balanced"
+
+
+def finite_number(value, name):
+    """float(value), or ValueError for non-numbers, booleans, NaN and infinities."""
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be a number")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be finite")
+    return value
+
+
+def resolve_weights(profile=None, overrides=None):
+    """Weights from a named profile with optional per-criterion overrides, rescaled to sum to 1."""
+    profile = profile or DEFAULT_PROFILE
+    if not isinstance(profile, str) or profile not in WEIGHT_PROFILES:
+        raise ValueError(f"unknown weight profile '{profile}', expected one of {sorted(WEIGHT_PROFILES)}")
+    weights = dict(WEIGHT_PROFILES[profile])
+    if overrides is not None and not isinstance(overrides, dict):
+        raise ValueError("weights must be an object of criterion -> number")
+    for key, value in (overrides or {}).items():
+        if key not in WEIGHT_KEYS:
+            raise ValueError(f"unknown weight '{key}', expected one of {list(WEIGHT_KEYS)}")
+        value = finite_number(value, f"weight '{key}'")
+        if value < 0:
+            raise ValueError(f"weight '{key}' must be >= 0")
+        weights[key] = value
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("at least one weight must be positive")
+    return {key: weights[key] / total for key in WEIGHT_KEYS}
+
+
+def _group_normalize(values, groups, n_groups):
+    """Min-max normalize values within each group; constant groups score 0.5 like _normalize did."""
+    mins = np.full(n_groups, np.inf)
+    maxs = np.full(n_groups, -np.inf)
+    np.minimum.at(mins, groups, values)
+    np.maximum.at(maxs, groups, values)
+    span = (maxs - mins)[groups]
+    out = np.full(values.shape, 0.5)
+    varying = span > 0
+    out[varying] = (values[varying] - mins[groups][varying]) / span[varying]
+    return out
+
+
+def _round(values, digits):
+    """np.round, except that near-ties are settled by round() so results match the scalar scorer.
+
+    np.round scales by 10**digits first, which can tip a value like 4.705 across the tie the
+    other way from Python's correctly rounded round().
+    """
+    out = np.round(values, digits)
+    scaled = values * 10.0 ** digits
+    for k in np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6):
+        out[k] = round(float(values[k]), digits)
+    return out
+
+
+def rank_options(requests, modes, weights):
+    """Score and rank transport modes for many routes at once.
+
+    `requests` is a list of {"distance_km": float, "feedback": {mode_id: (avg_rating, total_votes,
+    num_entries)}, "routes": {mode_id: (distance_km, minutes)}}; `modes` maps mode id to a registry
+    ModeEntry. Modes with a real route use its distance and duration, the rest fall back to
+    distance_km and the mode's heuristic speed. A route with feedback is ranked over the modes that
+    have feedback, otherwise over every mode. Returns one ranked option list per request, in
+    request order.
+    """
+    group_idx, mode_list, distances, ratings, votes, entries = [], [], [], [], [], []
+    routed_minutes = []
+    for i, req in enumerate(requests):
+        feedback = {mode_id: row for mode_id, row in (req.get("feedback") or {}).items() if mode_id in modes}
+        candidates = feedback.keys() if feedback else modes.keys()
+        for mode_id in candidates:
+            avg_rating, total_votes, num_entries = feedback.get(mode_id, (0.0, 0, 0))
+            route = (req.get("routes") or {}).get(mode_id)
+            group_idx.append(i)
+            mode_list.append(modes[mode_id])
+            distances.append(route[0] if route else req["distance_km"])
+            routed_minutes.append(route[1] if route else np.nan)
+            ratings.append(float(avg_rating or 0.0))
+            votes.append(int(total_votes or 0))
+            entries.append(int(num_entries or 0))
+
+    ranked = [[] for _ in requests]
+    if not mode_list:
+        return ranked
+
+    groups = np.asarray(group_idx)
+    distance = np.asarray(distances, dtype=float)
+    cost = _round(np.array([m.cost_per_km for m in mode_list]) * distance, 2)
+    routed = np.asarray(routed_minutes, dtype=float)
+    heuristic_minutes = distance / np.array([m.speed_kmh for m in mode_list]) * 60.0
+    minutes = _round(np.where(np.isnan(routed), heuristic_minutes, routed), 1)
+    co2 = _round(np.array([m.co2_coeff for m in mode_list]) * distance, 2)
+    safety = _round(np.array([m.safety for m in mode_list], dtype=float), 2)
+    feedback = np.asarray(ratings)
+
+    n_groups = len(requests)
+    scores = _round(
+        weights["cost"] * (1 - _group_normalize(cost, groups, n_groups))
+        + weights["time"] * (1 - _group_normalize(minutes, groups, n_groups))
+        + weights["feedback"] * _group_normalize(feedback, groups, n_groups)
+        + weights["safety"] * _group_normalize(safety, groups, n_groups)
+        + weights["green"] * (1 - _group_normalize(co2, groups, n_groups)),
+        4,
+    )
+
+    for k, mode in enumerate(mode_list):
+        ranked[group_idx[k]].append({
+            "mode": mode.to_dict(),
+            "avg_rating": ratings[k],
+            "total_votes": votes[k],
+            "num_entries": entries[k],
+            "distance_km": round(float(distance[k]), 2),
+            "estimate_source": "heuristic" if np.isnan(routed[k]) else "distance_matrix",
+            "estimated_cost_usd": float(cost[k]),
+            "estimated_duration_minutes": float(minutes[k]),
+            "estimated_co2_kg": float(co2[k]),
+            "safety_score": float(safety[k]),
+            "score": float(scores[k]),
+        })
+    for options in ranked:
+        options.sort(key=lambda x: x["score"], reverse=True)
+    return ranked
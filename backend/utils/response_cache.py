@@ -0,0 +1,75 @@
+import hashlib
+import os
+from datetime import datetime
+
+from models.llm_response import LLMResponse
+from utils.cache import TieredCache
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 512))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 6 * 3600))
+RESPONSE_CACHE_PERSIST = os.getenv("RESPONSE_CACHE_PERSIST", "1") == "1"
+RESPONSE_CACHE_DB_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_DB_TTL_SECONDS", 7 * 24 * 3600))
+
+# Clients send this header (or Cache-Control: no-cache) to force a fresh generation
+BYPASS_HEADER = "X-Cache-Bypass"
+
+
+def normalize_prompt(prompt):
+    return " ".join((prompt or "").casefold().split())
+
+
+def prompt_key(prompt, model):
+    return hashlib.sha256(f"{model}\n{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+
+def bypass_requested(headers):
+    if headers.get(BYPASS_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    return "no-cache" in headers.get("Cache-Control", "").lower()
+
+
+class ResponseCache(TieredCache):
+    """Generated LLM text keyed on model + normalized prompt: in-process LRU with TTL, then the DB."""
+
+    model = LLMResponse
+    write_failed_event = "response_cache_write_failed"
+
+    def __init__(self, maxsize, ttl, persist=True, db_ttl=None):
+        super().__init__(maxsize, ttl, persist=persist, db_ttl=db_ttl)
+        self.generations = 0
+
+    def to_value(self, entry):
+        return entry.response
+
+    def get(self, prompt, model):
+        return self.lookup(prompt_key(prompt, model))
+
+    def set(self, prompt, model, text):
+        key = prompt_key(prompt, model)
+        with self._lock:
+            self.generations += 1
+        self.store(key, text, LLMResponse(
+            key=key,
+            model=model,
+            prompt=normalize_prompt(prompt),
+            response=text,
+            created_at=datetime.utcnow(),
+        ))
+
+    def stats(self):
+        memory = self.memory.stats()
+        return {
+            "memory": memory,
+            "persistent": self.persist,
+            "db_hits": self.db_hits,
+            "hits": memory["hits"] + self.db_hits,
+            "generations": self.generations,
+        }
+
+
+response_cache = ResponseCache(
+    maxsize=RESPONSE_CACHE_SIZE,
+    ttl=RESPONSE_CACHE_TTL_SECONDS,
+    persist=RESPONSE_CACHE_PERSIST,
+    db_ttl=RESPONSE_CACHE_DB_TTL_SECONDS,
+)
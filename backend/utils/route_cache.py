@@ -0,0 +1,56 @@
+import copy
+import os
+
+from utils.cache import TTLCache
+from utils.geo import grid_cell
+
+ROUTE_CACHE_SIZE = int(os.getenv("ROUTE_CACHE_SIZE", 4096))
+# Origins/destinations are snapped to grid cells of this size before keying the cache
+ROUTE_CACHE_CELL_METERS = float(os.getenv("ROUTE_CACHE_CELL_METERS", 150))
+
+# Transit schedules change quickly, walking paths practically never
+ROUTE_CACHE_TTL_SECONDS = {
+    "transit": int(os.getenv("ROUTE_CACHE_TTL_TRANSIT", 5 * 60)),
+    "driving": int(os.getenv("ROUTE_CACHE_TTL_DRIVING", 15 * 60)),
+    "bicycling": int(os.getenv("ROUTE_CACHE_TTL_BICYCLING", 6 * 3600)),
+    "walking": int(os.getenv("ROUTE_CACHE_TTL_WALKING", 24 * 3600)),
+}
+DEFAULT_ROUTE_TTL_SECONDS = 10 * 60
+
+
+class RouteCache:
+    """Size-bounded cache of parsed Directions legs keyed on (mode, origin cell, destination cell)."""
+
+    def __init__(self, maxsize, cell_meters, ttls):
+        self.cell_meters = cell_meters
+        self.ttls = ttls
+        self.entries = TTLCache(maxsize=maxsize, ttl=DEFAULT_ROUTE_TTL_SECONDS)
+
+    def key(self, mode, start_lat, start_lng, end_lat, end_lng):
+        return (
+            mode,
+            grid_cell(start_lat, start_lng, self.cell_meters),
+            grid_cell(end_lat, end_lng, self.cell_meters),
+        )
+
+    def get(self, mode, start_lat, start_lng, end_lat, end_lng):
+        leg = self.entries.get(self.key(mode, start_lat, start_lng, end_lat, end_lng))
+        # callers decorate the leg (mode label, details), so never hand out the stored dict
+        return copy.deepcopy(leg) if leg is not None else None
+
+    def set(self, mode, start_lat, start_lng, end_lat, end_lng, leg):
+        self.entries.set(
+            self.key(mode, start_lat, start_lng, end_lat, end_lng),
+            copy.deepcopy(leg),
+            ttl=self.ttls.get(mode, DEFAULT_ROUTE_TTL_SECONDS),
+        )
+
+    def stats(self):
+        return {**self.entries.stats(), "cell_meters": self.cell_meters, "ttl_by_mode": self.ttls}
+
+
+route_cache = RouteCache(
+    maxsize=ROUTE_CACHE_SIZE,
+    cell_meters=ROUTE_CACHE_CELL_METERS,
+    ttls=ROUTE_CACHE_TTL_SECONDS,
+)
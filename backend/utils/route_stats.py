@@ -0,0 +1,64 @@
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models.local_route_feedback import LocalRouteFeedback
+from models.route_feedback_stats import RouteFeedbackStats
+
+
+def _insert():
+    # both backends we run on support INSERT .. ON CONFLICT DO UPDATE
+    if db.engine.dialect.name == "postgresql":
+        return postgresql.insert(RouteFeedbackStats)
+    return sqlite.insert(RouteFeedbackStats)
+
+
+def record_feedback(origin, destination, mode_id, rating, votes=1, entries=1):
+    """Add feedback to the running totals in the caller's transaction (commit is left to the caller)."""
+    stmt = _insert().values(
+        origin=origin,
+        destination=destination,
+        mode_id=mode_id,
+        num_entries=entries,
+        total_votes=votes,
+        rating_sum=rating,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["origin", "destination", "mode_id"],
+        set_={
+            "num_entries": RouteFeedbackStats.num_entries + stmt.excluded.num_entries,
+            "total_votes": RouteFeedbackStats.total_votes + stmt.excluded.total_votes,
+            "rating_sum": RouteFeedbackStats.rating_sum + stmt.excluded.rating_sum,
+        },
+    )
+    db.session.execute(stmt)
+
+
+def rebuild_route_stats():
+    """Recompute every aggregate from the raw feedback table; returns the number of rows written."""
+    rows = (
+        db.session.query(
+            LocalRouteFeedback.origin,
+            LocalRouteFeedback.destination,
+            LocalRouteFeedback.mode_id,
+            func.count(LocalRouteFeedback.id),
+            func.coalesce(func.sum(LocalRouteFeedback.votes), 0),
+            func.coalesce(func.sum(LocalRouteFeedback.rating), 0),
+        )
+        .group_by(LocalRouteFeedback.origin, LocalRouteFeedback.destination, LocalRouteFeedback.mode_id)
+        .all()
+    )
+    db.session.query(RouteFeedbackStats).delete()
+    db.session.bulk_insert_mappings(RouteFeedbackStats, [
+        {
+            "origin": origin,
+            "destination": destination,
+            "mode_id": mode_id,
+            "num_entries": int(num_entries),
+            "total_votes": int(total_votes),
+            "rating_sum": int(rating_sum),
+        }
+        for origin, destination, mode_id, num_entries, total_votes, rating_sum in rows
+    ])
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,228 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Metrics are always recorded; only the per-request span log line is sampled. Traces with an
+# upstream error are logged regardless of the sample rate.
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0.1))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking the request when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _setup_logger():
+    logger = logging.getLogger("goquest")
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    handler = DroppingQueueHandler(log_queue)
+    logger.addHandler(handler)
+
+    # Formatting and the stdout write happen on the listener thread, off the request path
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, stream)
+    listener.start()
+    atexit.register(listener.stop)
+    return logger, handler
+
+
+log, log_handler = _setup_logger()
+
+
+def log_event(event, level=logging.INFO, **fields):
+    log.log(level, event, extra={"fields": fields})
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += value
+
+
+class Metrics:
+    """Latency histograms per (span, target) and upstream error counters per (span, kind)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.latency = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, target, elapsed_ms):
+        with self._lock:
+            histogram = self.latency.get((name, target))
+            if histogram is None:
+                histogram = self.latency[(name, target)] = Histogram(self.buckets)
+            histogram.observe(elapsed_ms)
+
+    def error(self, name, target, kind):
+        with self._lock:
+            key = (name, target, kind)
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def render(self):
+        """Prometheus text exposition format."""
+        lines = [
+            "# HELP goquest_span_latency_ms Latency of requests and upstream calls in milliseconds.",
+            "# TYPE goquest_span_latency_ms histogram",
+        ]
+        with self._lock:
+            for (name, target), histogram in sorted(self.latency.items()):
+                labels = f'span="{name}",target="{target}"'
+                cumulative = 0
+                for bound, count in zip(list(self.buckets) + ["+Inf"], histogram.counts):
+                    cumulative += count
+                    lines.append(f'goquest_span_latency_ms_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"goquest_span_latency_ms_sum{{{labels}}} {histogram.total:.3f}")
+                lines.append(f"goquest_span_latency_ms_count{{{labels}}} {histogram.count}")
+
+            lines.append("# HELP goquest_upstream_errors_total Failed upstream calls by span and error kind.")
+            lines.append("# TYPE goquest_upstream_errors_total counter")
+            for (name, target, kind), count in sorted(self.errors.items()):
+                lines.append(f'goquest_upstream_errors_total{{span="{name}",target="{target}",kind="{kind}"}} {count}')
+
+        lines.append("# HELP goquest_log_records_dropped_total Log records dropped because the log queue was full.")
+        lines.append("# TYPE goquest_log_records_dropped_total counter")
+        lines.append(f"goquest_log_records_dropped_total {log_handler.dropped}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class Span:
+    def __init__(self, name, target, attrs):
+        self.name = name
+        self.target = target
+        self.attrs = attrs
+        self.status = "ok"
+        self.elapsed_ms = None
+
+    def tag(self, **attrs):
+        self.attrs.update(attrs)
+
+    def fail(self, kind):
+        """Mark an upstream failure that did not raise (e.g. a non-OK Google status)."""
+        self.status = kind
+
+    def to_dict(self):
+        entry = {"span": self.name, "target": self.target, "status": self.status, "ms": self.elapsed_ms}
+        entry.update(self.attrs)
+        return entry
+
+
+class Trace:
+    """The spans of one request; emitted as a single log line when sampled or failed."""
+
+    def __init__(self, name, sample_rate, **attrs):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.sampled = random.random() < sample_rate
+        self.attrs = attrs
+        self.spans = []
+        self.failed = False
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def tag(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+            if span.status != "ok":
+                self.failed = True
+
+    def mark_failed(self):
+        self.failed = True
+
+    def finish(self, status="ok"):
+        """Record the request latency and log the spans if sampled or anything failed."""
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        metrics.observe("request", self.name, elapsed_ms)
+        if self.sampled or self.failed:
+            with self._lock:
+                spans = [span.to_dict() for span in self.spans]
+            log_event(
+                self.name,
+                level=logging.WARNING if self.failed else logging.INFO,
+                trace_id=self.trace_id,
+                status=status,
+                ms=round(elapsed_ms, 1),
+                spans=spans,
+                **self.attrs,
+            )
+
+
+@contextmanager
+def span(name, target="", trace=None, **attrs):
+    """Time an upstream call; exceptions are counted as errors of their class and re-raised."""
+    current = Span(name, target, attrs)
+    started = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.status = type(e).__name__
+        raise
+    finally:
+        current.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        metrics.observe(name, target, current.elapsed_ms)
+        if current.status != "ok":
+            metrics.error(name, target, current.status)
+        if trace is not None:
+            trace.add(current)
+
+
+def start_trace(name, **attrs):
+    return Trace(name, TRACE_SAMPLE_RATE, **attrs)
@@ -0,0 +1,20 @@
+import os
+from functools import wraps
+
+from flask import jsonify
+from flask_jwt_extended import current_user, jwt_required
+
+# Comma-separated usernames allowed to call operator endpoints (registry reloads and the like)
+ADMIN_USERNAMES = {name.strip() for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name.strip()}
+
+
+def admin_required(fn):
+    """jwt_required, and the token's user must be listed in ADMIN_USERNAMES (403 otherwise)."""
+    @wraps(fn)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if current_user.username not in ADMIN_USERNAMES:
+            return jsonify({"error": "admin only"}), 403
+        return fn(*args, **kwargs)
+
+    return wrapper
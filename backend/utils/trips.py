@@ -0,0 +1,29 @@
+import json
+
+from sqlalchemy import func, literal, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+
+from extensions import db
+from models.trip_model import Trip
+
+
+def coerce_destinations(value):
+    """Destinations as a list: accepts a list, a JSON-encoded list, or a single name."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = value.strip()
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def includes_destination(name):
+    """Filter expression for trips whose destinations list contains ``name``."""
+    if db.engine.dialect.name == "postgresql":
+        # served by the GIN (jsonb_path_ops) index
+        return type_coerce(Trip.destinations, JSONB).contains([name])
+    # SQLite: JSON1 table-valued function; callers scope it by user so the user index applies first
+    elements = func.json_each(Trip.destinations).table_valued("value")
+    return select(literal(1)).select_from(elements).where(elements.c.value == name).exists()
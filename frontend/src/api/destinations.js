@@ -1,9 +1,15 @@
 import API from "./axios";
 
-// Get all destinations
+// Get all destinations, following the X-Next-After cursor until the last page
 export const getDestinations = async () => {
-  const res = await API.get("/destinations/");
-  return res.data;
+  const all = [];
+  let after = null;
+  do {
+    const res = await API.get("/destinations/", { params: after ? { after } : {} });
+    all.push(...res.data);
+    after = res.headers["x-next-after"];
+  } while (after);
+  return all;
 };
 
 // Get one destination by ID
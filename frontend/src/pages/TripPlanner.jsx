@@ -42,11 +42,39 @@ export default function TripPlanner() {
     e.preventDefault();
     setIsLoading(true);
     setError('');
+    setChatResponse('');
     try {
-      const res = await axios.post(`${API_URL}/api/chat`, { input: chatInput });
-      setChatResponse(res.data.response);
+      // Stream the answer over Server-Sent Events so text shows up as soon as Gemini starts writing
+      const res = await fetch(`${API_URL}/api/chat`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+        body: JSON.stringify({ input: chatInput, stream: true }),
+      });
+      if (!res.ok || !res.body) {
+        const body = await res.json().catch(() => ({}));
+        throw new Error(body.error || 'Something went wrong.');
+      }
+
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const event of events) {
+          const isError = event.startsWith('event: error');
+          const dataLine = event.split('\n').find((line) => line.startsWith('data: '));
+          if (!dataLine) continue;
+          const payload = JSON.parse(dataLine.slice(6));
+          if (isError) throw new Error(payload.error);
+          if (payload.text) setChatResponse((prev) => prev + payload.text);
+        }
+      }
     } catch (err) {
-      setError(err.response?.data?.error || 'Something went wrong.');
+      setError(err.message || 'Something went wrong.');
     } finally {
       setIsLoading(false);
       setChatInput('');
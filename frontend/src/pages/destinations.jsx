@@ -1,12 +1,12 @@
 import { useEffect, useState } from "react";
-import API from "../services/api";
+import { getDestinations } from "../api/destinations";
 
 function Destinations() {
   const [destinations, setDestinations] = useState([]);
 
   useEffect(() => {
-    API.get("/destinations/")
-      .then((res) => setDestinations(res.data))
+    getDestinations()
+      .then(setDestinations)
       .catch(() => alert("Error fetching destinations"));
   }, []);
 